@@ -9,15 +9,17 @@ from collections.abc import Callable
 from contextlib import asynccontextmanager
 from typing import Any, TypeVar
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from fastapi import HTTPException
 from starlette.concurrency import run_in_threadpool
 
-from core import db, goal_schedule_service, logging_service, memory_events_service, memory_unit_service, record_service, schedule_service, soul_proactive_service, vector_index_service, vectorstore, workspace_service
+from core import db, goal_schedule_service, logging_service, memory_events_service, memory_unit_service, record_service, schedule_service, segmentation, soul_proactive_service, vector_index_service, vectorstore, workspace_service
 from core.app_services import job_service
 from core.app_services.api_runtime import ApiRuntime, JobWorker
-from core.cli.config import CONFIG_FILE, normalize_proactive_message_config, normalize_vision_config, normalize_web_search_config
-from core.llm import secondary_model
+from core.graph import client as graph_client
+from core.cli.config import CONFIG_FILE, normalize_llm_scheduler_settings, normalize_proactive_message_config, normalize_vision_config, normalize_web_search_config
+from core.llm import scheduler, secondary_model
+from core.llm.common import CHAT_CLIENT_MAX_RETRIES
 from core.logging_service import normalize_config as normalize_logging_settings
 
 T = TypeVar("T")
@@ -78,6 +80,7 @@ async def init_runtime() -> ApiRuntime:
         logging_service.init_logging(config.get("logging"))
         workspace_service.migrate_workspace_permissions()
         workspace_service.init_workspace()
+        segmentation.start_warmup()
         next_runtime = (
             _unconfigured_runtime(config)
             if not _is_model_configured(config)
@@ -170,12 +173,26 @@ def _build_configured_runtime(config: dict) -> ApiRuntime:
     except vectorstore.VectorStoreInitError as exc:
         logging_service.log_event("vectorstore_init_failed", level="ERROR", error=str(exc))
 
-    client = OpenAI(api_key=config["api_key"], base_url=config.get("base_url", "https://api.openai.com/v1"))
+    client = OpenAI(
+        api_key=config["api_key"],
+        base_url=config.get("base_url", "https://api.openai.com/v1"),
+        max_retries=CHAT_CLIENT_MAX_RETRIES,
+    )
+    # Streamed chat replies read tokens on the event loop so a disconnect can
+    # cancel generation; everything else keeps the blocking client.
+    async_client = AsyncOpenAI(
+        api_key=config["api_key"],
+        base_url=config.get("base_url", "https://api.openai.com/v1"),
+        max_retries=CHAT_CLIENT_MAX_RETRIES,
+    )
     secondary_model.install_from_config(
         config,
         main_client=client,
-        client_factory=lambda api_key, base_url: OpenAI(api_key=api_key, base_url=base_url),
+        client_factory=lambda api_key, base_url: OpenAI(
+            api_key=api_key, base_url=base_url, max_retries=CHAT_CLIENT_MAX_RETRIES,
+        ),
     )
+    scheduler.install_from_config(config)
     worker = JobWorker(client, config["model"], concurrency=_job_worker_concurrency(config))
     runtime = ApiRuntime(
         config=config,
@@ -184,6 +201,7 @@ def _build_configured_runtime(config: dict) -> ApiRuntime:
         worker=worker,
         vectorstore_initialized=vectorstore_initialized,
         configured=True,
+        async_client=async_client,
     )
     return runtime
 
@@ -220,6 +238,19 @@ async def shutdown_runtime() -> None:
                 finally:
                     _runtime = None
                     secondary_model.reset()
+                    graph_client.close_shared_http_client()
+                    await _close_async_client(runtime)
+
+
+async def _close_async_client(runtime: ApiRuntime | None) -> None:
+    # Only at shutdown: after a settings reload, streams already in flight
+    # keep using the previous client until they finish.
+    if runtime is None or runtime.async_client is None:
+        return
+    try:
+        await runtime.async_client.close()
+    except Exception as exc:
+        logging_service.log_event("async_llm_client_close_failed", level="WARNING", error=str(exc))
 
 
 def _start_schedule_sync_task() -> None:
@@ -287,6 +318,7 @@ def _load_api_config(*, strict: bool = True) -> dict:
     config["proactive_message"] = normalize_proactive_message_config(
         config.get("proactive_message")
     )
+    config.update(normalize_llm_scheduler_settings(config))
     return config
 
 
@@ -296,6 +328,7 @@ def _default_api_config() -> dict:
         "vision": normalize_vision_config(None),
         "web_search": normalize_web_search_config(None),
         "proactive_message": normalize_proactive_message_config(None),
+        **normalize_llm_scheduler_settings(None),
     }
 
 
@@ -4,18 +4,36 @@ from __future__ import annotations
 
 from dataclasses import asdict
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request
 from starlette.datastructures import UploadFile
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, Response
 
 from api.deps import run_sync
 from core import attachment_service, logging_service
 
 router = APIRouter(prefix="/attachments", tags=["attachments"])
 
+# An attachment id (and each of its derivatives) always names the same bytes,
+# so clients may cache them forever and revalidate by the content hash.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# Multipart framing (boundary lines, part headers) on top of the image itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
 
 @router.post("/upload")
 async def upload_attachment(request: Request):
+    content_length = _content_length(request)
+    if content_length is not None and content_length > attachment_service.MAX_UPLOAD_IMAGE_BYTES + MULTIPART_OVERHEAD_BYTES:
+        # Refuse before the multipart parser spools the whole body to disk.
+        logging_service.log_event(
+            "attachment_upload_failed",
+            level="WARNING",
+            reason="too_large",
+            content_length=content_length,
+        )
+        raise HTTPException(status_code=413, detail=attachment_service.UPLOAD_TOO_LARGE_MESSAGE)
     try:
         form = await request.form()
     except Exception as exc:
@@ -41,15 +59,8 @@ async def upload_attachment(request: Request):
 
     filename = file.filename
     content_type = file.content_type
-    content = await file.read()
-    await file.close()
     try:
-        attachment = await run_sync(
-            attachment_service.upload_image,
-            content,
-            content_type=content_type,
-            filename=filename,
-        )
+        attachment = await _store_streamed_upload(file, content_type=content_type, filename=filename)
     except ValueError as exc:
         logging_service.log_event(
             "attachment_upload_failed",
@@ -85,13 +96,53 @@ async def upload_attachment(request: Request):
 
 
 @router.get("/{attachment_id}")
-async def get_attachment(attachment_id: str):
+async def get_attachment(request: Request, attachment_id: str, w: int | None = Query(default=None, ge=1)):
     try:
         attachment = await run_sync(attachment_service.get_attachment, attachment_id)
-        path = await run_sync(attachment_service.attachment_path, attachment_id)
+        if w is None:
+            path = await run_sync(attachment_service.attachment_path, attachment_id)
+            media_type, width = attachment.mime_type, None
+        else:
+            path, media_type, width = await run_sync(attachment_service.derivative_path, attachment_id, w)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return FileResponse(path, media_type=attachment.mime_type)
+    etag = f'"{attachment.sha256}"' if width is None else f'"{attachment.sha256}-w{width}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if _if_none_match(request) & {etag, "*"}:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+async def _store_streamed_upload(
+    file: UploadFile, *, content_type: str | None, filename: str | None
+) -> attachment_service.Attachment:
+    """Stream the part into an UploadSpool chunk by chunk (hashing as it goes and
+    stopping at the size cap), then normalize from the spool file."""
+    spool = await run_sync(attachment_service.UploadSpool)
+    try:
+        while chunk := await file.read(attachment_service.UPLOAD_CHUNK_BYTES):
+            await run_sync(spool.write, chunk)
+        return await run_sync(
+            attachment_service.upload_spooled_image,
+            spool,
+            content_type=content_type,
+            filename=filename,
+        )
+    finally:
+        await file.close()
+        await run_sync(spool.close)
+
+
+def _content_length(request: Request) -> int | None:
+    try:
+        return int(request.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _if_none_match(request: Request) -> set[str]:
+    value = request.headers.get("if-none-match") or ""
+    return {tag.strip().removeprefix("W/") for tag in value.split(",") if tag.strip()}
 
 
 def _first_upload_file(form) -> UploadFile | None:
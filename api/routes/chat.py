@@ -145,31 +145,35 @@ async def send_chat_message_stream(soul_name: str, request: SendChatMessageReque
             runtime.model,
             request.attachment_ids,
             request.request_id,
+            runtime.async_client,
         ),
         media_type="text/event-stream",
         headers={"Cache-Control": "no-cache"},
     )
 
 
-def _chat_reply_stream(
+async def _chat_reply_stream(
     thread_id: int,
     content: str,
     client: Any,
     model: str,
     attachment_ids: list[str],
     request_id: str | None,
+    async_client: Any = None,
 ):
-    """Bridge chat_service.stream_chat_reply into SSE frames. Starlette iterates
-    this sync generator in a threadpool, so its blocking work never stalls the
-    event loop."""
+    """Bridge chat_service.astream_chat_reply into SSE frames. With an async
+    client the model tokens are read on the event loop, so a client disconnect
+    cancels this generator, aborts the upstream request and frees its LLM slot;
+    the reply is then stored as failed and can be rerun."""
     try:
-        for event in chat_service.stream_chat_reply(
+        async for event in chat_service.astream_chat_reply(
             thread_id,
             content,
             client,
             model,
             attachment_ids,
             request_id=request_id,
+            async_client=async_client,
         ):
             if event["type"] == "delta":
                 yield _format_named_sse("delta", {"text": event["text"]})
@@ -274,9 +274,8 @@ def _get_post_detail(post_id: str) -> dict[str, Any] | None:
     )
     if post is None:
         return None
-    comments = [
-        _comment_row_to_dict(row)
-        for row in db.query_all(
+    comments = _comment_rows_to_dicts(
+        db.query_all(
             """
             SELECT comments.id, comments.post_id, comments.soul_name, comments.role,
                    comments.content, comments.seq, comments.metadata, comments.created_at,
@@ -295,7 +294,7 @@ def _get_post_detail(post_id: str) -> dict[str, Any] | None:
             """,
             (post_id,),
         )
-    ]
+    )
     return {
         "post": {
             "post_id": post["id"],
@@ -386,11 +385,14 @@ def _goal_activities_by_post_ids(
     return grouped
 
 
-def _comment_row_to_dict(row) -> dict[str, Any]:
-    item = dict(row)
-    item["metadata"] = suggestion_service.metadata_with_live_suggestions(item.get("metadata"))
-    item["attachments"] = [asdict(attachment) for attachment in attachment_service.list_comment_attachments(int(row["id"]))]
-    return item
+def _comment_rows_to_dicts(rows) -> list[dict[str, Any]]:
+    items = [dict(row) for row in rows]
+    metadatas = suggestion_service.metadata_with_live_suggestions_batch([item.get("metadata") for item in items])
+    attachments_by_id = attachment_service.comment_attachments_by_ids([int(item["id"]) for item in items])
+    for item, metadata in zip(items, metadatas):
+        item["metadata"] = metadata
+        item["attachments"] = [asdict(attachment) for attachment in attachments_by_id.get(int(item["id"]), [])]
+    return items
 
 
 SSE_TIMEOUT_SECONDS = 120
@@ -18,6 +18,7 @@ from api.deps import run_sync
 from core import db, file_security, logging_service, record_service, vector_index_service, vectorstore, vision_service, web_search_service
 from core.cli.config import (
     CONFIG_FILE,
+    VISION_IMAGE_SIZE_KEYS,
     default_proactive_message_config,
     default_vision_config,
     default_web_search_config,
@@ -243,6 +244,11 @@ def _write_model_settings_locked(payload: dict[str, Any]) -> dict[str, Any]:
     existing_vision = normalize_vision_config(existing.get("vision"))
     if incoming_vision.get("api_key") is None:
         incoming_vision["api_key"] = existing_vision.get("api_key")
+    # The settings page does not edit the image size bounds; keep hand-set ones.
+    raw_vision = payload.get("vision") if isinstance(payload.get("vision"), dict) else {}
+    for key in VISION_IMAGE_SIZE_KEYS:
+        if key not in raw_vision:
+            incoming_vision[key] = existing_vision[key]
 
     incoming_web_search = normalize_web_search_config(payload.get("web_search"))
     existing_web_search = normalize_web_search_config(existing.get("web_search"))
@@ -9,7 +9,7 @@ from dataclasses import dataclass
 
 from core import attachment_service, logging_service
 from core.app_services import job_service, public_post_pipeline
-from core.llm.types import LLMClient
+from core.llm.types import AsyncLLMClient, LLMClient
 
 ORPHAN_ATTACHMENT_MAX_AGE_SECONDS = 24 * 3600
 ORPHAN_ATTACHMENT_CLEANUP_INTERVAL_SECONDS = 3600
@@ -58,6 +58,7 @@ class ApiRuntime:
     worker: "JobWorker | None"
     vectorstore_initialized: bool
     configured: bool
+    async_client: AsyncLLMClient | None = None
 
 
 class JobWorker:
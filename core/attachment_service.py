@@ -1,14 +1,29 @@
-"""Local image attachment storage and linking."""
+"""Local image attachment storage and linking.
+
+Stored images are content-addressed: the file lives at a path derived from the
+sha256 of its normalized bytes, so identical uploads share one blob and each
+attachment row is a reference to it. Rows also keep the sha256 of the raw
+upload (``source_sha256``) so re-posting the same file skips decoding and
+re-encoding entirely. Blobs are deleted only when the last row referencing
+them goes (see ``cleanup_orphan_attachments``).
+"""
 
 from __future__ import annotations
 
 import hashlib
 import base64
 import io
+import math
+import multiprocessing
 import os
 import secrets
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from collections.abc import Collection
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -29,6 +44,31 @@ ALLOWED_FORMATS = {"JPEG": ("image/jpeg", ".jpg"), "PNG": ("image/png", ".png")}
 READ_FORMAT_ALIASES = {"JPEG": "JPEG", "JPG": "JPEG", "MPO": "JPEG", "PNG": "PNG"}
 COMPRESSION_TOO_LARGE_MESSAGE = "图片压缩后体积仍超过5MB！"
 JPEG_QUALITIES = (92, 88, 84, 80, 76, 72)
+# Trial encodes skip optimize=True (it only trims a few percent), so a fit is
+# accepted with this much headroom and confirmed by the one optimized encode.
+TRIAL_SIZE_HEADROOM = 0.97
+# Uploads at least this large are decoded and encoded in a worker process so
+# the Pillow work never holds the server's GIL; smaller ones are cheaper to do
+# inline than to pickle across.
+PROCESS_POOL_MIN_BYTES = 1024 * 1024
+IMAGE_ENCODE_WORKERS = 2
+UPLOAD_CHUNK_BYTES = 256 * 1024
+UPLOAD_TOO_LARGE_MESSAGE = "图片不能超过 50MB"
+# Feed-sized derivatives, generated on first request and stored next to the
+# blob as ``<blob name>.w<width>.<ext>``; content-addressed like the blob itself.
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+THUMBNAIL_QUALITY = 80
+# OpenAI vision models downsample to fit 2048x2048 and then to a 768 px short
+# side; sending more pixels than that only costs upload bytes. These are the
+# defaults; the vision settings (image_max_side / image_max_short_side) set the
+# bounds per provider. The LLM-resolution derivative is stored next to the blob
+# as ``<blob name>.llm<side>x<short side>.<ext>``.
+LLM_IMAGE_MAX_SIDE = 2048
+LLM_IMAGE_MAX_SHORT_SIDE = 768
+LLM_IMAGE_QUALITY = 85
+# Encoded data URLs kept in memory, keyed by content hash and size bounds; a
+# thread that keeps an image in history re-sends it without re-encoding.
+IMAGE_INPUT_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 
 class UnsupportedImageFormatError(ValueError):
@@ -36,6 +76,10 @@ class UnsupportedImageFormatError(ValueError):
         super().__init__("仅支持 JPEG 或 PNG 图片")
         self.image_format = image_format
 
+    def __reduce__(self):
+        # Raised inside the encode worker process; keep image_format when pickled back.
+        return (type(self), (self.image_format,))
+
 
 @dataclass(frozen=True)
 class Attachment:
@@ -50,10 +94,14 @@ class Attachment:
     linked_at: float | None
     created_at: float
     url: str
+    thumbnails: dict[str, str]
 
 
 @dataclass(frozen=True)
 class ImageInput:
+    """One image as sent to a model. Dimensions and size describe the stored
+    attachment; ``data_url`` carries the (possibly downscaled) payload."""
+
     attachment_id: str
     mime_type: str
     file_path: Path
@@ -63,53 +111,125 @@ class ImageInput:
     data_url: str
 
 
+@dataclass
+class ImageInputStats:
+    """Per-call image input cache counters, surfaced in the LLM call log.
+    ``bytes_saved`` is how much smaller the sent payloads were than the
+    stored files."""
+
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "bytes_saved": self.bytes_saved}
+
+
+class UploadSpool:
+    """Temp file an upload body is streamed into, hashed and size-checked as
+    each chunk arrives, so the raw image is never held in memory whole.
+
+    ``write`` raises ValueError as soon as the body passes
+    MAX_UPLOAD_IMAGE_BYTES; ``close`` removes the file."""
+
+    def __init__(self) -> None:
+        staging = _staging_dir()
+        staging.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix="upload-", suffix=".part", dir=staging)
+        self.path = Path(name)
+        self.size = 0
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > MAX_UPLOAD_IMAGE_BYTES:
+            raise ValueError(UPLOAD_TOO_LARGE_MESSAGE)
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> str:
+        """Flush the file and return the sha256 of everything written."""
+        self._file.close()
+        return self._hash.hexdigest()
+
+    def close(self) -> None:
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "UploadSpool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 def upload_image(file_bytes: bytes, *, content_type: str | None = None, filename: str | None = None) -> Attachment:
-    """Validate, normalize, store one JPEG/PNG image, and return its metadata."""
+    """Validate, normalize, store one JPEG/PNG image, and return its metadata.
+
+    Every upload gets its own attachment id; the stored blob is shared with any
+    earlier upload of the same raw file or the same normalized image."""
     if len(file_bytes) > MAX_UPLOAD_IMAGE_BYTES:
-        raise ValueError("图片不能超过 50MB")
+        raise ValueError(UPLOAD_TOO_LARGE_MESSAGE)
+    return _store_upload(
+        file_bytes,
+        source_sha256=hashlib.sha256(file_bytes).hexdigest(),
+        size=len(file_bytes),
+        content_type=content_type,
+        filename=filename,
+    )
+
+
+def upload_spooled_image(
+    spool: UploadSpool, *, content_type: str | None = None, filename: str | None = None
+) -> Attachment:
+    """``upload_image`` for a body streamed into an UploadSpool: Pillow (or the
+    encode worker) reads the spool file directly."""
+    return _store_upload(
+        str(spool.path),
+        source_sha256=spool.finish(),
+        size=spool.size,
+        content_type=content_type,
+        filename=filename,
+    )
+
+
+def _store_upload(
+    source: bytes | str,
+    *,
+    source_sha256: str,
+    size: int,
+    content_type: str | None,
+    filename: str | None,
+) -> Attachment:
     normalized_content_type = _normalize_content_type(content_type)
     if normalized_content_type and not _is_allowed_upload_content_type(normalized_content_type):
         raise ValueError("仅支持 JPEG 或 PNG 图片")
 
-    image, image_format = _open_image(file_bytes)
-
-    width, height = image.size
-    if width <= 0 or height <= 0:
-        raise ValueError("图片尺寸无效")
-    if width > MAX_IMAGE_SIDE or height > MAX_IMAGE_SIDE or width * height > MAX_IMAGE_PIXELS:
-        raise ValueError("图片像素尺寸过大")
+    known = _find_stored_blob("source_sha256", source_sha256)
+    if known is not None:
+        attachment = _insert_attachment_for_blob(known, source_sha256=source_sha256, filename=filename)
+        if attachment is not None:
+            return attachment
+        # The orphan sweep deleted the blob after the lookup: encode it afresh.
 
-    normalized, stored_format, width, height = _encode_stored_image(image, image_format)
-    if len(normalized) > MAX_STORED_IMAGE_BYTES:
-        raise ValueError(COMPRESSION_TOO_LARGE_MESSAGE)
+    normalized, stored_format, width, height = _normalize_upload(source, size)
     mime_type, ext = ALLOWED_FORMATS[stored_format]
 
-    attachment_id = _new_attachment_id()
-    created_at = db.now_ts()
-    relative_path = _relative_image_path(attachment_id, ext, created_at)
-    target = db.WORKSPACE_DIR / relative_path
-    target.parent.mkdir(parents=True, exist_ok=True)
-    _write_bytes_atomic(target, normalized)
-
     sha256 = hashlib.sha256(normalized).hexdigest()
-    db.execute(
-        """
-        INSERT INTO attachments(id, file_path, mime_type, file_size, width, height, sha256, original_filename, linked_at, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)
-        """,
-        (
-            attachment_id,
-            relative_path.as_posix(),
-            mime_type,
-            len(normalized),
-            width,
-            height,
-            sha256,
-            _clean_filename(filename),
-            created_at,
-        ),
+    blob = _find_stored_blob("sha256", sha256) or _StoredBlob(
+        file_path=_blob_relative_path(sha256, ext).as_posix(),
+        mime_type=mime_type,
+        file_size=len(normalized),
+        width=width,
+        height=height,
+        sha256=sha256,
     )
-    return get_attachment(attachment_id)
+    attachment = _insert_attachment_for_blob(
+        blob, source_sha256=source_sha256, filename=filename, content=normalized
+    )
+    assert attachment is not None  # content is given, so a missing blob is rewritten
+    return attachment
 
 
 def get_attachment(attachment_id: str) -> Attachment:
@@ -138,6 +258,23 @@ def attachment_path(attachment_id: str) -> Path:
     return resolved_path
 
 
+def derivative_path(attachment_id: str, width: int) -> tuple[Path, str, int | None]:
+    """Path, mime type and width of the derivative serving a request for
+    ``width`` px: the smallest thumbnail at least that wide, generated on first
+    use. Returns the original (width None) when no thumbnail is narrower than
+    the image itself."""
+    attachment = get_attachment(attachment_id)
+    original = attachment_path(attachment_id)
+    target_width = _thumbnail_width_for(width, attachment.width)
+    if target_width is None:
+        return original, attachment.mime_type, None
+    mime_type, ext = _derivative_format(attachment.mime_type)
+    path = original.with_name(f"{original.name}.w{target_width}{ext}")
+    if not path.exists():
+        _write_bytes_atomic(path, _encode_derivative(original, target_width, ext))
+    return path, mime_type, target_width
+
+
 def attach_to_post(post_id: str, attachment_ids: list[str] | None) -> None:
     ids = _normalize_attachment_ids(attachment_ids)
     if not ids:
@@ -251,6 +388,28 @@ def list_chat_message_attachments(message_id: int) -> list[Attachment]:
     )
 
 
+def chat_message_attachments_by_ids(message_ids: Collection[int]) -> dict[int, list[Attachment]]:
+    """一次取回多条私聊消息的附件，长线程渲染时不再逐条查询。"""
+    ids = sorted({int(message_id) for message_id in message_ids})
+    if not ids:
+        return {}
+    placeholders = ",".join("?" for _ in ids)
+    rows = db.query_all(
+        f"""
+        SELECT attachments.*, chat_message_attachments.message_id AS linked_message_id
+        FROM attachments
+        JOIN chat_message_attachments ON chat_message_attachments.attachment_id = attachments.id
+        WHERE chat_message_attachments.message_id IN ({placeholders})
+        ORDER BY chat_message_attachments.sort_order, attachments.created_at, attachments.id
+        """,
+        tuple(ids),
+    )
+    by_message: dict[int, list[Attachment]] = {message_id: [] for message_id in ids}
+    for row in rows:
+        by_message[int(row["linked_message_id"])].append(_row_to_attachment(row))
+    return by_message
+
+
 def validate_attachment_ids(attachment_ids: list[str] | None) -> list[str]:
     ids = _normalize_attachment_ids(attachment_ids)
     if not ids:
@@ -281,26 +440,167 @@ def content_for_llm(content: str, attachment_count: int) -> str:
     return body or notice
 
 
-def image_input_for_attachment(attachment: Attachment) -> ImageInput:
-    path = attachment_path(attachment.id)
-    encoded = base64.b64encode(path.read_bytes()).decode("ascii")
+def image_input_for_attachment(
+    attachment: Attachment,
+    *,
+    stats: ImageInputStats | None = None,
+    max_side: int = LLM_IMAGE_MAX_SIDE,
+    max_short_side: int = LLM_IMAGE_MAX_SHORT_SIDE,
+) -> ImageInput:
+    """The image as a model input, downscaled to the ``max_side`` box and
+    ``max_short_side`` (0 leaves that bound off)."""
+    bounds = (max_side, max_short_side)
+    key = f"{attachment.sha256}@{max_side}x{max_short_side}"
+    payload = _cached_image_payload(key)
+    if payload is None:
+        path, mime_type = _llm_image_source(attachment, bounds)
+        encoded = base64.b64encode(path.read_bytes()).decode("ascii")
+        payload = _ImagePayload(file_path=path, mime_type=mime_type, data_url=f"data:{mime_type};base64,{encoded}")
+        _store_image_payload(key, payload)
+        if stats is not None:
+            stats.misses += 1
+    elif stats is not None:
+        stats.hits += 1
+    if stats is not None:
+        stats.bytes_saved += max(0, attachment.file_size - payload.encoded_size)
     return ImageInput(
         attachment_id=attachment.id,
-        mime_type=attachment.mime_type,
-        file_path=path,
+        mime_type=payload.mime_type,
+        file_path=payload.file_path,
         width=attachment.width,
         height=attachment.height,
         file_size=attachment.file_size,
-        data_url=f"data:{attachment.mime_type};base64,{encoded}",
+        data_url=payload.data_url,
     )
 
 
-def image_inputs_for_attachments(attachments: list[Attachment]) -> list[ImageInput]:
-    return [image_input_for_attachment(attachment) for attachment in attachments]
+def image_inputs_for_attachments(
+    attachments: list[Attachment],
+    *,
+    stats: ImageInputStats | None = None,
+    max_side: int = LLM_IMAGE_MAX_SIDE,
+    max_short_side: int = LLM_IMAGE_MAX_SHORT_SIDE,
+) -> list[ImageInput]:
+    return [
+        image_input_for_attachment(
+            attachment, stats=stats, max_side=max_side, max_short_side=max_short_side
+        )
+        for attachment in attachments
+    ]
+
+
+def clear_image_input_cache() -> None:
+    global _image_payload_bytes
+    with _image_payload_lock:
+        _image_payloads.clear()
+        _image_payload_bytes = 0
+
+
+@dataclass(frozen=True)
+class _ImagePayload:
+    file_path: Path
+    mime_type: str
+    data_url: str
+
+    @property
+    def encoded_size(self) -> int:
+        # base64 inflates by 4/3; report the decoded payload size.
+        return (len(self.data_url) - self.data_url.index(",") - 1) * 3 // 4
+
+
+_image_payloads: OrderedDict[str, _ImagePayload] = OrderedDict()
+_image_payload_bytes = 0
+_image_payload_lock = threading.Lock()
+
+
+def _cached_image_payload(key: str) -> _ImagePayload | None:
+    with _image_payload_lock:
+        payload = _image_payloads.get(key)
+        if payload is None:
+            return None
+        if not payload.file_path.exists():
+            # Blob swept since it was cached; rebuild from the current row.
+            _drop_image_payload(key)
+            return None
+        _image_payloads.move_to_end(key)
+        return payload
+
+
+def _store_image_payload(key: str, payload: _ImagePayload) -> None:
+    global _image_payload_bytes
+    size = len(payload.data_url)
+    if size > IMAGE_INPUT_CACHE_MAX_BYTES:
+        return
+    with _image_payload_lock:
+        _drop_image_payload(key)
+        _image_payloads[key] = payload
+        _image_payload_bytes += size
+        while _image_payload_bytes > IMAGE_INPUT_CACHE_MAX_BYTES and _image_payloads:
+            _drop_image_payload(next(iter(_image_payloads)))
+
+
+def _drop_image_payload(key: str) -> None:
+    global _image_payload_bytes
+    payload = _image_payloads.pop(key, None)
+    if payload is not None:
+        _image_payload_bytes -= len(payload.data_url)
+
+
+def _llm_image_source(attachment: Attachment, bounds: tuple[int, int]) -> tuple[Path, str]:
+    """The file to send to a model: the LLM-resolution derivative when the
+    image is larger than ``bounds`` and the derivative is smaller, otherwise
+    the stored original."""
+    original = attachment_path(attachment.id)
+    size = _llm_image_size(attachment.width, attachment.height, bounds)
+    if size is None:
+        return original, attachment.mime_type
+    mime_type, ext = ("image/png", ".png") if attachment.mime_type == "image/png" else ("image/jpeg", ".jpg")
+    path = original.with_name(f"{original.name}.llm{bounds[0]}x{bounds[1]}{ext}")
+    if not path.exists():
+        encoded = _encode_llm_image(original, size, ext)
+        if len(encoded) >= attachment.file_size:
+            return original, attachment.mime_type
+        _write_bytes_atomic(path, encoded)
+    return path, mime_type
+
+
+def _llm_image_size(width: int, height: int, bounds: tuple[int, int]) -> tuple[int, int] | None:
+    max_side, max_short_side = bounds
+    scale = 1.0
+    if max_side > 0:
+        scale = min(scale, max_side / max(width, height))
+    if max_short_side > 0:
+        scale = min(scale, max_short_side / max(1, min(width, height)))
+    if scale >= 1.0:
+        return None
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _encode_llm_image(source: Path, size: tuple[int, int], ext: str) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError("Pillow is required for image inputs") from exc
+    with Image.open(source) as image:
+        if image.format == "JPEG":
+            image.draft("RGB", size)
+        image.load()
+        keep_alpha = ext == ".png" and _has_transparency(image)
+        resized = image.convert("RGBA" if keep_alpha else "RGB").resize(size, Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    if ext == ".png":
+        resized.save(output, format="PNG")
+    else:
+        resized.save(output, format="JPEG", quality=LLM_IMAGE_QUALITY)
+    return output.getvalue()
 
 
 def cleanup_orphan_attachments(max_age_seconds: float = 24 * 3600) -> int:
+    """Delete expired never-linked attachments; a shared blob is unlinked only
+    together with the last row that references it. Upload spools left in the
+    staging directory by a crash or kill are swept with the same age limit."""
     cutoff = db.now_ts() - max_age_seconds
+    _sweep_stale_spools(cutoff)
     rows = db.query_all(
         """
         SELECT id, file_path
@@ -311,18 +611,182 @@ def cleanup_orphan_attachments(max_age_seconds: float = 24 * 3600) -> int:
     )
     removed = 0
     for row in rows:
-        path = db.WORKSPACE_DIR / row["file_path"]
+        # Immediate transaction: an upload reusing this blob cannot slip in
+        # between the reference count and the unlink.
+        with db.immediate_transaction() as conn:
+            references = conn.execute(
+                "SELECT COUNT(*) FROM attachments WHERE file_path = ? AND id != ?",
+                (row["file_path"], row["id"]),
+            ).fetchone()[0]
+            if not references:
+                path = db.WORKSPACE_DIR / row["file_path"]
+                try:
+                    if path.exists():
+                        path.unlink()
+                    for derivative in path.parent.glob(f"{path.name}.*"):
+                        derivative.unlink()
+                except OSError:
+                    continue
+            conn.execute("DELETE FROM attachments WHERE id = ?", (row["id"],))
+        removed += 1
+    return removed
+
+
+def _staging_dir() -> Path:
+    return db.WORKSPACE_DIR / "attachments" / "staging"
+
+
+def _sweep_stale_spools(cutoff: float) -> None:
+    staging = _staging_dir()
+    if not staging.is_dir():
+        return
+    for path in staging.glob("upload-*.part"):
         try:
-            if path.exists():
+            if path.stat().st_mtime < cutoff:
                 path.unlink()
         except OSError:
             continue
-        db.execute("DELETE FROM attachments WHERE id = ?", (row["id"],))
-        removed += 1
-    return removed
 
 
-def _open_image(file_bytes: bytes):
+@dataclass(frozen=True)
+class _StoredBlob:
+    file_path: str
+    mime_type: str
+    file_size: int
+    width: int
+    height: int
+    sha256: str
+
+
+def _find_stored_blob(column: str, digest: str) -> _StoredBlob | None:
+    """An existing attachment's blob whose ``column`` (sha256 / source_sha256)
+    matches and whose file is still on disk."""
+    rows = db.query_all(
+        f"""
+        SELECT DISTINCT file_path, mime_type, file_size, width, height, sha256
+        FROM attachments
+        WHERE {column} = ?
+        """,
+        (digest,),
+    )
+    for row in rows:
+        if (db.WORKSPACE_DIR / row["file_path"]).exists():
+            return _StoredBlob(
+                file_path=row["file_path"],
+                mime_type=row["mime_type"],
+                file_size=int(row["file_size"]),
+                width=int(row["width"]),
+                height=int(row["height"]),
+                sha256=row["sha256"],
+            )
+    return None
+
+
+def _insert_attachment_for_blob(
+    blob: _StoredBlob,
+    *,
+    source_sha256: str,
+    filename: str | None,
+    content: bytes | None = None,
+) -> Attachment | None:
+    """Reference ``blob`` from a new attachment row. Returns None, inserting
+    nothing, when the file is gone and there is no ``content`` to rewrite it."""
+    attachment_id = _new_attachment_id()
+    target = db.WORKSPACE_DIR / blob.file_path
+    # Same lock as cleanup_orphan_attachments: the blob is (re)written and
+    # referenced atomically with respect to the orphan sweep.
+    with db.immediate_transaction() as conn:
+        if not target.exists():
+            if content is None:
+                return None
+            target.parent.mkdir(parents=True, exist_ok=True)
+            _write_bytes_atomic(target, content)
+        conn.execute(
+            """
+            INSERT INTO attachments(
+                id, file_path, mime_type, file_size, width, height, sha256,
+                source_sha256, original_filename, linked_at, created_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)
+            """,
+            (
+                attachment_id,
+                blob.file_path,
+                blob.mime_type,
+                blob.file_size,
+                blob.width,
+                blob.height,
+                blob.sha256,
+                source_sha256,
+                _clean_filename(filename),
+                db.now_ts(),
+            ),
+        )
+    return get_attachment(attachment_id)
+
+
+def _normalize_upload(source: bytes | str, size: int) -> tuple[bytes, str, int, int]:
+    """``source`` is the raw body or the path of a spooled one; a path crosses
+    to the encode worker as a string instead of megabytes of pickled bytes."""
+    limit = MAX_STORED_IMAGE_BYTES
+    if size < PROCESS_POOL_MIN_BYTES or IMAGE_ENCODE_WORKERS <= 0:
+        return _normalize_image(source, limit)
+    executor = _encode_executor()
+    if executor is None:
+        return _normalize_image(source, limit)
+    try:
+        return executor.submit(_normalize_image, source, limit).result()
+    except BrokenProcessPool:
+        # A worker died (OOM kill, crash); rebuild the pool next time and
+        # finish this upload inline rather than failing it.
+        _reset_encode_executor(executor)
+        return _normalize_image(source, limit)
+
+
+_encode_pool: ProcessPoolExecutor | None = None
+_encode_pool_lock = threading.Lock()
+
+
+def _encode_executor() -> ProcessPoolExecutor | None:
+    global _encode_pool
+    with _encode_pool_lock:
+        if _encode_pool is None:
+            try:
+                # spawn, not fork: the server process runs threads.
+                _encode_pool = ProcessPoolExecutor(
+                    max_workers=IMAGE_ENCODE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError, ValueError):
+                return None
+        return _encode_pool
+
+
+def _reset_encode_executor(executor: ProcessPoolExecutor) -> None:
+    global _encode_pool
+    with _encode_pool_lock:
+        if _encode_pool is executor:
+            _encode_pool = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _normalize_image(source: bytes | str, limit: int) -> tuple[bytes, str, int, int]:
+    """Decode, validate and re-encode one upload under ``limit`` bytes. Runs in
+    the encode worker process, so it takes every tunable it needs as input."""
+    image, image_format = _open_image(source)
+    normalized, stored_format, width, height = _encode_stored_image(image, image_format, limit)
+    if len(normalized) > limit:
+        raise ValueError(COMPRESSION_TOO_LARGE_MESSAGE)
+    return normalized, stored_format, width, height
+
+
+def _open_image(source: bytes | str):
+    """Open, validate and decode an upload (raw bytes or a file path).
+
+    Dimensions are checked from the header before any pixel is decoded, and a
+    JPEG larger than the stored cap is decoded straight at reduced scale via
+    ``Image.draft`` (DCT scaling, never below MAX_COMPRESSED_IMAGE_SIDE), so a
+    huge photo is never materialized at full resolution."""
     try:
         from PIL import Image, ImageOps
         from PIL.Image import DecompressionBombError
@@ -331,13 +795,22 @@ def _open_image(file_bytes: bytes):
 
     Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
     try:
-        with Image.open(io.BytesIO(file_bytes)) as image:
-            image.load()
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
             image_format = _normalize_image_format(image.format)
             if image_format is None:
                 raise UnsupportedImageFormatError(image.format)
+            width, height = image.size
+            if width <= 0 or height <= 0:
+                raise ValueError("图片尺寸无效")
+            if width > MAX_IMAGE_SIDE or height > MAX_IMAGE_SIDE or width * height > MAX_IMAGE_PIXELS:
+                raise ValueError("图片像素尺寸过大")
+            scale = MAX_COMPRESSED_IMAGE_SIDE / max(width, height)
+            if image_format == "JPEG" and scale < 1.0:
+                image.draft(image.mode, (max(1, int(width * scale)), max(1, int(height * scale))))
+            image.load()
             normalized = ImageOps.exif_transpose(image)
-            return normalized.copy(), image_format
+            # exif_transpose already returns a detached image; avoid a second full copy.
+            return (normalized if normalized is not image else image.copy()), image_format
     except DecompressionBombError as exc:
         raise ValueError("图片像素尺寸过大") from exc
     except ValueError:
@@ -346,53 +819,111 @@ def _open_image(file_bytes: bytes):
         raise ValueError("图片文件无效") from exc
 
 
-def _encode_stored_image(image, image_format: str) -> tuple[bytes, str, int, int]:
+def _encode_stored_image(image, image_format: str, limit: int) -> tuple[bytes, str, int, int]:
     if image_format == "JPEG":
-        return _encode_jpeg_to_limit(image.convert("RGB"))
+        return _encode_jpeg_to_limit(image.convert("RGB"), limit)
     if image_format == "PNG":
         if _has_transparency(image):
-            return _encode_transparent_png_to_limit(image.convert("RGBA"))
+            return _encode_transparent_png_to_limit(image.convert("RGBA"), limit)
         png_image = image.convert("RGB")
-        encoded = _encode_png(png_image)
-        if len(encoded) <= MAX_STORED_IMAGE_BYTES:
-            width, height = png_image.size
-            return encoded, "PNG", width, height
-        return _encode_jpeg_to_limit(png_image)
+        # optimize=True rarely saves more than a few percent: only pay for it
+        # when that could be the difference between keeping PNG and going JPEG.
+        if len(_encode_png(png_image, optimize=False)) <= limit / TRIAL_SIZE_HEADROOM:
+            encoded = _encode_png(png_image)
+            if len(encoded) <= limit:
+                width, height = png_image.size
+                return encoded, "PNG", width, height
+        return _encode_jpeg_to_limit(png_image, limit)
     raise ValueError("仅支持 JPEG 或 PNG 图片")
 
 
-def _encode_jpeg_to_limit(image) -> tuple[bytes, str, int, int]:
-    for candidate in _compression_candidates(image):
-        for quality in JPEG_QUALITIES:
+def _encode_jpeg_to_limit(image, limit: int) -> tuple[bytes, str, int, int]:
+    """Plan the (scale, quality) pair with cheap trial encodes, then encode it
+    once with optimize=True (the top quality at the initial scale is tried
+    directly, since it usually fits).
+
+    Each scale step binary-searches JPEG_QUALITIES for the best quality whose
+    trial fits; when even the lowest quality is too big, the next scale is
+    estimated from the overshoot (JPEG size tracks pixel count), so a huge
+    photo converges in a couple of steps instead of walking 0.85x at a time."""
+    candidate = _initial_candidate(image)
+    # Most photos fit at the top quality once capped to MAX_COMPRESSED_IMAGE_SIDE:
+    # that case costs exactly one (final) encode.
+    encoded = _encode_jpeg(candidate, JPEG_QUALITIES[0])
+    if len(encoded) <= limit:
+        width, height = candidate.size
+        return encoded, "JPEG", width, height
+    while True:
+        fits, smallest = _best_jpeg_quality(candidate, limit)
+        for quality in JPEG_QUALITIES[fits:] if fits is not None else ():
             encoded = _encode_jpeg(candidate, quality)
-            if len(encoded) <= MAX_STORED_IMAGE_BYTES:
+            if len(encoded) <= limit:
                 width, height = candidate.size
                 return encoded, "JPEG", width, height
-    raise ValueError(COMPRESSION_TOO_LARGE_MESSAGE)
+        candidate = _next_candidate(image, candidate, smallest, limit)
+        if candidate is None:
+            raise ValueError(COMPRESSION_TOO_LARGE_MESSAGE)
+
+
+def _best_jpeg_quality(image, limit: int) -> tuple[int | None, int]:
+    """Index into JPEG_QUALITIES of the highest quality whose trial encode
+    fits (None if none does), and the smallest trial size seen."""
+    low, high = 0, len(JPEG_QUALITIES) - 1
+    best: int | None = None
+    smallest = math.inf
+    while low <= high:
+        middle = (low + high) // 2
+        size = len(_encode_jpeg(image, JPEG_QUALITIES[middle], optimize=False))
+        smallest = min(smallest, size)
+        if size <= limit * TRIAL_SIZE_HEADROOM:
+            best, high = middle, middle - 1
+        else:
+            low = middle + 1
+    if best is None and smallest <= limit:
+        # Only the optimized encode can tell; let the caller try the lowest quality.
+        best = len(JPEG_QUALITIES) - 1
+    return best, int(smallest)
 
 
-def _encode_transparent_png_to_limit(image) -> tuple[bytes, str, int, int]:
-    for candidate in _compression_candidates(image):
-        encoded = _encode_png(candidate)
-        if len(encoded) <= MAX_STORED_IMAGE_BYTES:
-            width, height = candidate.size
-            return encoded, "PNG", width, height
-    raise ValueError(COMPRESSION_TOO_LARGE_MESSAGE)
+def _encode_transparent_png_to_limit(image, limit: int) -> tuple[bytes, str, int, int]:
+    candidate = _initial_candidate(image)
+    while True:
+        size = len(_encode_png(candidate, optimize=False))
+        if size <= limit / TRIAL_SIZE_HEADROOM:
+            encoded = _encode_png(candidate)
+            if len(encoded) <= limit:
+                width, height = candidate.size
+                return encoded, "PNG", width, height
+            size = max(size, len(encoded))
+        candidate = _next_candidate(image, candidate, size, limit)
+        if candidate is None:
+            raise ValueError(COMPRESSION_TOO_LARGE_MESSAGE)
 
 
-def _compression_candidates(image):
+def _initial_candidate(image):
     width, height = image.size
     scale = min(1.0, MAX_COMPRESSED_IMAGE_SIDE / max(width, height))
-    while True:
-        next_width = max(1, int(width * scale))
-        next_height = max(1, int(height * scale))
-        if (next_width, next_height) == image.size:
-            yield image
-        else:
-            yield _resize_image(image, next_width, next_height)
-        if max(next_width, next_height) <= MIN_COMPRESSED_IMAGE_SIDE:
-            break
-        scale *= 0.85
+    if scale >= 1.0:
+        return image
+    return _resize_image(image, max(1, int(width * scale)), max(1, int(height * scale)))
+
+
+def _next_candidate(original, current, encoded_size: int, limit: int):
+    """Downscale so the encoded size should land just under ``limit``: bytes
+    scale roughly with pixel count, so sides shrink by sqrt(limit / size).
+    Always shrinks at least 10%; None once the image is at the minimum side."""
+    width, height = current.size
+    if max(width, height) <= MIN_COMPRESSED_IMAGE_SIDE:
+        return None
+    ratio = math.sqrt(limit * TRIAL_SIZE_HEADROOM / max(encoded_size, 1))
+    ratio = max(0.25, min(0.9, ratio))
+    floor = MIN_COMPRESSED_IMAGE_SIDE / max(width, height)
+    ratio = max(ratio, min(1.0, floor))
+    next_width = max(1, int(width * ratio))
+    next_height = max(1, int(height * ratio))
+    # Resample from the original, not the previous candidate, to avoid
+    # compounding resize blur across steps.
+    return _resize_image(original, next_width, next_height)
 
 
 def _resize_image(image, width: int, height: int):
@@ -403,15 +934,60 @@ def _resize_image(image, width: int, height: int):
     return image.resize((width, height), Image.Resampling.LANCZOS)
 
 
-def _encode_jpeg(image, quality: int) -> bytes:
+def _encode_jpeg(image, quality: int, *, optimize: bool = True) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality, optimize=optimize)
+    return output.getvalue()
+
+
+def _encode_png(image, *, optimize: bool = True) -> bytes:
     output = io.BytesIO()
-    image.save(output, format="JPEG", quality=quality, optimize=True)
+    image.save(output, format="PNG", optimize=optimize)
     return output.getvalue()
 
 
-def _encode_png(image) -> bytes:
+def _thumbnail_width_for(requested: int, original_width: int) -> int | None:
+    for width in THUMBNAIL_WIDTHS:
+        if width >= original_width:
+            return None
+        if width >= requested:
+            return width
+    return None
+
+
+def _derivative_format(mime_type: str) -> tuple[str, str]:
+    try:
+        from PIL import features
+    except ImportError as exc:
+        raise RuntimeError("Pillow is required for image thumbnails") from exc
+    if features.check("webp"):
+        return "image/webp", ".webp"
+    if mime_type == "image/png":
+        return "image/png", ".png"
+    return "image/jpeg", ".jpg"
+
+
+def _encode_derivative(source: Path, width: int, ext: str) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError("Pillow is required for image thumbnails") from exc
+    with Image.open(source) as image:
+        if image.format == "JPEG":
+            image.draft("RGB", (width, max(1, image.height * width // image.width)))
+        image.load()
+        height = max(1, round(image.height * width / image.width))
+        keep_alpha = ext != ".jpg" and _has_transparency(image)
+        resized = image.convert("RGBA" if keep_alpha else "RGB").resize(
+            (width, height), Image.Resampling.LANCZOS
+        )
     output = io.BytesIO()
-    image.save(output, format="PNG", optimize=True)
+    if ext == ".webp":
+        resized.save(output, format="WEBP", quality=THUMBNAIL_QUALITY, method=4)
+    elif ext == ".png":
+        resized.save(output, format="PNG", optimize=True)
+    else:
+        resized.save(output, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
     return output.getvalue()
 
 
@@ -434,13 +1010,12 @@ def _new_attachment_id() -> str:
     return f"att_{int(time.time() * 1000)}_{secrets.token_urlsafe(8)}"
 
 
-def _relative_image_path(attachment_id: str, ext: str, created_at: float) -> Path:
-    stamp = time.localtime(created_at)
-    return Path("attachments") / "images" / f"{stamp.tm_year:04d}" / f"{stamp.tm_mon:02d}" / f"{attachment_id}{ext}"
+def _blob_relative_path(sha256: str, ext: str) -> Path:
+    return Path("attachments") / "blobs" / sha256[:2] / f"{sha256}{ext}"
 
 
 def _write_bytes_atomic(path: Path, content: bytes) -> None:
-    tmp = path.with_name(path.name + ".tmp")
+    tmp = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
     tmp.write_bytes(content)
     os.replace(tmp, path)
 
@@ -514,4 +1089,9 @@ def _row_to_attachment(row) -> Attachment:
         linked_at=float(row["linked_at"]) if row["linked_at"] is not None else None,
         created_at=float(row["created_at"]),
         url=f"/attachments/{row['id']}",
+        thumbnails={
+            str(width): f"/attachments/{row['id']}?w={width}"
+            for width in THUMBNAIL_WIDTHS
+            if width < int(row["width"])
+        },
     )
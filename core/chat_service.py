@@ -2,23 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import queue
 import sqlite3
 import threading
-from collections.abc import Callable, Iterator
-from contextlib import nullcontext
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import ExitStack, nullcontext
 from dataclasses import asdict, dataclass, field, replace
 from core import attachment_service, db, goal_service, logging_service, memory_events_service, memory_read, memory_unit_service, query_rewriter, record_service, reply_context, schedule_context, soul_service, suggestion_pipeline, suggestion_service, vision_service
 from core.app_services import job_service
 from core.attachment_service import Attachment
 from core.llm import reply_router
-from core.llm.types import LLMClient
+from core.llm.types import AsyncLLMClient, LLMClient
 from core.soul_service import SoulContext
 
 CHAT_HISTORY_LIMIT = 20
 _REQUEST_LOCKS = tuple(threading.Lock() for _ in range(64))
-_THREAD_TURN_LOCKS = tuple(threading.RLock() for _ in range(64))
+# Plain locks, not RLocks: an async streamed turn takes its stripe on one
+# executor thread and releases it from another once the reply is persisted.
+_THREAD_TURN_LOCKS = tuple(threading.Lock() for _ in range(64))
+_TURN_FINISHED = object()
+STREAM_CANCELLED_ERROR = "连接已断开，回复已停止"
 
 
 @dataclass(frozen=True)
@@ -270,7 +275,7 @@ def list_thread_messages(thread_id: int, limit: int = 30, *, before_message_id:
         """,
         tuple(params),
     )
-    return [_message_from_row(row) for row in reversed(rows)]
+    return _messages_from_rows(reversed(rows))
 
 
 def list_thread_messages_after(thread_id: int, after_id: int, limit: int = 100) -> list[ChatMessage]:
@@ -287,7 +292,7 @@ def list_thread_messages_after(thread_id: int, after_id: int, limit: int = 100)
         """,
         (thread_id, max(0, int(after_id)), max(1, min(int(limit), 100))),
     )
-    return [_message_from_row(row) for row in rows]
+    return _messages_from_rows(rows)
 
 
 def _normalize_client_request_id(request_id: str | None) -> str | None:
@@ -591,13 +596,268 @@ def stream_chat_reply(
     dicts: ``{"type": "delta", "text": ...}`` per incremental chunk, then a final
     ``{"type": "done", "result": <ChatReplyResult dict>}`` emitted only after all
     post-processing (persist, suggestions, memory accounting) has finished."""
-    attachment_ids = attachment_service.validate_attachment_ids(attachment_ids)
-    normalized_request_id = _normalize_client_request_id(request_id)
     event_queue: queue.Queue = queue.Queue()
-    sentinel = object()
+    _start_chat_reply_turn(
+        thread_id,
+        content,
+        client,
+        model,
+        attachment_ids,
+        request_id=request_id,
+        emit=event_queue.put,
+    )
+    while True:
+        event = event_queue.get()
+        if event is _TURN_FINISHED:
+            return
+        if event["type"] == "error":
+            raise event["exception"]
+        yield event
+
+
+async def astream_chat_reply(
+    thread_id: int,
+    content: str,
+    client: LLMClient,
+    model: str,
+    attachment_ids: list[str] | None = None,
+    *,
+    request_id: str | None = None,
+    async_client: AsyncLLMClient | None = None,
+) -> AsyncIterator[dict]:
+    """Event-loop sibling of ``stream_chat_reply`` with the same event sequence.
+
+    With ``async_client`` the model stream runs on the event loop itself: the
+    blocking turn setup and the post-processing each borrow an executor thread
+    only for their own duration, and no thread waits on the token stream.
+    Closing or cancelling this generator mid-stream (a disconnected SSE
+    consumer) stops generation upstream, frees the scheduler slot and records
+    the turn as a failed reply the user can rerun.
+
+    Without one, the synchronous client streams on a turn owner thread whose
+    events are relayed here; a disconnect then ends only the relay."""
+    if async_client is None:
+        async for event in _arelay_chat_reply_turn(
+            thread_id, content, client, model, attachment_ids, request_id=request_id
+        ):
+            yield event
+        return
+
+    loop = asyncio.get_running_loop()
+    begun = loop.run_in_executor(
+        None,
+        lambda: _begin_stream_turn(thread_id, content, client, model, attachment_ids, request_id),
+    )
+    try:
+        turn = await asyncio.shield(begun)
+    except asyncio.CancelledError:
+        begun.add_done_callback(lambda done: _abandon_begun_turn(loop, done))
+        raise
+    if isinstance(turn, ChatReplyResult):  # idempotent replay of a finished turn
+        yield {"type": "done", "result": asdict(turn)}
+        return
+
+    data: dict | None = None
+    stream_error: str | None = None
+    if turn.messages is not None:
+        events: asyncio.Queue = asyncio.Queue()
+        stream = asyncio.ensure_future(
+            reply_router.acall_soul_chat_reply_stream(
+                async_client,
+                model,
+                turn.messages,
+                on_delta=lambda text: events.put_nowait({"type": "delta", "text": text}),
+                trace_context=turn.trace_context,
+            )
+        )
+        stream.add_done_callback(lambda _: events.put_nowait(_TURN_FINISHED))
+        try:
+            while (event := await events.get()) is not _TURN_FINISHED:
+                yield event
+        except BaseException:
+            # CancelledError or GeneratorExit: the consumer is gone. A reply
+            # that already streamed in full is still kept.
+            if stream.done() and not stream.cancelled() and stream.exception() is None:
+                loop.run_in_executor(None, _finish_stream_turn, turn, stream.result(), None, client, model)
+            else:
+                stream.cancel()
+                loop.run_in_executor(None, _abandon_stream_turn, turn)
+            raise
+        try:
+            data = stream.result()
+        except Exception as exc:  # any stream failure still gets the non-stream fallback
+            stream_error = str(exc)
+    # Once post-processing starts it runs to completion and releases the turn
+    # locks itself, even if this consumer is cancelled while awaiting it.
+    finished = loop.run_in_executor(
+        None, lambda: _finish_stream_turn(turn, data, stream_error, client, model)
+    )
+    result = await asyncio.shield(finished)
+    yield {"type": "done", "result": asdict(result)}
+
+
+async def _arelay_chat_reply_turn(
+    thread_id: int,
+    content: str,
+    client: LLMClient,
+    model: str,
+    attachment_ids: list[str] | None,
+    *,
+    request_id: str | None,
+) -> AsyncIterator[dict]:
+    loop = asyncio.get_running_loop()
+    event_queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(event) -> None:
+        try:
+            loop.call_soon_threadsafe(event_queue.put_nowait, event)
+        except RuntimeError:
+            pass  # loop already closed: nobody is listening, the owner keeps going
+
+    _start_chat_reply_turn(
+        thread_id,
+        content,
+        client,
+        model,
+        attachment_ids,
+        request_id=request_id,
+        emit=emit,
+    )
+    while True:
+        event = await event_queue.get()
+        if event is _TURN_FINISHED:
+            return
+        if event["type"] == "error":
+            raise event["exception"]
+        yield event
+
+
+@dataclass
+class _StreamTurn:
+    """A streamed turn between setup and persistence. ``locks`` holds the thread
+    and request stripes until ``_finish_stream_turn`` or ``_abandon_stream_turn``
+    closes it."""
+
+    locks: ExitStack
+    user_message: ChatMessage
+    chat_context: ChatContext
+    messages: list[dict[str, str]] | None
+    trace_context: dict
+    total_started: float
+    reply_started: float
+
+
+def _begin_stream_turn(
+    thread_id: int,
+    content: str,
+    client: LLMClient,
+    model: str,
+    attachment_ids: list[str] | None,
+    request_id: str | None,
+) -> _StreamTurn | ChatReplyResult:
+    """Blocking setup of an async streamed turn: take the locks, persist the
+    user message and assemble the reply prompt. Locks stay held on return,
+    except for an idempotent replay, which returns the persisted result."""
+    valid_attachment_ids = attachment_service.validate_attachment_ids(attachment_ids)
+    normalized_request_id = _normalize_client_request_id(request_id)
+    locks = ExitStack()
+    try:
+        locks.enter_context(_thread_turn_lock(thread_id))
+        locks.enter_context(_request_lock(normalized_request_id))
+        user_message_row = append_user_message(
+            thread_id,
+            content,
+            attachment_ids=valid_attachment_ids,
+            client_request_id=normalized_request_id,
+        )
+        existing = _reply_result_for_request(user_message_row)
+        if existing is not None:
+            locks.close()
+            return existing
+        total_started = db.now_ts()
+        llm_user_message = vision_service.content_for_llm(user_message_row.content, user_message_row.attachments)
+        chat_context = build_chat_context(user_message_row.thread_id, llm_user_message, client, model)
+        return _StreamTurn(
+            locks=locks,
+            user_message=user_message_row,
+            chat_context=chat_context,
+            messages=reply_router.chat_reply_messages(chat_context, chat_context.soul),
+            trace_context=_reply_trace_context(user_message_row, chat_context),
+            total_started=total_started,
+            reply_started=db.now_ts(),
+        )
+    except BaseException:
+        locks.close()
+        raise
+
+
+def _finish_stream_turn(
+    turn: _StreamTurn,
+    data: dict | None,
+    stream_error: str | None,
+    client: LLMClient,
+    model: str,
+) -> ChatReplyResult:
+    try:
+        return _complete_streamed_reply(
+            turn.chat_context,
+            turn.user_message,
+            data,
+            stream_error,
+            client,
+            model,
+            trace_context=turn.trace_context,
+            reply_started=turn.reply_started,
+            total_started=turn.total_started,
+        )
+    finally:
+        turn.locks.close()
+
+
+def _abandon_stream_turn(turn: _StreamTurn) -> None:
+    """The consumer left mid-stream: record a failed reply (rerunnable, like any
+    other failure) so the user message is not left dangling, then unlock."""
+    try:
+        logging_service.log_event(
+            "reply_stream_cancelled",
+            channel="chat",
+            thread_id=turn.user_message.thread_id,
+            soul_name=turn.chat_context.thread.soul_name,
+            user_message_id=turn.user_message.id,
+        )
+        _failed_result(turn.chat_context.thread, turn.user_message, STREAM_CANCELLED_ERROR)
+    finally:
+        turn.locks.close()
+
+
+def _abandon_begun_turn(loop: asyncio.AbstractEventLoop, begun: asyncio.Future) -> None:
+    if begun.cancelled() or begun.exception() is not None:
+        return
+    turn = begun.result()
+    if isinstance(turn, _StreamTurn):
+        loop.run_in_executor(None, _abandon_stream_turn, turn)
+
+
+def _start_chat_reply_turn(
+    thread_id: int,
+    content: str,
+    client: LLMClient,
+    model: str,
+    attachment_ids: list[str] | None,
+    *,
+    request_id: str | None,
+    emit: Callable[[object], None],
+) -> None:
+    """Run one streamed turn on its own owner thread, pushing events to ``emit``.
+
+    The owner survives a disconnected consumer. It retains the thread lock from
+    the user write through assistant persistence and post-processing; consumers
+    only drain what ``emit`` hands them, ending with ``_TURN_FINISHED``."""
 
     def run_turn() -> None:
         try:
+            valid_attachment_ids = attachment_service.validate_attachment_ids(attachment_ids)
+            normalized_request_id = _normalize_client_request_id(request_id)
             # A client retry can reuse one request_id on a different thread;
             # every complete turn takes the thread stripe before that shared
             # request stripe, so those two requests cannot form a lock cycle.
@@ -606,90 +866,84 @@ def stream_chat_reply(
                     user_message_row = append_user_message(
                         thread_id,
                         content,
-                        attachment_ids=attachment_ids,
+                        attachment_ids=valid_attachment_ids,
                         client_request_id=normalized_request_id,
                     )
                     existing = _reply_result_for_request(user_message_row)
                     if existing is not None:
-                        event_queue.put({"type": "done", "result": asdict(existing)})
+                        emit({"type": "done", "result": asdict(existing)})
                     else:
-                        for event in _stream_assistant_reply_for_user_message(
-                            user_message_row, client, model
-                        ):
-                            event_queue.put(event)
+                        _stream_assistant_reply_for_user_message(user_message_row, client, model, emit)
         except Exception as exc:
             # The workspace disk can fill after the streamed reply completes but
             # before _append_message inserts it; wake a still-connected consumer
-            # instead of leaving it blocked on this queue forever.
-            event_queue.put({"type": "error", "exception": exc})
+            # instead of leaving it blocked forever.
+            emit({"type": "error", "exception": exc})
         finally:
-            event_queue.put(sentinel)
+            emit(_TURN_FINISHED)
 
-    # The owner survives a disconnected HTTP generator. It retains the thread
-    # lock from the user write through assistant persistence and post-processing;
-    # this generator only consumes the owner queue.
     owner = threading.Thread(target=run_turn, daemon=True)
     owner.start()
-    while True:
-        event = event_queue.get()
-        if event is sentinel:
-            return
-        if event["type"] == "error":
-            raise event["exception"]
-        yield event
 
 
 def _stream_assistant_reply_for_user_message(
     user_message_row: ChatMessage,
     client: LLMClient,
     model: str,
-) -> Iterator[dict]:
+    emit: Callable[[dict], None],
+) -> None:
     total_started = db.now_ts()
     llm_user_message = vision_service.content_for_llm(user_message_row.content, user_message_row.attachments)
     chat_context = build_chat_context(user_message_row.thread_id, llm_user_message, client, model)
     trace_context = _reply_trace_context(user_message_row, chat_context)
     reply_started = db.now_ts()
 
-    # The router streams via an on_delta callback (blocking until done); bridge
-    # that push-model into this pull-model generator with a queue + worker thread
-    # so deltas reach the owner incrementally. Only the LLM call runs on the
-    # worker; every DB write stays on the owner thread, after the join.
-    delta_queue: queue.Queue = queue.Queue()
-    sentinel = object()
-    outcome: dict = {}
-
-    def on_delta(text: str) -> None:
-        delta_queue.put(text)
-
-    def run_stream() -> None:
-        try:
-            outcome["data"] = reply_router.call_soul_chat_reply_stream(
-                client,
-                model,
-                chat_context,
-                chat_context.soul,
-                on_delta=on_delta,
-                trace_context=trace_context,
-            )
-        except reply_router.ChatReplyStreamError as exc:
-            outcome["data"] = None
-            outcome["stream_error"] = str(exc)
-        except Exception as exc:  # defensive: never let a worker crash strand the queue
-            outcome["data"] = None
-            outcome["stream_error"] = str(exc)
-        finally:
-            delta_queue.put(sentinel)
+    # The router invokes on_delta from inside its blocking stream loop, which
+    # already runs on the turn owner thread, so deltas go straight to the
+    # consumer and every DB write below still happens on this one thread.
+    stream_error: str | None = None
+    try:
+        data = reply_router.call_soul_chat_reply_stream(
+            client,
+            model,
+            chat_context,
+            chat_context.soul,
+            on_delta=lambda text: emit({"type": "delta", "text": text}),
+            trace_context=trace_context,
+        )
+    except reply_router.ChatReplyStreamError as exc:
+        data = None
+        stream_error = str(exc)
+    except Exception as exc:  # defensive: any stream failure still gets the fallback
+        data = None
+        stream_error = str(exc)
+
+    result = _complete_streamed_reply(
+        chat_context,
+        user_message_row,
+        data,
+        stream_error,
+        client,
+        model,
+        trace_context=trace_context,
+        reply_started=reply_started,
+        total_started=total_started,
+    )
+    emit({"type": "done", "result": asdict(result)})
 
-    worker = threading.Thread(target=run_stream, daemon=True)
-    worker.start()
-    while True:
-        item = delta_queue.get()
-        if item is sentinel:
-            break
-        yield {"type": "delta", "text": item}
-    worker.join()
 
-    data = outcome.get("data")
+def _complete_streamed_reply(
+    chat_context: ChatContext,
+    user_message_row: ChatMessage,
+    data: dict | None,
+    stream_error: str | None,
+    client: LLMClient,
+    model: str,
+    *,
+    trace_context: dict,
+    reply_started: float,
+    total_started: float,
+) -> ChatReplyResult:
     if data is None:
         # Stream failed (transport error) or produced nothing: fall back to a
         # single non-streaming call, then run the shared post-processing.
@@ -700,7 +954,7 @@ def _stream_assistant_reply_for_user_message(
             thread_id=user_message_row.thread_id,
             soul_name=chat_context.thread.soul_name,
             user_message_id=user_message_row.id,
-            reason="stream_error" if "stream_error" in outcome else "empty_stream",
+            reason="stream_error" if stream_error is not None else "empty_stream",
         )
         data = reply_router.call_soul_chat_reply(
             client, model, chat_context, chat_context.soul, trace_context=trace_context
@@ -710,10 +964,8 @@ def _stream_assistant_reply_for_user_message(
     reply, error = _valid_reply_or_error(data)
     if error is not None:
         _log_reply_failed(chat_context, user_message_row, error)
-        result = _failed_result(chat_context.thread, user_message_row, error)
-    else:
-        result = _finalize_chat_reply(chat_context, user_message_row, reply, client, model)
-    yield {"type": "done", "result": asdict(result)}
+        return _failed_result(chat_context.thread, user_message_row, error)
+    return _finalize_chat_reply(chat_context, user_message_row, reply, client, model)
 
 
 def _reply_trace_context(user_message_row: ChatMessage, chat_context: ChatContext) -> dict:
@@ -1211,19 +1463,34 @@ def _thread_from_row(row) -> ChatThread:
 
 
 def _message_from_row(row) -> ChatMessage:
-    message_id = int(row["id"])
-    return ChatMessage(
-        id=message_id,
-        thread_id=row["thread_id"],
-        role=row["role"],
-        content=row["content"],
-        created_at=row["created_at"],
-        edited_at=float(row["edited_at"]) if row["edited_at"] is not None else None,
-        rerun_at=float(row["rerun_at"]) if row["rerun_at"] is not None else None,
-        metadata=suggestion_service.metadata_with_live_suggestions(row["metadata"]),
-        client_request_id=row["client_request_id"],
-        attachments=attachment_service.list_chat_message_attachments(message_id),
+    return _messages_from_rows([row])[0]
+
+
+def _messages_from_rows(rows) -> list[ChatMessage]:
+    """行 → 消息，附件和建议快照都成批取，长线程不会每条消息各查两次。"""
+    rows = list(rows)
+    if not rows:
+        return []
+    ids = [int(row["id"]) for row in rows]
+    attachments_by_id = attachment_service.chat_message_attachments_by_ids(ids)
+    metadatas = suggestion_service.metadata_with_live_suggestions_batch(
+        [row["metadata"] for row in rows]
     )
+    return [
+        ChatMessage(
+            id=message_id,
+            thread_id=row["thread_id"],
+            role=row["role"],
+            content=row["content"],
+            created_at=row["created_at"],
+            edited_at=float(row["edited_at"]) if row["edited_at"] is not None else None,
+            rerun_at=float(row["rerun_at"]) if row["rerun_at"] is not None else None,
+            metadata=metadata,
+            client_request_id=row["client_request_id"],
+            attachments=attachments_by_id.get(message_id, []),
+        )
+        for message_id, row, metadata in zip(ids, rows, metadatas)
+    ]
 
 
 def _message_for_llm(message: ChatMessage) -> ChatMessage:
@@ -5,9 +5,10 @@ from __future__ import annotations
 from openai import OpenAI
 
 from core import context_builder, logging_service, record_service, reply_service, vector_index_service
-from core import vectorstore, workspace_service
+from core import segmentation, vectorstore, workspace_service
 from core.cli import commands, sessions
-from core.llm import secondary_model
+from core.llm import scheduler, secondary_model
+from core.llm.common import CHAT_CLIENT_MAX_RETRIES
 from core.cli.config import load_config
 from core.cli_input import read_cli_input
 
@@ -34,18 +35,23 @@ def main() -> None:
     client = OpenAI(
         api_key=config["api_key"],
         base_url=config.get("base_url", "https://api.openai.com/v1"),
+        max_retries=CHAT_CLIENT_MAX_RETRIES,
     )
     secondary_model.install_from_config(
         config,
         main_client=client,
-        client_factory=lambda api_key, base_url: OpenAI(api_key=api_key, base_url=base_url),
+        client_factory=lambda api_key, base_url: OpenAI(
+            api_key=api_key, base_url=base_url, max_retries=CHAT_CLIENT_MAX_RETRIES,
+        ),
     )
+    scheduler.install_from_config(config)
     model = config["model"]
     print(f"模型: {model}  |  Base URL: {config.get('base_url')}\n")
 
     try:
         workspace_service.init_workspace()
         logging_service.log_event("workspace_initialized")
+        segmentation.start_warmup()
         vector_result = vectorstore.init_vectorstore(
             config["api_key"],
             config["base_url"],
@@ -18,7 +18,13 @@ DEFAULT_VISION_CONFIG = {
     "model": None,
     "api_key": None,
     "base_url": None,
+    # Images are sent downscaled to fit this box and short side (px); the
+    # defaults match what OpenAI vision models keep. 0 lifts that bound, and
+    # both 0 sends the stored original.
+    "image_max_side": 2048,
+    "image_max_short_side": 768,
 }
+VISION_IMAGE_SIZE_KEYS = ("image_max_side", "image_max_short_side")
 DEFAULT_WEB_SEARCH_CONFIG = {
     "enabled": False,
     "provider": "duckduckgo",
@@ -33,6 +39,13 @@ DEFAULT_PROACTIVE_MESSAGE_CONFIG = {
     "notify_desktop": True,
 }
 WEB_SEARCH_PROVIDERS = {"tavily", "duckduckgo"}
+# Top-level settings of the shared LLM call scheduler (core/llm/scheduler.py):
+# completions in flight at once (1..32), and token-bucket pacing in tokens per
+# minute (0 = off).
+DEFAULT_LLM_SCHEDULER_SETTINGS = {
+    "llm_max_concurrency": 6,
+    "llm_tokens_per_minute": 0,
+}
 
 
 def load_config() -> dict:
@@ -55,6 +68,7 @@ def load_config() -> dict:
             config["proactive_message"] = normalize_proactive_message_config(
                 config.get("proactive_message")
             )
+            config.update(normalize_llm_scheduler_settings(config))
             return config
 
         print(f"[配置] 检测到配置不完整（缺少：{', '.join(missing)}），将重新配置。")
@@ -137,10 +151,12 @@ def normalize_vision_config(value) -> dict:
         {
             key: _clean_optional(raw.get(key)) if key != "enabled" else bool(raw.get(key))
             for key in DEFAULT_VISION_CONFIG
-            if key in raw
+            if key in raw and key not in VISION_IMAGE_SIZE_KEYS
         }
     )
     merged["enabled"] = bool(merged.get("enabled"))
+    for key in VISION_IMAGE_SIZE_KEYS:
+        merged[key] = _clamp_int(raw.get(key, merged[key]), DEFAULT_VISION_CONFIG[key], 0, 8192)
     if not merged.get("enabled"):
         merged["api_key"] = _clean_optional(merged.get("api_key"))
         merged["base_url"] = _clean_optional(merged.get("base_url"))
@@ -152,6 +168,19 @@ def normalize_vision_config(value) -> dict:
     return merged
 
 
+def normalize_llm_scheduler_settings(config) -> dict:
+    raw = config if isinstance(config, dict) else {}
+    defaults = DEFAULT_LLM_SCHEDULER_SETTINGS
+    return {
+        "llm_max_concurrency": _clamp_int(
+            raw.get("llm_max_concurrency"), defaults["llm_max_concurrency"], 1, 32
+        ),
+        "llm_tokens_per_minute": _clamp_int(
+            raw.get("llm_tokens_per_minute"), defaults["llm_tokens_per_minute"], 0, 10_000_000
+        ),
+    }
+
+
 def normalize_web_search_config(value) -> dict:
     raw = value if isinstance(value, dict) else {}
     merged = default_web_search_config()
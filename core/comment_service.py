@@ -277,7 +277,7 @@ def list_conversation_messages(
         """,
         tuple(params),
     )
-    return [_message_from_row(row) for row in reversed(rows)]
+    return _messages_from_rows(reversed(rows))
 
 
 def list_conversation_messages_after(
@@ -297,7 +297,7 @@ def list_conversation_messages_after(
         """,
         (post_id, soul_name, max(0, int(after_id)), max(1, min(int(limit), 100))),
     )
-    return [_message_from_row(row) for row in rows]
+    return _messages_from_rows(rows)
 
 
 def append_comment(
@@ -1085,20 +1085,7 @@ def _conversation_from_root(post_id: str, soul_name: str, root_comment) -> Comme
 
 
 def _message_from_row(row) -> CommentMessage:
-    message_id = int(row["id"])
-    return CommentMessage(
-        id=message_id,
-        post_id=row["post_id"],
-        soul_name=row["soul_name"],
-        role=row["role"],
-        content=row["content"],
-        seq=int(row["seq"]),
-        created_at=float(row["created_at"]),
-        edited_at=float(row["edited_at"]) if row["edited_at"] is not None else None,
-        rerun_at=float(row["rerun_at"]) if row["rerun_at"] is not None else None,
-        metadata=suggestion_service.metadata_with_live_suggestions(row["metadata"]),
-        attachments=attachment_service.list_comment_attachments(message_id),
-    )
+    return _messages_from_rows([row])[0]
 
 
 def _messages_from_rows(rows) -> list[CommentMessage]:
@@ -46,6 +46,9 @@ def init_db() -> None:
         conn.executescript(sql)
         _backfill_schedule_event_accounts(conn)
         _backfill_chat_thread_read_watermark(conn)
+        _backfill_keyword_indexes(conn)
+        _backfill_soul_letter_watermarks(conn)
+        _backfill_memory_source_heads(conn)
         conn.execute("PRAGMA foreign_keys = ON")
         mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
         if str(mode).lower() != "wal":
@@ -78,6 +81,8 @@ _COLUMN_MIGRATIONS: tuple[tuple[str, str, str], ...] = (
     ("vector_index_items", "dim", "INTEGER"),
     ("vector_index_items", "embedding", "BLOB"),
     ("chat_threads", "last_read_at", "REAL"),
+    ("attachments", "source_sha256", "TEXT"),
+    ("memory_view_sections", "section_budget", "INTEGER"),
 )
 
 
@@ -186,6 +191,103 @@ def _backfill_chat_thread_read_watermark(conn: sqlite3.Connection) -> None:
     )
 
 
+_KEYWORD_INDEX_BACKFILL_KEY = "schedule_goal_fts_built"
+_KEYWORD_INDEXES = (
+    ("schedule_events_fts", "schedule_events", ("subject", "location")),
+    ("goals_fts", "goals", ("title",)),
+)
+
+
+def _backfill_keyword_indexes(conn: sqlite3.Connection) -> None:
+    """Fill the schedule/goal FTS tables from rows written before they existed.
+
+    The triggers keep them current afterwards; the meta flag keeps the rebuild
+    a one-time pass instead of a full reindex on every start.
+    """
+    done = conn.execute(
+        "SELECT 1 FROM meta WHERE key = ?", (_KEYWORD_INDEX_BACKFILL_KEY,)
+    ).fetchone()
+    if done is not None:
+        return
+    for fts_table, table, columns in _KEYWORD_INDEXES:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if not set(columns) <= existing:
+            continue  # pre-release table shape without the indexed columns
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    conn.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+        (_KEYWORD_INDEX_BACKFILL_KEY, "1"),
+    )
+
+
+_LETTER_WATERMARK_BACKFILL_KEY = "soul_letter_watermarks_built"
+
+
+def _backfill_soul_letter_watermarks(conn: sqlite3.Connection) -> None:
+    """Seed per-SOUL last-letter watermarks from letters sent before the table.
+
+    The user activity watermark needs no backfill: a missing row already means
+    "rebuild on the next proactive scan".
+    """
+    done = conn.execute(
+        "SELECT 1 FROM meta WHERE key = ?", (_LETTER_WATERMARK_BACKFILL_KEY,)
+    ).fetchone()
+    if done is not None:
+        return
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO soul_letter_watermarks(soul_name, last_sent_at)
+        SELECT chat_threads.soul_name, MAX(soul_letters.sent_at)
+        FROM soul_letters
+        JOIN chat_messages ON chat_messages.id = soul_letters.message_id
+        JOIN chat_threads ON chat_threads.id = chat_messages.thread_id
+        GROUP BY chat_threads.soul_name
+        """
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+        (_LETTER_WATERMARK_BACKFILL_KEY, "1"),
+    )
+
+
+_SOURCE_HEADS_BACKFILL_KEY = "memory_source_heads_built"
+
+
+def _backfill_memory_source_heads(conn: sqlite3.Connection) -> None:
+    """Seed ledger heads for events appended before the head table existed.
+
+    append_event numbers the next revision from the head, so a source without
+    one would restart at revision 1 and collide with its own history.
+    """
+    done = conn.execute(
+        "SELECT 1 FROM meta WHERE key = ?", (_SOURCE_HEADS_BACKFILL_KEY,)
+    ).fetchone()
+    if done is not None:
+        return
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO memory_source_heads(
+            source_type, source_id, event_id, source_revision, op,
+            owner_scope, visibility_scope
+        )
+        SELECT source_type, source_id, id, source_revision, op,
+               owner_scope, visibility_scope
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY source_type, source_id
+                ORDER BY source_revision DESC, id DESC
+            ) AS head_rank
+            FROM memory_ingest_events
+        )
+        WHERE head_rank = 1
+        """
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+        (_SOURCE_HEADS_BACKFILL_KEY, "1"),
+    )
+
+
 def _validate_fts5_trigram(conn: sqlite3.Connection) -> None:
     probe_id = f"__fts5_probe__:{os.getpid()}:{time.time_ns()}"
     try:
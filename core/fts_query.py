@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import re
+import threading
+from collections import OrderedDict
 
 import jieba
 
@@ -30,6 +32,18 @@ LOW_INFORMATION_CJK = {
 # single chars into 2-grams, so 我在南大读书 yields 南大 but not 我在/在南.
 SINGLE_CHAR_STOP = set("我你他她它这那哪什怎么是有没不吗呢吧啊呀的了过前在和与也都就把被让从对向很")
 
+# One reply turn segments the same strings several times over (retrieval,
+# memory recall, schedule context, goal matching), so term lists are memoized
+# per (text, mode, max_terms). Segmentation is deterministic for a process —
+# nothing here ever loads a user dictionary — so entries never go stale.
+TERM_MEMO_MAX_ENTRIES = 1024
+
+_MemoKey = tuple[str, str, int]
+_term_memo: OrderedDict[_MemoKey, tuple[str, ...]] = OrderedDict()
+_term_memo_lock = threading.Lock()
+_term_memo_hits = 0
+_term_memo_misses = 0
+
 
 def sanitize_fts5(query: str) -> str:
     text = re.sub(r'["\'`()*:^{}[\]]+', " ", query)
@@ -58,6 +72,10 @@ def quote_match_candidates(candidates: list[str]) -> str:
 
 
 def match_candidates(query: str, *, max_terms: int = MAX_MATCH_TERMS) -> list[str]:
+    return _memoized((query, "match", max_terms), lambda: _match_candidates(query, max_terms))
+
+
+def _match_candidates(query: str, max_terms: int) -> list[str]:
     clean = sanitize_fts5(query)
     if not clean or max_terms <= 0:
         return []
@@ -76,7 +94,7 @@ def query_terms(query: str) -> list[str]:
     """Retrieval words for FTS MATCH / LIKE routing: jieba PRECISE mode keeps a real
     word like \u56fe\u4e66\u9986 whole but splits \u8003\u7814\u590d\u4e60 into \u8003\u7814/\u590d\u4e60 \u2014 exactly what the
     short-CJK LIKE fallback needs, without over-recalling \u56fe\u4e66/\u4e66\u9986."""
-    return _segment(query, jieba.lcut)
+    return _memoized((str(query or ""), "precise", 0), lambda: _segment(query, jieba.lcut))
 
 
 def search_terms(query: str) -> list[str]:
@@ -85,7 +103,46 @@ def search_terms(query: str) -> list[str]:
     so a long term split across the content still overlaps. The extra granularity
     only ranks candidates, never gates recall, so its noise is harmless here \u2014
     unlike query_terms, which must stay precise for the LIKE routing."""
-    return _segment(query, jieba.lcut_for_search)
+    return _memoized((str(query or ""), "search", 0), lambda: _segment(query, jieba.lcut_for_search))
+
+
+def term_memo_stats() -> dict[str, float | int]:
+    with _term_memo_lock:
+        lookups = _term_memo_hits + _term_memo_misses
+        return {
+            "hits": _term_memo_hits,
+            "misses": _term_memo_misses,
+            "entries": len(_term_memo),
+            "hit_rate": _term_memo_hits / lookups if lookups else 0.0,
+        }
+
+
+def clear_term_memo() -> None:
+    global _term_memo_hits, _term_memo_misses
+    with _term_memo_lock:
+        _term_memo.clear()
+        _term_memo_hits = 0
+        _term_memo_misses = 0
+
+
+def _memoized(key: _MemoKey, compute) -> list[str]:
+    """Return a fresh list for ``key``, computing it outside the lock on a miss.
+    Two threads missing the same key both compute; the results are identical."""
+    global _term_memo_hits, _term_memo_misses
+    with _term_memo_lock:
+        cached = _term_memo.get(key)
+        if cached is not None:
+            _term_memo.move_to_end(key)
+            _term_memo_hits += 1
+            return list(cached)
+        _term_memo_misses += 1
+    terms = tuple(compute())
+    with _term_memo_lock:
+        _term_memo[key] = terms
+        _term_memo.move_to_end(key)
+        while len(_term_memo) > TERM_MEMO_MAX_ENTRIES:
+            _term_memo.popitem(last=False)
+    return list(terms)
 
 
 def _segment(query: str, cut) -> list[str]:
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import email.utils
+import threading
 import time
-from collections.abc import Callable, Mapping
+from collections.abc import Callable, Iterator, Mapping
 from datetime import datetime, timezone
 from typing import Any
 from urllib.parse import quote, urlencode, urlparse
@@ -17,6 +18,14 @@ GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
 PREFER_TIMEZONE = f'outlook.timezone="{SYSTEM_TIMEZONE_NAME}"'
 REQUEST_TIMEOUT_SECONDS = 15.0
 DEFAULT_RETRY_DELAY_SECONDS = 1.0
+# calendarView delta rejects $select, so payloads are trimmed by asking for
+# fewer, larger pages instead of Graph's default of 10 events per page.
+DELTA_PAGE_SIZE = 100
+DELTA_PREFER = f"{PREFER_TIMEZONE}, odata.maxpagesize={DELTA_PAGE_SIZE}"
+ME_SELECT_FIELDS = ("id", "displayName", "mail", "userPrincipalName")
+
+_shared_http: httpx.Client | None = None
+_shared_http_lock = threading.Lock()
 
 
 class GraphNotConnectedError(RuntimeError):
@@ -38,7 +47,7 @@ class GraphClient:
         sleep: Callable[[float], None] = time.sleep,
     ) -> None:
         self._token_provider = token_provider
-        self._http = http or httpx
+        self._http = http or shared_http_client()
         self._sleep = sleep
 
     def calendarview_delta(
@@ -48,6 +57,25 @@ class GraphClient:
         end: str | None = None,
         delta_link: str | None = None,
     ) -> dict[str, Any]:
+        events: list[dict[str, Any]] = []
+        final_delta_link = ""
+        stats = {"pages": 0, "bytes": 0, "elapsed_ms": 0}
+        for page in self.iter_calendarview_delta(start=start, end=end, delta_link=delta_link, stats=stats):
+            events.extend(page["events"])
+            final_delta_link = page["delta_link"] or final_delta_link
+        return {"events": events, "delta_link": final_delta_link, "stats": stats}
+
+    def iter_calendarview_delta(
+        self,
+        *,
+        start: str | None = None,
+        end: str | None = None,
+        delta_link: str | None = None,
+        stats: dict[str, int] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield delta pages as they arrive. Only the last page carries
+        ``delta_link``; a round that ends without one raises before it is
+        yielded, so callers never persist a link from an incomplete walk."""
         if delta_link:
             url = delta_link
         else:
@@ -56,20 +84,24 @@ class GraphClient:
             query = urlencode({"startDateTime": start, "endDateTime": end})
             url = f"{GRAPH_BASE_URL}/me/calendarView/delta?{query}"
 
-        events: list[dict[str, Any]] = []
-        final_delta_link: str | None = None
+        stats = {"pages": 0, "bytes": 0, "elapsed_ms": 0} if stats is None else stats
         while url:
-            payload = self._request("GET", url)
+            started = time.perf_counter()
+            payload = self._request("GET", url, prefer=DELTA_PREFER, stats=stats)
+            stats["pages"] = stats.get("pages", 0) + 1
+            stats["elapsed_ms"] = stats.get("elapsed_ms", 0) + int((time.perf_counter() - started) * 1000)
             values = payload.get("value", [])
             if not isinstance(values, list):
                 raise GraphHTTPError(502)
-            events.extend(item for item in values if isinstance(item, dict))
             next_link = payload.get("@odata.nextLink")
-            final_delta_link = payload.get("@odata.deltaLink") or final_delta_link
+            page_delta_link = payload.get("@odata.deltaLink")
+            if not next_link and not page_delta_link:
+                raise GraphHTTPError(502)
             url = str(next_link) if next_link else ""
-        if not final_delta_link:
-            raise GraphHTTPError(502)
-        return {"events": events, "delta_link": str(final_delta_link)}
+            yield {
+                "events": [item for item in values if isinstance(item, dict)],
+                "delta_link": None if url else str(page_delta_link),
+            }
 
     def create_event(self, event: Mapping[str, Any]) -> dict[str, Any]:
         return self._request("POST", f"{GRAPH_BASE_URL}/me/events", json=dict(event))
@@ -87,7 +119,8 @@ class GraphClient:
         self._request("DELETE", f"{GRAPH_BASE_URL}/me/events/{encoded_id}", expect_json=False)
 
     def get_me(self) -> dict[str, Any]:
-        return self._request("GET", f"{GRAPH_BASE_URL}/me")
+        query = urlencode({"$select": ",".join(ME_SELECT_FIELDS)})
+        return self._request("GET", f"{GRAPH_BASE_URL}/me?{query}")
 
     def _request(
         self,
@@ -96,6 +129,8 @@ class GraphClient:
         *,
         json: Mapping[str, Any] | None = None,
         expect_json: bool = True,
+        prefer: str = PREFER_TIMEZONE,
+        stats: dict[str, int] | None = None,
     ) -> dict[str, Any]:
         token = self._token_provider()
         if not token:
@@ -104,7 +139,7 @@ class GraphClient:
         headers = {
             "Authorization": f"Bearer {token}",
             "Accept": "application/json",
-            "Prefer": PREFER_TIMEZONE,
+            "Prefer": prefer,
         }
         normalized_method = method.upper()
         for attempt in range(2):
@@ -116,6 +151,8 @@ class GraphClient:
                 timeout=REQUEST_TIMEOUT_SECONDS,
             )
             status_code = int(response.status_code)
+            if stats is not None:
+                stats["bytes"] = stats.get("bytes", 0) + len(response.content)
             if 200 <= status_code < 300:
                 if not expect_json or status_code == 204:
                     return {}
@@ -135,6 +172,38 @@ class GraphClient:
             raise GraphHTTPError(status_code)
 
 
+def shared_http_client() -> httpx.Client:
+    """Process-wide keep-alive client, so the periodic sync and the schedule
+    routes reuse TLS connections to Graph instead of opening one per request.
+    HTTP/2 is negotiated through ``h2`` (the ``httpx[http2]`` extra in
+    requirements.txt); an environment without it stays on HTTP/1.1."""
+    global _shared_http
+    with _shared_http_lock:
+        if _shared_http is None:
+            _shared_http = httpx.Client(
+                http2=_http2_available(),
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=120),
+            )
+        return _shared_http
+
+
+def close_shared_http_client() -> None:
+    """Close the pooled connections; called when the API runtime shuts down."""
+    global _shared_http
+    with _shared_http_lock:
+        if _shared_http is not None:
+            _shared_http.close()
+            _shared_http = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
 def _is_retryable(
     method: str,
     status_code: int,
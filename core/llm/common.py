@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import itertools
 import json
 import uuid
 from datetime import datetime
@@ -9,11 +12,19 @@ from time import perf_counter
 from typing import Any, Callable
 
 from core import logging_service
-from core.llm.types import LLMClient
+from core.llm import response_cache, scheduler
+from core.llm.types import AsyncLLMClient, LLMClient
 
 # Extra sends allowed when a provider hands back an empty answer. Two brings a
 # ~5% per-call blank rate down to roughly one in ten thousand.
 EMPTY_CONTENT_RETRIES = 2
+# Sends allowed after a provider 429, each one waiting out the shared
+# scheduler cooldown (Retry-After when the provider sends one).
+RATE_LIMIT_RETRIES = 2
+# SDK-level retries for chat clients. The retries above own 429 handling; an
+# SDK retry would resend while the scheduler slot is still held and multiply
+# the sends per call, so chat clients are built with retries off.
+CHAT_CLIENT_MAX_RETRIES = 0
 
 
 class StreamCompletionError(Exception):
@@ -57,6 +68,7 @@ def call_json_completion(
     trace_context: dict | None = None,
     status_callback: Callable[[dict[str, Any]], None] | None = None,
     empty_content_retries: int = EMPTY_CONTENT_RETRIES,
+    cache_ttl_s: float | None = None,
 ) -> dict | None:
     """Call a JSON-mode chat completion and log the full lifecycle.
 
@@ -66,10 +78,34 @@ def call_json_completion(
     fluke rather than a property of the prompt, so a blank answer is re-sent
     instead of being reported as unparseable. Each attempt is logged on its own,
     so the retries stay visible.
+
+    ``cache_ttl_s`` opts a call into ``response_cache``: only for operations
+    whose answer is a pure function of the prompt. A cached answer that no
+    longer parses is ignored and the call goes out as usual.
     """
+    key: str | None = None
+    if cache_ttl_s:
+        key = response_cache.cache_key(
+            operation=operation,
+            model=model,
+            messages=messages,
+            response_format=response_format,
+        )
+        cached = _cached_json_completion(
+            key,
+            model=model,
+            operation=operation,
+            messages=messages,
+            parser=parser,
+            timeout=timeout,
+            response_format=response_format,
+            trace_context=trace_context,
+        )
+        if cached is not None:
+            return cached
     attempts = max(1, empty_content_retries + 1)
     for attempt in range(1, attempts + 1):
-        parsed, retry = _json_completion_attempt(
+        parsed, retry, content = _json_completion_attempt(
             client=client,
             model=model,
             operation=operation,
@@ -82,10 +118,53 @@ def call_json_completion(
             last_attempt=attempt == attempts,
         )
         if not retry:
+            if key is not None and parsed is not None and content is not None:
+                response_cache.put(
+                    key,
+                    operation=operation,
+                    model=model,
+                    response_content=content,
+                    ttl_s=float(cache_ttl_s or 0),
+                )
             return parsed
     return None
 
 
+def _cached_json_completion(
+    key: str,
+    *,
+    model: str,
+    operation: str,
+    messages: list[dict[str, Any]],
+    parser: Callable[[str | None], dict | None],
+    timeout: int,
+    response_format: dict | None,
+    trace_context: dict | None,
+) -> dict | None:
+    started = perf_counter()
+    content = response_cache.get(key)
+    if content is None:
+        return None
+    parsed = parser(content)
+    if parsed is None:
+        return None
+    logging_service.log_llm_call(
+        call_id=_new_call_id(),
+        operation=operation,
+        model=model,
+        status="ok",
+        duration_ms=int((perf_counter() - started) * 1000),
+        timeout_s=timeout,
+        messages=messages,
+        response_content=content,
+        parsed=parsed,
+        context=trace_context,
+        response_format=response_format,
+        cache_hit=True,
+    )
+    return parsed
+
+
 def _json_completion_attempt(
     *,
     client: LLMClient,
@@ -98,8 +177,9 @@ def _json_completion_attempt(
     trace_context: dict | None,
     status_callback: Callable[[dict[str, Any]], None] | None,
     last_attempt: bool,
-) -> tuple[dict | None, bool]:
-    """One request. Returns (parsed, whether an empty answer is worth retrying)."""
+) -> tuple[dict | None, bool, str | None]:
+    """One request. Returns (parsed, whether an empty answer is worth retrying,
+    the response text the parse came from)."""
     call_id = _new_call_id()
     started = perf_counter()
     response_content: str | None = None
@@ -109,6 +189,7 @@ def _json_completion_attempt(
     usage: dict | None = None
     finish_reason: str | None = None
     retry = False
+    queue_wait_ms = 0
 
     try:
         kwargs: dict[str, Any] = {
@@ -118,7 +199,7 @@ def _json_completion_attempt(
         }
         if response_format is not None:
             kwargs["response_format"] = response_format
-        response = client.chat.completions.create(**kwargs)
+        response, queue_wait_ms = _scheduled_create(client, operation, messages, kwargs)
         usage = _completion_usage(response)
         finish_reason = _completion_finish_reason(response)
         response_content = _message_content(response)
@@ -126,25 +207,25 @@ def _json_completion_attempt(
             if not last_attempt:
                 status = "empty_content"
                 retry = True
-                return None, True
+                return None, True, None
             # Last chance: the answer is sometimes left in the thinking channel.
             salvaged = _json_object_tail(_reasoning_content(response))
             parsed = parser(salvaged) if salvaged is not None else None
             if parsed is None:
                 status = "empty_content"
-                return None, False
+                return None, False, None
             status = "ok_from_reasoning"
             response_content = salvaged
-            return parsed, False
+            return parsed, False, salvaged
         parsed = parser(response_content)
         if parsed is None:
             status = _invalid_response_status(response_content, finish_reason)
-            return None, False
-        return parsed, False
+            return None, False, None
+        return parsed, False, response_content
     except Exception as exc:
         status = "api_error"
         error = _api_error_details(exc, operation=operation, model=model, timeout_s=timeout)
-        return None, False
+        return None, False, None
     finally:
         duration_ms = int((perf_counter() - started) * 1000)
         if status_callback is not None:
@@ -164,9 +245,43 @@ def _json_completion_attempt(
             response_format=response_format,
             usage=usage,
             finish_reason=finish_reason,
+            queue_wait_ms=queue_wait_ms,
         )
 
 
+def _scheduled_create(
+    client: LLMClient,
+    operation: str,
+    messages: list[dict[str, Any]],
+    kwargs: dict[str, Any],
+) -> tuple[Any, int]:
+    """Send one non-streaming request through the shared scheduler.
+
+    Returns the response and the total time spent queued for a slot. A 429
+    releases the slot, starts the shared cooldown and re-queues the request."""
+    llm_scheduler = scheduler.get()
+    queue_wait_ms = 0
+    for attempt in itertools.count(1):
+        with llm_scheduler.slot(operation, estimated_tokens=_estimate_prompt_tokens(messages)) as ticket:
+            queue_wait_ms += ticket.queue_wait_ms
+            try:
+                response = client.chat.completions.create(**kwargs)
+            except Exception as exc:
+                if not scheduler.is_rate_limited(exc) or attempt > RATE_LIMIT_RETRIES:
+                    raise
+                llm_scheduler.note_rate_limited(exc, attempt=attempt)
+                continue
+            ticket.record_usage(_completion_usage(response))
+            return response, queue_wait_ms
+
+
+def _estimate_prompt_tokens(messages: list[dict[str, Any]]) -> int:
+    """Rough pre-charge for the token bucket (~2 chars per token for mixed CJK);
+    the real ``usage`` figure settles it after the call."""
+    chars = sum(len(str(message.get("content") or "")) for message in messages)
+    return max(1, chars // 2)
+
+
 def stream_completion(
     *,
     client: LLMClient,
@@ -192,38 +307,138 @@ def stream_completion(
     error: dict | str | None = None
     usage: dict | None = None
     finish_reason: str | None = None
+    queue_wait_ms = 0
+    llm_scheduler = scheduler.get()
 
     try:
-        stream = client.chat.completions.create(
+        # The slot is held for the whole stream; a 429 can only arrive on the
+        # initial request, before any delta reached the caller.
+        for attempt in itertools.count(1):
+            with llm_scheduler.slot(operation, estimated_tokens=_estimate_prompt_tokens(messages)) as ticket:
+                queue_wait_ms += ticket.queue_wait_ms
+                try:
+                    stream = client.chat.completions.create(
+                        model=model,
+                        timeout=timeout,
+                        messages=messages,
+                        stream=True,
+                    )
+                except Exception as exc:
+                    if not scheduler.is_rate_limited(exc) or attempt > RATE_LIMIT_RETRIES:
+                        raise
+                    llm_scheduler.note_rate_limited(exc, attempt=attempt)
+                    continue
+                for chunk in stream:
+                    chunk_usage = _completion_usage(chunk)
+                    if chunk_usage is not None:
+                        usage = chunk_usage
+                    chunk_finish_reason = _completion_finish_reason(chunk)
+                    if chunk_finish_reason is not None:
+                        finish_reason = chunk_finish_reason
+                    text = _stream_delta_text(chunk)
+                    if text:
+                        chunks.append(text)
+                        on_delta(text)
+                ticket.record_usage(usage)
+                return "".join(chunks)
+    except Exception as exc:
+        status = "api_error"
+        error = _api_error_details(exc, operation=operation, model=model, timeout_s=timeout)
+        raise StreamCompletionError(str(exc), accumulated_length=len("".join(chunks))) from exc
+    finally:
+        duration_ms = int((perf_counter() - started) * 1000)
+        logging_service.log_llm_call(
+            call_id=call_id,
+            operation=operation,
             model=model,
-            timeout=timeout,
+            status=status,
+            duration_ms=duration_ms,
+            timeout_s=timeout,
             messages=messages,
-            stream=True,
+            response_content="".join(chunks),
+            error=error,
+            context=trace_context,
+            usage=usage,
+            finish_reason=finish_reason,
+            queue_wait_ms=queue_wait_ms,
         )
-        for chunk in stream:
-            chunk_usage = _completion_usage(chunk)
-            if chunk_usage is not None:
-                usage = chunk_usage
-            chunk_finish_reason = _completion_finish_reason(chunk)
-            if chunk_finish_reason is not None:
-                finish_reason = chunk_finish_reason
-            text = _stream_delta_text(chunk)
-            if text:
-                chunks.append(text)
-                on_delta(text)
-        return "".join(chunks)
+
+
+async def astream_completion(
+    *,
+    client: AsyncLLMClient,
+    model: str,
+    operation: str,
+    messages: list[dict[str, Any]],
+    on_delta: Callable[[str], None],
+    timeout: int = 30,
+    trace_context: dict | None = None,
+) -> str:
+    """Event-loop sibling of ``stream_completion`` for an ``AsyncOpenAI``-style
+    client, with the same retry, slot and logging behaviour.
+
+    Cancelling the awaiting task (an SSE consumer that disconnected) closes the
+    HTTP response, which stops generation upstream, releases the scheduler slot
+    and logs the call as ``cancelled`` before the cancellation propagates."""
+    call_id = _new_call_id()
+    started = perf_counter()
+    chunks: list[str] = []
+    status = "ok"
+    error: dict | str | None = None
+    usage: dict | None = None
+    finish_reason: str | None = None
+    queue_wait_ms = 0
+    llm_scheduler = scheduler.get()
+
+    try:
+        for attempt in itertools.count(1):
+            async with llm_scheduler.aslot(
+                operation, estimated_tokens=_estimate_prompt_tokens(messages)
+            ) as ticket:
+                queue_wait_ms += ticket.queue_wait_ms
+                try:
+                    stream = await client.chat.completions.create(
+                        model=model,
+                        timeout=timeout,
+                        messages=messages,
+                        stream=True,
+                    )
+                except Exception as exc:
+                    if not scheduler.is_rate_limited(exc) or attempt > RATE_LIMIT_RETRIES:
+                        raise
+                    llm_scheduler.note_rate_limited(exc, attempt=attempt)
+                    continue
+                try:
+                    async for chunk in stream:
+                        chunk_usage = _completion_usage(chunk)
+                        if chunk_usage is not None:
+                            usage = chunk_usage
+                        chunk_finish_reason = _completion_finish_reason(chunk)
+                        if chunk_finish_reason is not None:
+                            finish_reason = chunk_finish_reason
+                        text = _stream_delta_text(chunk)
+                        if text:
+                            chunks.append(text)
+                            on_delta(text)
+                finally:
+                    with contextlib.suppress(Exception):
+                        await stream.close()
+                ticket.record_usage(usage)
+                return "".join(chunks)
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
     except Exception as exc:
         status = "api_error"
         error = _api_error_details(exc, operation=operation, model=model, timeout_s=timeout)
         raise StreamCompletionError(str(exc), accumulated_length=len("".join(chunks))) from exc
     finally:
-        duration_ms = int((perf_counter() - started) * 1000)
         logging_service.log_llm_call(
             call_id=call_id,
             operation=operation,
             model=model,
             status=status,
-            duration_ms=duration_ms,
+            duration_ms=int((perf_counter() - started) * 1000),
             timeout_s=timeout,
             messages=messages,
             response_content="".join(chunks),
@@ -231,6 +446,7 @@ def stream_completion(
             context=trace_context,
             usage=usage,
             finish_reason=finish_reason,
+            queue_wait_ms=queue_wait_ms,
         )
 
 
@@ -3,10 +3,17 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Callable
 
 from core.llm.common import call_json_completion, clean_json_content, now_str
 from core.llm.types import LLMClient
 
+# Judgments that are pure functions of their inputs opt into the response
+# cache: a re-run reconcile tail or a re-judged unchanged link costs nothing.
+RELINK_CACHE_TTL_S = 7 * 24 * 3600
+LINK_JUDGE_CACHE_TTL_S = 7 * 24 * 3600
+NORMALIZE_CLAIMS_CACHE_TTL_S = 30 * 24 * 3600
+
 
 MEMORY_RECONCILE_PROMPT = """\
 你是 TraceLog 拾迹的记忆对账引擎。你只维护关于【用户】的结构化 memory units。
@@ -125,9 +132,11 @@ MEMORY_LINK_JUDGE_PROMPT = """\
 
 
 MEMORY_RELINK_PROMPT = """\
-用户刚修改了一条关于自己的记忆。逐条判断旧证据是否仍支持新内容。
-每条证据必须恰好出现在 keep_event_ids 或 drop_event_ids 之一。
-只输出 JSON：{"keep_event_ids":[整数],"drop_event_ids":[整数]}
+用户刚修改了若干条关于自己的记忆。每条记忆（item）附有它自己的旧证据，逐条判断这些证据
+是否仍支持该条记忆的新内容。
+每个 item 各自独立判断：只能使用该 item 下列出的 event_id，不要跨 item 引用。
+每条证据必须恰好出现在该 item 的 keep_event_ids 或 drop_event_ids 之一。
+只输出 JSON：{"items":[{"item":序号,"keep_event_ids":[整数],"drop_event_ids":[整数]}]}
 """
 
 
@@ -302,15 +311,23 @@ def call_memory_relink(
     client: LLMClient,
     model: str,
     *,
-    content: str,
-    evidence_text: str,
+    items: list[dict],
     trace_context: dict | None = None,
-) -> dict | None:
-    user_content = (
-        f"## 记忆的新内容\n\n{content}\n\n---\n\n"
-        f"## 旧证据\n\n{evidence_text or '（无）'}"
-    )
-    return call_json_completion(
+    status_callback: Callable[[dict], None] | None = None,
+) -> list[dict | None] | None:
+    """Judge the post-edit re-link for several units in one call. ``items``:
+    [{"content", "evidence_text"}]. Returns one entry per item, in order —
+    {"keep_event_ids", "drop_event_ids"}, or None where the model skipped or
+    garbled that item — and None when the call or the whole answer failed;
+    ``status_callback`` sees each attempt's status to tell those apart."""
+    if not items:
+        return []
+    blocks = [
+        f"### item {index}\n\n#### 记忆的新内容\n\n{item['content']}\n\n"
+        f"#### 旧证据\n\n{item.get('evidence_text') or '（无）'}"
+        for index, item in enumerate(items, start=1)
+    ]
+    answers = call_json_completion(
         client=client,
         model=model,
         operation="memory_relink",
@@ -318,25 +335,43 @@ def call_memory_relink(
         response_format={"type": "json_object"},
         messages=[
             {"role": "system", "content": MEMORY_RELINK_PROMPT},
-            {"role": "user", "content": user_content},
+            {"role": "user", "content": "\n\n---\n\n".join(blocks)},
         ],
         parser=_parse_memory_relink_content,
         trace_context=trace_context,
+        status_callback=status_callback,
+        cache_ttl_s=RELINK_CACHE_TTL_S,
     )
+    if answers is None:
+        return None
+    return [answers.get(index) for index in range(1, len(items) + 1)]
 
 
-def _parse_memory_relink_content(content: str | None) -> dict | None:
+def _parse_memory_relink_content(content: str | None) -> dict[int, dict] | None:
     content = clean_json_content(content)
     try:
         data = json.loads(content)
     except json.JSONDecodeError:
         return None
-    if not isinstance(data, dict):
+    if not isinstance(data, dict) or not isinstance(data.get("items"), list):
         return None
-    return {
-        "keep_event_ids": _coerce_event_ids(data.get("keep_event_ids")),
-        "drop_event_ids": _coerce_event_ids(data.get("drop_event_ids")),
-    }
+    answers: dict[int, dict] = {}
+    for entry in data["items"]:
+        if not isinstance(entry, dict) or not isinstance(entry.get("keep_event_ids"), list):
+            continue
+        try:
+            index = int(entry.get("item"))
+        except (TypeError, ValueError):
+            continue
+        if index in answers:
+            # Two answers for one item: trust neither, that item is re-asked.
+            answers[index] = None
+            continue
+        answers[index] = {
+            "keep_event_ids": _coerce_event_ids(entry.get("keep_event_ids")),
+            "drop_event_ids": _coerce_event_ids(entry.get("drop_event_ids")),
+        }
+    return {index: answer for index, answer in answers.items() if answer is not None}
 
 
 _LINK_RELATIONS = {"same_fact", "contradicts", "context_variant", "unrelated"}
@@ -380,6 +415,7 @@ def call_memory_link_judge(
         ],
         parser=_parse_link_judge_content,
         trace_context=trace_context,
+        cache_ttl_s=LINK_JUDGE_CACHE_TTL_S,
     )
 
 
@@ -433,6 +469,7 @@ def call_memory_normalize_claims(
         ],
         parser=_parse_normalize_claims_content,
         trace_context=trace_context,
+        cache_ttl_s=NORMALIZE_CLAIMS_CACHE_TTL_S,
     )
 
 
@@ -9,6 +9,10 @@ from core.llm import secondary_model
 from core.llm.common import call_json_completion, clean_json_content, now_str
 from core.llm.types import LLMClient
 
+# The prompt carries today's date, so a cached rewrite never outlives the day
+# its relative-time wording was resolved against.
+QUERY_REWRITE_CACHE_TTL_S = 6 * 3600
+
 
 QUERY_REWRITE_PROMPT = """\
 你是 TraceLog 的检索 query rewrite 引擎。你的任务是把用户的自然语言检索意图改写成更适合记忆检索的语义查询和关键词。
@@ -77,6 +81,7 @@ def call_query_rewrite(
         ],
         parser=_parse_query_rewrite_content,
         trace_context=trace_context,
+        cache_ttl_s=QUERY_REWRITE_CACHE_TTL_S,
     )
 
 
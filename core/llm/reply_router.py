@@ -7,12 +7,13 @@ import json
 from core import logging_service, memory_read
 from core.llm.common import (
     StreamCompletionError,
+    astream_completion,
     call_json_completion,
     clean_json_content,
     now_str,
     stream_completion,
 )
-from core.llm.types import LLMClient
+from core.llm.types import AsyncLLMClient, LLMClient
 from core.soul_service import SoulContext
 
 
@@ -222,7 +223,7 @@ def call_soul_chat_reply(
     Private chat carries a single ``reply`` field, so it drops the JSON wrapper
     and ``response_format`` (whose cross-provider support is weaker than plain
     streaming) and outputs the reply body directly."""
-    messages = _chat_reply_messages(chat_context, soul)
+    messages = chat_reply_messages(chat_context, soul)
     if messages is None:
         return None
     return call_json_completion(
@@ -252,7 +253,7 @@ def call_soul_chat_reply_stream(
     streams nothing. Raises ``ChatReplyStreamError`` on a transport failure
     (partial text discarded), so the caller can fall back to a non-streaming
     retry."""
-    messages = _chat_reply_messages(chat_context, soul)
+    messages = chat_reply_messages(chat_context, soul)
     if messages is None:
         return None
     try:
@@ -272,7 +273,35 @@ def call_soul_chat_reply_stream(
     return {"reply": full}
 
 
-def _chat_reply_messages(chat_context, soul: SoulContext) -> list[dict[str, str]] | None:
+async def acall_soul_chat_reply_stream(
+    client: AsyncLLMClient,
+    model: str,
+    messages: list[dict[str, str]],
+    *,
+    on_delta,
+    trace_context: dict | None = None,
+) -> dict | None:
+    """Event-loop sibling of ``call_soul_chat_reply_stream``. Takes the messages
+    from ``chat_reply_messages`` (assembling them reads the DB, so the caller does
+    it off the loop). Cancelling the await stops generation upstream."""
+    try:
+        full = await astream_completion(
+            client=client,
+            model=model,
+            operation="soul_chat_reply_stream",
+            messages=messages,
+            on_delta=on_delta,
+            timeout=30,
+            trace_context=trace_context,
+        )
+    except StreamCompletionError as exc:
+        raise ChatReplyStreamError(str(exc), accumulated_length=exc.accumulated_length) from exc
+    if not full.strip():
+        return None
+    return {"reply": full}
+
+
+def chat_reply_messages(chat_context, soul: SoulContext) -> list[dict[str, str]] | None:
     """Assemble the shared system + multi-turn messages for a private chat reply
     (used by both the streaming and non-streaming paths)."""
     relationship = _relationship_memory(
@@ -0,0 +1,127 @@
+"""Content-addressed cache for deterministic JSON completions.
+
+Opt-in per call site through ``call_json_completion(cache_ttl_s=...)``. The key
+hashes (operation, model, normalized messages, response_format); the raw
+response text is stored, so every hit still runs the caller's parser. Only
+answers that parsed are written, which lets a retried job skip the calls that
+already succeeded while a failed one is simply asked again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+from typing import Any
+
+from core import db
+
+MAX_ENTRIES = 5000
+
+# now_str() stamps prompts to the minute; keep the date (relative-time wording
+# depends on it) but drop the clock so a re-judge minutes later still hits.
+_NOW_STR_CLOCK = re.compile(r"(\d{4} 年 \d{2} 月 \d{2} 日（周.）)\d{2}:\d{2}")
+
+
+def cache_key(
+    *,
+    operation: str,
+    model: str,
+    messages: list[dict[str, Any]],
+    response_format: dict | None,
+) -> str:
+    payload = json.dumps(
+        {
+            "operation": operation,
+            "model": model,
+            "messages": _normalize_messages(messages),
+            "response_format": response_format,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached response text, or None on miss/expiry/unavailable DB."""
+    if not db.DB_PATH.exists():
+        return None
+    now = db.now_ts()
+    try:
+        row = db.query_one(
+            "SELECT response_content FROM llm_response_cache WHERE cache_key = ? AND expires_at > ?",
+            (key, now),
+        )
+        if row is None:
+            return None
+        db.execute("UPDATE llm_response_cache SET last_used_at = ? WHERE cache_key = ?", (now, key))
+    except sqlite3.Error:
+        return None
+    return str(row["response_content"])
+
+
+def put(key: str, *, operation: str, model: str, response_content: str, ttl_s: float) -> None:
+    if not db.DB_PATH.exists():
+        return
+    now = db.now_ts()
+    try:
+        with db.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO llm_response_cache(
+                    cache_key, operation, model, response_content,
+                    created_at, last_used_at, expires_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    response_content = excluded.response_content,
+                    created_at = excluded.created_at,
+                    last_used_at = excluded.last_used_at,
+                    expires_at = excluded.expires_at
+                """,
+                (key, operation, model, response_content, now, now, now + ttl_s),
+            )
+            conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (now,))
+            conn.execute(
+                """
+                DELETE FROM llm_response_cache
+                WHERE cache_key IN (
+                    SELECT cache_key
+                    FROM llm_response_cache
+                    ORDER BY last_used_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (MAX_ENTRIES,),
+            )
+    except sqlite3.Error:
+        return
+
+
+def clear() -> None:
+    if not db.DB_PATH.exists():
+        return
+    try:
+        db.execute("DELETE FROM llm_response_cache")
+    except sqlite3.Error:
+        return
+
+
+def _normalize_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [
+        {"role": message.get("role"), "content": _normalize_content(message.get("content"))}
+        for message in messages
+    ]
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return _NOW_STR_CLOCK.sub(r"\1", content.strip())
+    if isinstance(content, list):
+        return [_normalize_content(part) for part in content]
+    if isinstance(content, dict):
+        return {key: _normalize_content(value) for key, value in content.items()}
+    return content
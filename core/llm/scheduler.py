@@ -0,0 +1,320 @@
+"""Process-wide admission control for chat completions.
+
+Every router funnels through ``common.call_json_completion`` /
+``common.stream_completion``, which take a slot here before touching the
+client. The scheduler bounds calls in flight (globally, per priority class and
+per operation), hands freed slots to interactive replies before suggestion and
+maintenance work, paces token spend with a token bucket fed by ``usage``, and
+turns a provider 429 into a shared cooldown that honours ``Retry-After``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from core.cli.config import DEFAULT_LLM_SCHEDULER_SETTINGS, normalize_llm_scheduler_settings
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SUGGESTION = 1
+PRIORITY_MAINTENANCE = 2
+
+DEFAULT_MAX_CONCURRENCY = DEFAULT_LLM_SCHEDULER_SETTINGS["llm_max_concurrency"]
+DEFAULT_CLASS_LIMITS = {
+    PRIORITY_INTERACTIVE: DEFAULT_MAX_CONCURRENCY,
+    PRIORITY_SUGGESTION: 3,
+    PRIORITY_MAINTENANCE: 2,
+}
+# Single-flight for the calls whose output is a whole-owner rewrite; a second
+# concurrent synthesis would only race the first one's write.
+DEFAULT_OPERATION_LIMITS = {
+    "memory_view_synthesis": 1,
+    "memory_consolidation": 1,
+}
+MAX_RETRY_AFTER_S = 60.0
+DEFAULT_RATE_LIMIT_BACKOFF_S = 2.0
+
+_OPERATION_PRIORITIES = {
+    "soul_chat_reply": PRIORITY_INTERACTIVE,
+    "soul_chat_reply_stream": PRIORITY_INTERACTIVE,
+    "soul_comment_reply": PRIORITY_INTERACTIVE,
+    "soul_post_reply": PRIORITY_INTERACTIVE,
+    "turn_prep": PRIORITY_INTERACTIVE,
+    "query_rewrite": PRIORITY_INTERACTIVE,
+    "web_search_gate": PRIORITY_INTERACTIVE,
+    "soul_search_gate": PRIORITY_INTERACTIVE,
+    "vision_summary": PRIORITY_INTERACTIVE,
+    "suggestion_router": PRIORITY_SUGGESTION,
+    "goal_schedule_router": PRIORITY_SUGGESTION,
+    "soul_letter": PRIORITY_SUGGESTION,
+    "generate_soul": PRIORITY_SUGGESTION,
+    "revise_soul": PRIORITY_SUGGESTION,
+}
+
+
+def priority_for(operation: str) -> int:
+    """Priority class of an operation; every ``memory_*`` call is maintenance."""
+    if operation in _OPERATION_PRIORITIES:
+        return _OPERATION_PRIORITIES[operation]
+    if operation.startswith("memory_"):
+        return PRIORITY_MAINTENANCE
+    return PRIORITY_SUGGESTION
+
+
+@dataclass
+class SlotTicket:
+    """One granted slot. ``record_usage`` settles the token bucket charge."""
+
+    operation: str
+    priority: int
+    queue_wait_ms: int = 0
+    charged_tokens: int = 0
+    _scheduler: "LLMCallScheduler | None" = field(default=None, repr=False)
+
+    def record_usage(self, usage: dict | None) -> None:
+        if self._scheduler is None or not usage:
+            return
+        total = usage.get("total_tokens")
+        if total is None:
+            prompt = usage.get("prompt_tokens") or 0
+            completion = usage.get("completion_tokens") or 0
+            total = prompt + completion
+        try:
+            actual = int(total)
+        except (TypeError, ValueError):
+            return
+        self._scheduler._settle_tokens(actual - self.charged_tokens)
+        self.charged_tokens = actual
+
+
+class LLMCallScheduler:
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        class_limits: dict[int, int] | None = None,
+        operation_limits: dict[str, int] | None = None,
+        tokens_per_minute: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.class_limits = dict(DEFAULT_CLASS_LIMITS if class_limits is None else class_limits)
+        self.operation_limits = dict(DEFAULT_OPERATION_LIMITS if operation_limits is None else operation_limits)
+        self.tokens_per_minute = max(0, int(tokens_per_minute or 0))
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._waiters: list[tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._in_flight_by_class: dict[int, int] = {}
+        self._in_flight_by_operation: dict[str, int] = {}
+        self._cooldown_until = 0.0
+        self._bucket_level = float(self.tokens_per_minute)
+        self._bucket_updated = clock()
+
+    @contextmanager
+    def slot(self, operation: str, *, estimated_tokens: int = 0) -> Iterator[SlotTicket]:
+        ticket = self.acquire(operation, estimated_tokens=estimated_tokens)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, operation: str, *, estimated_tokens: int = 0) -> AsyncIterator[SlotTicket]:
+        ticket = await self.acquire_async(operation, estimated_tokens=estimated_tokens)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    async def acquire_async(self, operation: str, *, estimated_tokens: int = 0) -> SlotTicket:
+        """``acquire`` for event-loop callers. Only the wait for admission runs
+        on an executor thread; a caller cancelled while queued never keeps the
+        slot that is granted to it afterwards."""
+        granted = asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.acquire, operation, estimated_tokens=estimated_tokens)
+        )
+        try:
+            return await asyncio.shield(granted)
+        except asyncio.CancelledError:
+            granted.add_done_callback(self._release_abandoned)
+            raise
+
+    def _release_abandoned(self, granted: "asyncio.Future[SlotTicket]") -> None:
+        if not granted.cancelled() and granted.exception() is None:
+            self.release(granted.result())
+
+    def acquire(self, operation: str, *, estimated_tokens: int = 0) -> SlotTicket:
+        priority = priority_for(operation)
+        started = self._clock()
+        entry = (priority, next(self._sequence), operation)
+        with self._condition:
+            self._waiters.append(entry)
+            try:
+                while True:
+                    delay = self._admission_delay(entry)
+                    if delay == 0.0:
+                        break
+                    self._condition.wait(timeout=delay)
+            finally:
+                self._waiters.remove(entry)
+            self._in_flight += 1
+            self._in_flight_by_class[priority] = self._in_flight_by_class.get(priority, 0) + 1
+            self._in_flight_by_operation[operation] = self._in_flight_by_operation.get(operation, 0) + 1
+            charged = max(0, int(estimated_tokens or 0)) if self.tokens_per_minute else 0
+            self._bucket_level -= charged
+            # Admission order changed; a lower-priority waiter may now be first.
+            self._condition.notify_all()
+        return SlotTicket(
+            operation=operation,
+            priority=priority,
+            queue_wait_ms=int((self._clock() - started) * 1000),
+            charged_tokens=charged,
+            _scheduler=self,
+        )
+
+    def release(self, ticket: SlotTicket) -> None:
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._in_flight_by_class[ticket.priority] = max(0, self._in_flight_by_class.get(ticket.priority, 0) - 1)
+            self._in_flight_by_operation[ticket.operation] = max(
+                0, self._in_flight_by_operation.get(ticket.operation, 0) - 1
+            )
+            self._condition.notify_all()
+
+    def note_rate_limited(self, exc: Exception, *, attempt: int = 1) -> float:
+        """Start a shared cooldown after a 429; returns the delay in seconds."""
+        delay = retry_after_seconds(exc)
+        if delay is None:
+            delay = DEFAULT_RATE_LIMIT_BACKOFF_S * (2 ** max(0, attempt - 1))
+        delay = min(max(0.0, delay), MAX_RETRY_AFTER_S)
+        with self._condition:
+            self._cooldown_until = max(self._cooldown_until, self._clock() + delay)
+            self._condition.notify_all()
+        return delay
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "cooldown_s": round(max(0.0, self._cooldown_until - self._clock()), 3),
+                "token_bucket": round(self._bucket_level, 1) if self.tokens_per_minute else None,
+            }
+
+    def _settle_tokens(self, delta: int) -> None:
+        if not self.tokens_per_minute or not delta:
+            return
+        with self._condition:
+            self._refill_bucket()
+            self._bucket_level -= delta
+            self._condition.notify_all()
+
+    def _admission_delay(self, entry: tuple[int, int, str]) -> float | None:
+        """0.0 when ``entry`` may start now; otherwise how long to wait (None = until notified)."""
+        now = self._clock()
+        if self._cooldown_until > now:
+            return self._cooldown_until - now
+        if self.tokens_per_minute:
+            self._refill_bucket()
+            if self._bucket_level <= 0:
+                return (1.0 - self._bucket_level) / (self.tokens_per_minute / 60.0)
+        if self._in_flight >= self.max_concurrency:
+            return None
+        # Slots go to the best eligible waiter: one blocked only by its own
+        # class/operation cap must not hold back a waiter that could run.
+        for waiter in sorted(self._waiters):
+            if self._within_caps(waiter[0], waiter[2]):
+                return 0.0 if waiter == entry else None
+        return None
+
+    def _within_caps(self, priority: int, operation: str) -> bool:
+        class_limit = self.class_limits.get(priority)
+        if class_limit is not None and self._in_flight_by_class.get(priority, 0) >= class_limit:
+            return False
+        operation_limit = self.operation_limits.get(operation)
+        if operation_limit is not None and self._in_flight_by_operation.get(operation, 0) >= operation_limit:
+            return False
+        return True
+
+    def _refill_bucket(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._bucket_updated)
+        self._bucket_updated = now
+        self._bucket_level = min(
+            float(self.tokens_per_minute),
+            self._bucket_level + elapsed * self.tokens_per_minute / 60.0,
+        )
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    return status_code == 429
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    """Parse ``Retry-After`` (seconds or HTTP date) / ``retry-after-ms`` off an API error."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None or not hasattr(headers, "get"):
+        return None
+    millis = headers.get("retry-after-ms")
+    if millis is not None:
+        try:
+            return float(millis) / 1000.0
+        except (TypeError, ValueError):
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+_scheduler = LLMCallScheduler()
+
+
+def get() -> LLMCallScheduler:
+    return _scheduler
+
+
+def configure(scheduler: LLMCallScheduler) -> None:
+    global _scheduler
+    _scheduler = scheduler
+
+
+def install_from_config(config: dict[str, Any] | None) -> None:
+    """Rebuild the process-wide scheduler from config; call at startup and reload.
+
+    ``llm_max_concurrency`` and ``llm_tokens_per_minute`` are normalized and
+    documented with the other settings in ``core.cli.config``."""
+    settings = normalize_llm_scheduler_settings(config)
+    max_concurrency = settings["llm_max_concurrency"]
+    class_limits = dict(DEFAULT_CLASS_LIMITS)
+    class_limits[PRIORITY_INTERACTIVE] = max_concurrency
+    configure(
+        LLMCallScheduler(
+            max_concurrency=max_concurrency,
+            class_limits=class_limits,
+            tokens_per_minute=settings["llm_tokens_per_minute"],
+        )
+    )
+
+
+def reset() -> None:
+    configure(LLMCallScheduler())
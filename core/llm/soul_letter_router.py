@@ -16,6 +16,7 @@ from core.llm.common import (
 from core.llm.types import LLMClient
 
 MATERIAL_WINDOW_DAYS = 45
+MATERIAL_POST_LIMIT = 30
 LETTER_TIMEOUT_SECONDS = 90
 
 SOUL_LETTER_PROMPT = """\
@@ -123,9 +124,13 @@ def build_letter_material(*, now: float, soul_name: str) -> LetterMaterial:
     see, not what it is told.
     """
     rows = soul_proactive_service.list_unused_public_material_rows(
-        since=now - MATERIAL_WINDOW_DAYS * soul_proactive_service.DAY_SECONDS
+        since=now - MATERIAL_WINDOW_DAYS * soul_proactive_service.DAY_SECONDS,
+        limit=MATERIAL_POST_LIMIT,
+    )
+    own_replies = soul_proactive_service.own_comments_by_post(
+        soul_name,
+        [str(row["post_id"]) for row in rows if row["item_kind"] == "post"],
     )
-    own_replies = soul_proactive_service.own_comments_by_post(soul_name)
     sections: list[str] = []
     post_ids: list[str] = []
     for row in rows:
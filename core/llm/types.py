@@ -9,3 +9,9 @@ class LLMClient(Protocol):
     """Minimal client surface used by TraceLog LLM routers."""
 
     chat: Any
+
+
+class AsyncLLMClient(Protocol):
+    """Awaitable counterpart (e.g. ``openai.AsyncOpenAI``) used for streamed replies."""
+
+    chat: Any
@@ -238,6 +238,8 @@ def log_llm_call(
     response_format: dict | None = None,
     usage: dict | None = None,
     finish_reason: str | None = None,
+    queue_wait_ms: int | None = None,
+    cache_hit: bool = False,
 ) -> None:
     """Write one LLM call, gating conversational content independently."""
     include_content = _capture_content or status != "ok"
@@ -271,6 +273,8 @@ def log_llm_call(
         "context": context or {},
         "usage": usage,
         "finish_reason": finish_reason,
+        "queue_wait_ms": queue_wait_ms,
+        "cache_hit": cache_hit,
         "request": request_payload,
         "response": response_payload,
     }
@@ -38,6 +38,9 @@ SOURCE_TYPES = frozenset(
 # delete challenge propagates to both user-fact and relationship units.
 COMMENT_SOURCE_TYPES = ("comment_message", "comment_relationship")
 EVENT_OPS = frozenset({"create", "edit", "rerun", "delete"})
+# Six bound parameters per chat target keeps one window query under SQLite's
+# default 999-variable limit.
+_CHAT_TARGETS_PER_QUERY = 100
 
 
 def soul_scope(soul_name: str) -> str:
@@ -69,18 +72,6 @@ def _content_hash(snapshot: str | None) -> str | None:
     return hashlib.sha256(snapshot.encode("utf-8")).hexdigest()
 
 
-def _next_revision(conn: sqlite3.Connection, source_type: str, source_id: str) -> int:
-    row = conn.execute(
-        """
-        SELECT COALESCE(MAX(source_revision), 0) AS max_rev
-        FROM memory_ingest_events
-        WHERE source_type = ? AND source_id = ?
-        """,
-        (source_type, source_id),
-    ).fetchone()
-    return int(row["max_rev"]) + 1
-
-
 def append_event(
     conn: sqlite3.Connection,
     *,
@@ -114,15 +105,24 @@ def append_event(
         raise ValueError("owner_scope / visibility_scope 不能为空")
 
     source_id = str(source_id)
-    revision = _next_revision(conn, source_type, source_id)
     created = db.now_ts() if created_at is None else float(created_at)
-    cursor = conn.execute(
+    # The next revision comes from the source's head row inside the INSERT
+    # itself; the memory_source_heads_ai trigger then advances the head.
+    row = conn.execute(
         """
         INSERT INTO memory_ingest_events(
             owner_scope, visibility_scope, source_channel, source_type,
             source_id, source_revision, op, author, content_snapshot, content_hash,
             occurred_at, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        )
+        SELECT ?, ?, ?, ?, ?,
+               COALESCE(
+                   (SELECT source_revision FROM memory_source_heads
+                    WHERE source_type = ? AND source_id = ?),
+                   0
+               ) + 1,
+               ?, ?, ?, ?, ?, ?
+        RETURNING id, source_revision
         """,
         (
             owner_scope,
@@ -130,7 +130,8 @@ def append_event(
             source_channel,
             source_type,
             source_id,
-            revision,
+            source_type,
+            source_id,
             op,
             author,
             content_snapshot,
@@ -138,8 +139,9 @@ def append_event(
             float(occurred_at),
             created,
         ),
-    )
-    event_id = db.require_lastrowid(cursor, "memory_ingest_event insert")
+    ).fetchall()[0]
+    event_id = int(row["id"])
+    revision = int(row["source_revision"])
     return IngestEvent(
         id=event_id,
         source_type=source_type,
@@ -372,11 +374,10 @@ def latest_source_event(
     conn: sqlite3.Connection | None = None,
 ) -> sqlite3.Row | None:
     sql = """
-        SELECT *
-        FROM memory_ingest_events
-        WHERE source_type = ? AND source_id = ?
-        ORDER BY source_revision DESC, id DESC
-        LIMIT 1
+        SELECT e.*
+        FROM memory_source_heads head
+        JOIN memory_ingest_events e ON e.id = head.event_id
+        WHERE head.source_type = ? AND head.source_id = ?
     """
     params = (str(source_type), str(source_id))
     if conn is not None:
@@ -443,19 +444,12 @@ def list_current_events_in_bucket(
     rows = db.query_all(
         """
         SELECT e.*
-        FROM memory_ingest_events e
-        WHERE e.owner_scope = ? AND e.visibility_scope = ?
-          AND e.id = (
-              SELECT newest.id
-              FROM memory_ingest_events newest
-              WHERE newest.source_type = e.source_type
-                AND newest.source_id = e.source_id
-              ORDER BY newest.source_revision DESC, newest.id DESC
-              LIMIT 1
-          )
-          AND e.op != 'delete'
+        FROM memory_source_heads head
+        JOIN memory_ingest_events e ON e.id = head.event_id
+        WHERE head.owner_scope = ? AND head.visibility_scope = ?
+          AND head.op != 'delete'
           AND TRIM(COALESCE(e.content_snapshot, '')) != ''
-        ORDER BY e.id DESC
+        ORDER BY head.event_id DESC
         LIMIT ?
         """,
         (owner_scope, visibility_scope, int(limit)),
@@ -473,63 +467,146 @@ def conversation_context_for_event(
     These rows are context only: they deliberately expose no memory event ids,
     so the reconcile model cannot cite assistant messages as belief evidence.
     """
-    source_type = str(event["source_type"])
-    source_id = str(event["source_id"])
-    radius = max(1, min(int(radius), 10))
+    return conversation_contexts_for_events([event], radius=radius)[0]
+
 
-    if source_type in COMMENT_SOURCE_TYPES:
-        target = db.query_one(
-            "SELECT post_id, soul_name, seq FROM comments WHERE id = ?",
-            (int(source_id),),
+def conversation_contexts_for_events(
+    events: list[sqlite3.Row] | list[dict],
+    *,
+    radius: int = 4,
+) -> list[list[dict]]:
+    """conversation_context_for_event for a whole batch, aligned with ``events``.
+
+    Targets are resolved with one lookup per source kind, then each comment
+    conversation (post, soul) or chat thread is read once for the union of its
+    windows and sliced in memory, so a reconcile batch costs a query per
+    conversation instead of up to three per event.
+    """
+    radius = max(1, min(int(radius), 10))
+    contexts: list[list[dict]] = [[] for _ in events]
+    comment_slots: dict[int, list[int]] = {}
+    chat_slots: dict[int, list[int]] = {}
+    for index, event in enumerate(events):
+        source_type = str(event["source_type"])
+        if source_type in COMMENT_SOURCE_TYPES:
+            comment_slots.setdefault(int(event["source_id"]), []).append(index)
+        elif source_type == "chat_message":
+            chat_slots.setdefault(int(event["source_id"]), []).append(index)
+
+    if comment_slots:
+        _fill_comment_contexts(contexts, comment_slots, radius)
+    if chat_slots:
+        _fill_chat_contexts(contexts, chat_slots, radius)
+    return contexts
+
+
+def _fill_comment_contexts(
+    contexts: list[list[dict]],
+    slots: dict[int, list[int]],
+    radius: int,
+) -> None:
+    targets = _rows_by_id(
+        "SELECT id, post_id, soul_name, seq FROM comments WHERE id IN ({ids})",
+        list(slots),
+    )
+    conversations: dict[tuple[str, str], list[sqlite3.Row]] = {}
+    for target in targets.values():
+        conversations.setdefault((target["post_id"], target["soul_name"]), []).append(target)
+    for (post_id, soul_name), members in conversations.items():
+        windows = _merge_windows(
+            (max(0, int(target["seq"]) - radius), int(target["seq"]) + radius)
+            for target in members
         )
-        if target is None:
-            return []
         rows = db.query_all(
-            """
+            f"""
             SELECT id, role, content, seq
             FROM comments
             WHERE post_id = ? AND soul_name = ?
-              AND seq BETWEEN ? AND ?
+              AND ({" OR ".join("seq BETWEEN ? AND ?" for _ in windows)})
             ORDER BY seq ASC
             """,
-            (
-                target["post_id"],
-                target["soul_name"],
-                max(0, int(target["seq"]) - radius),
-                int(target["seq"]) + radius,
-            ),
-        )
-    elif source_type == "chat_message":
-        target = db.query_one(
-            "SELECT id, thread_id FROM chat_messages WHERE id = ?",
-            (int(source_id),),
-        )
-        if target is None:
-            return []
-        previous = db.query_all(
-            """
-            SELECT id, role, content
-            FROM chat_messages
-            WHERE thread_id = ? AND id <= ?
-            ORDER BY id DESC
-            LIMIT ?
-            """,
-            (target["thread_id"], target["id"], radius + 1),
+            (post_id, soul_name, *(bound for window in windows for bound in window)),
         )
-        following = db.query_all(
-            """
-            SELECT id, role, content
-            FROM chat_messages
-            WHERE thread_id = ? AND id > ?
-            ORDER BY id ASC
-            LIMIT ?
-            """,
-            (target["thread_id"], target["id"], radius),
-        )
-        rows = list(reversed(previous)) + list(following)
-    else:
-        return []
+        for target in members:
+            low, high = max(0, int(target["seq"]) - radius), int(target["seq"]) + radius
+            context = _context_rows(row for row in rows if low <= int(row["seq"]) <= high)
+            for index in slots[int(target["id"])]:
+                contexts[index] = list(context)
+
+
+def _fill_chat_contexts(
+    contexts: list[list[dict]],
+    slots: dict[int, list[int]],
+    radius: int,
+) -> None:
+    targets = _rows_by_id(
+        "SELECT id, thread_id FROM chat_messages WHERE id IN ({ids})",
+        list(slots),
+    )
+    threads: dict[int, list[int]] = {}
+    for target in targets.values():
+        threads.setdefault(int(target["thread_id"]), []).append(int(target["id"]))
+    for thread_id, target_ids in threads.items():
+        for offset in range(0, len(target_ids), _CHAT_TARGETS_PER_QUERY):
+            _fill_thread_chat_contexts(
+                contexts, slots, thread_id, target_ids[offset:offset + _CHAT_TARGETS_PER_QUERY], radius
+            )
+
+
+def _fill_thread_chat_contexts(
+    contexts: list[list[dict]],
+    slots: dict[int, list[int]],
+    thread_id: int,
+    target_ids: list[int],
+    radius: int,
+) -> None:
+    # Chat windows are positional (radius messages either side, by id). Each
+    # target costs two LIMIT seeks over ids only; content is read just for the
+    # union of those windows, never for the rest of the thread.
+    seek = (
+        "SELECT id FROM (SELECT id FROM chat_messages WHERE thread_id = ? AND id < ? ORDER BY id DESC LIMIT ?)"
+        " UNION "
+        "SELECT id FROM (SELECT id FROM chat_messages WHERE thread_id = ? AND id >= ? ORDER BY id ASC LIMIT ?)"
+    )
+    params: list[int] = []
+    for target_id in target_ids:
+        params.extend((thread_id, target_id, radius, thread_id, target_id, radius + 1))
+    rows = db.query_all(
+        f"""
+        WITH window_ids(id) AS ({" UNION ".join(seek for _ in target_ids)})
+        SELECT chat_messages.id, chat_messages.role, chat_messages.content
+        FROM chat_messages
+        JOIN window_ids ON window_ids.id = chat_messages.id
+        ORDER BY chat_messages.id ASC
+        """,
+        params,
+    )
+    # Every window is a contiguous run of the thread and is fully fetched, so
+    # a target's neighbours in ``rows`` are exactly its neighbours in the thread.
+    positions = {int(row["id"]): index for index, row in enumerate(rows)}
+    for target_id in target_ids:
+        position = positions[target_id]
+        context = _context_rows(rows[max(0, position - radius):position + radius + 1])
+        for index in slots[target_id]:
+            contexts[index] = list(context)
+
+
+def _rows_by_id(sql: str, ids: list[int]) -> dict[int, sqlite3.Row]:
+    rows = db.query_all(sql.format(ids=",".join("?" for _ in ids)), ids)
+    return {int(row["id"]): row for row in rows}
+
+
+def _merge_windows(windows) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for low, high in sorted(windows):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
 
+def _context_rows(rows) -> list[dict]:
     return [
         {
             "source_id": str(row["id"]),
@@ -28,6 +28,12 @@ class ReconcileProducerError(RuntimeError):
     """
 
 
+class RelinkCallError(ReconcileProducerError):
+    """The memory_relink request itself failed (timeout, API error, 429 after
+    retries), as opposed to an answer that did not parse. A smaller batch
+    would fail the same way, so the runner does not split on it."""
+
+
 def _soul_of(owner_scope: str) -> str | None:
     return owner_scope[len("soul:"):] if owner_scope.startswith("soul:") else None
 
@@ -160,21 +166,32 @@ def _format_relink_evidence(evidence: list[dict]) -> str:
 
 
 def make_relink_judge(client: LLMClient, model: str, *, trace_context: dict | None = None):
-    """Return a narrow judge for the post-edit re-link pass: given a unit's new
-    content and its candidate evidence, decide which links still support it."""
-
-    def judge(*, content: str, evidence: list[dict]) -> dict:
+    """Return a batched judge for the post-edit re-link pass: given several
+    units' new content and candidate evidence ([{"content", "evidence"}]),
+    decide per unit which links still support it. Returns one answer per item
+    in order (None where the model skipped that item). Raises RelinkCallError
+    when the request failed, and ReconcileProducerError when the whole answer
+    did not parse so the runner can split the batch."""
+
+    def judge(items: list[dict]) -> list[dict | None]:
+        statuses: list[str] = []
         result = memory_router.call_memory_relink(
             client,
             model,
-            content=content,
-            evidence_text=_format_relink_evidence(evidence),
+            items=[
+                {
+                    "content": item["content"],
+                    "evidence_text": _format_relink_evidence(item["evidence"]),
+                }
+                for item in items
+            ],
             trace_context=dict(trace_context or {}),
+            status_callback=lambda attempt: statuses.append(str(attempt.get("status"))),
         )
         if result is None:
-            raise ReconcileProducerError(
-                "memory_relink LLM call failed or returned unparseable JSON"
-            )
+            if statuses and statuses[-1] == "api_error":
+                raise RelinkCallError("memory_relink LLM call failed")
+            raise ReconcileProducerError("memory_relink returned unparseable JSON")
         return result
 
     return judge
@@ -23,6 +23,7 @@ from core import (
     memory_unit_service as mus,
 )
 from core.memory_reconcile_producer import (
+    RelinkCallError,
     make_consolidation_producer,
     make_llm_op_producer,
     make_relink_judge,
@@ -50,11 +51,28 @@ class RelinkRunResult:
 
 
 
+# Re-link reviews are packed into one judge call up to this many prompt tokens
+# (chars // 2, the scheduler's estimate) or units; a unit over budget goes alone.
+RELINK_BATCH_TOKEN_BUDGET = 6000
+RELINK_BATCH_MAX_UNITS = 12
+
+
+@dataclass
+class _RelinkItem:
+    relink_id: int
+    unit_id: str
+    version: float
+    content: str
+    evidence: list[dict]
+    candidate_ids: set[int]
+
+
 def run_pending_relinks(
     client: LLMClient,
     model: str,
     *,
     judge=None,
+    batch_judge=None,
     trace_context: dict | None = None,
 ) -> RelinkRunResult:
     """Process pending post-edit re-link reviews.
@@ -63,15 +81,24 @@ def run_pending_relinks(
     links still support the new content, then apply keep/drop atomically. A judge
     failure leaves that review pending (no data lost); a unit changed mid-judge
     discards the stale result (see ``apply_relink``). Anything the judge does not
-    explicitly keep is dropped, so every candidate link is resolved."""
-    judge = judge or make_relink_judge(client, model, trace_context=trace_context)
+    explicitly keep is dropped, so every candidate link is resolved.
+
+    Reviews are judged in token-budgeted batches (``batch_judge``); ``judge``
+    injects a per-unit judge instead. A batch whose answer fails to parse is
+    split in half and retried (a failed request is not: its units stay pending), and a unit whose own answer is missing or cites
+    evidence it was not shown is re-judged alone, so one bad item never costs
+    the rest of the batch."""
+    max_units = RELINK_BATCH_MAX_UNITS
+    if judge is not None:
+        batch_judge, max_units = _per_unit_batch_judge(judge), 1
+    batch_judge = batch_judge or make_relink_judge(client, model, trace_context=trace_context)
     applied = 0
-    failures: list[RelinkFailure] = []
+    items: list[_RelinkItem] = []
     for review in mus.list_pending_relinks():
         relink_id = int(review["relink_id"])
         unit_id = str(review["unit_id"])
         version = float(review["updated_at"])
-        candidates = mus.pending_review_evidence_for_unit(unit_id)
+        candidates = [dict(c) for c in mus.pending_review_evidence_for_unit(unit_id)]
         candidate_ids = {int(c["event_id"]) for c in candidates}
         if not candidate_ids:
             mus.apply_relink(
@@ -79,27 +106,126 @@ def run_pending_relinks(
                 keep_event_ids=[], drop_event_ids=[],
             )
             continue
-        try:
-            result = judge(
+        items.append(
+            _RelinkItem(
+                relink_id=relink_id,
+                unit_id=unit_id,
+                version=version,
                 content=str(review["content"]),
-                evidence=[dict(c) for c in candidates],
+                evidence=candidates,
+                candidate_ids=candidate_ids,
             )
-        except Exception as exc:
+        )
+    keeps, errors = _judge_relink_items(batch_judge, items, max_units=max_units)
+    failures: list[RelinkFailure] = []
+    for item in items:
+        if item.relink_id in errors:
             logging_service.log_event(
-                "memory_relink_failed", unit_id=unit_id, error=str(exc)
+                "memory_relink_failed", unit_id=item.unit_id, error=errors[item.relink_id]
             )
-            failures.append(RelinkFailure(unit_id=unit_id, error=str(exc)))
+            failures.append(RelinkFailure(unit_id=item.unit_id, error=errors[item.relink_id]))
             continue
-        keep = {int(x) for x in (result.get("keep_event_ids") or [])} & candidate_ids
-        drop = candidate_ids - keep
+        keep = keeps[item.relink_id]
+        drop = item.candidate_ids - keep
         if mus.apply_relink(
-            relink_id, unit_id, expected_version=version,
+            item.relink_id, item.unit_id, expected_version=item.version,
             keep_event_ids=sorted(keep), drop_event_ids=sorted(drop),
         ):
             applied += 1
     return RelinkRunResult(applied=applied, failures=failures)
 
 
+def _judge_relink_items(
+    batch_judge, items: list[_RelinkItem], *, max_units: int
+) -> tuple[dict[int, set[int]], dict[int, str]]:
+    """Run ``batch_judge`` over ``items``; returns (relink_id -> kept event ids,
+    relink_id -> error) with every item in exactly one of the two."""
+    keeps: dict[int, set[int]] = {}
+    errors: dict[int, str] = {}
+    pending = _pack_relink_batches(items, max_units=max_units)
+    while pending:
+        batch = pending.pop(0)
+        try:
+            answers = list(
+                batch_judge([{"content": item.content, "evidence": item.evidence} for item in batch])
+            )
+        except RelinkCallError as exc:
+            # The provider is failing, not the answer: halving would only
+            # multiply failing calls. These reviews stay pending for next run.
+            for item in batch:
+                errors[item.relink_id] = str(exc)
+            continue
+        except Exception as exc:
+            if len(batch) == 1:
+                errors[batch[0].relink_id] = str(exc)
+                continue
+            logging_service.log_event(
+                "memory_relink_batch_split", units=len(batch), error=str(exc)
+            )
+            middle = len(batch) // 2
+            pending[:0] = [batch[:middle], batch[middle:]]
+            continue
+        answers += [None] * (len(batch) - len(answers))
+        for item, answer in zip(batch, answers):
+            keep = _validated_keep(item, answer, batched=len(batch) > 1)
+            if keep is not None:
+                keeps[item.relink_id] = keep
+            elif len(batch) > 1:
+                pending.append([item])
+            else:
+                errors[item.relink_id] = "relink judge returned no valid answer for this unit"
+    return keeps, errors
+
+
+def _validated_keep(item: _RelinkItem, answer, *, batched: bool) -> set[int] | None:
+    """The unit's kept event ids, or None when its answer is unusable: missing,
+    or — in a batch — citing an event that is not among this unit's candidates
+    (a sign the model crossed items). Judged alone, stray ids are just ignored."""
+    if not isinstance(answer, dict) or not isinstance(answer.get("keep_event_ids"), list):
+        return None
+    try:
+        keep = {int(x) for x in answer["keep_event_ids"]}
+    except (TypeError, ValueError):
+        return None
+    if batched and not keep <= item.candidate_ids:
+        return None
+    return keep & item.candidate_ids
+
+
+def _pack_relink_batches(
+    items: list[_RelinkItem], *, max_units: int
+) -> list[list[_RelinkItem]]:
+    batches: list[list[_RelinkItem]] = []
+    current: list[_RelinkItem] = []
+    used = 0
+    for item in items:
+        cost = _relink_item_tokens(item)
+        if current and (
+            used + cost > RELINK_BATCH_TOKEN_BUDGET or len(current) >= max_units
+        ):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _relink_item_tokens(item: _RelinkItem) -> int:
+    chars = len(item.content) + sum(
+        len(str(e.get("content") or "")) + 40 for e in item.evidence
+    )
+    return chars // 2 + 1
+
+
+def _per_unit_batch_judge(judge):
+    def batch_judge(items: list[dict]) -> list[dict | None]:
+        return [judge(content=item["content"], evidence=item["evidence"]) for item in items]
+
+    return batch_judge
+
+
 def backfill_tombstone_claims(
     client: LLMClient,
     model: str,
@@ -622,9 +622,10 @@ def reconcile_bucket(
 
     boundary = {"owner_scope": owner_scope, "visibility_scope": visibility_scope}
     producer_events: list[dict] = []
-    for event in user_events:
+    contexts = mes.conversation_contexts_for_events(user_events)
+    for event, context in zip(user_events, contexts):
         item = dict(event)
-        item["conversation_context"] = mes.conversation_context_for_event(event)
+        item["conversation_context"] = context
         producer_events.append(item)
     needs_llm = bool(user_events or required_decisions)
     result = (
@@ -81,10 +81,8 @@ def decay_dormant(
         """,
         (owner_scope, cutoff),
     ).fetchall()
-    decayed: list[str] = []
-    for row in rows:
-        mus.decay_unit(str(row["id"]), conn=conn)
-        decayed.append(str(row["id"]))
+    decayed = [str(row["id"]) for row in rows]
+    mus.decay_units(decayed, conn=conn)
     return decayed
 
 
@@ -105,12 +103,9 @@ def promote_core(owner_scope: str, *, conn) -> list[str]:
         """,
         (owner_scope, mvs.ENTER, mvs.MIN_IMPORTANCE),
     ).fetchall()
-    promoted: list[str] = []
-    for row in rows:
-        unit_id = str(row["id"])
-        if mus.count_confirm_ops(unit_id, conn=conn) >= PROMOTE_MIN_CONFIRMS:
-            mus.promote_unit_tier(unit_id, tier="core", conn=conn)
-            promoted.append(unit_id)
+    confirms = mus.count_confirm_ops_many([str(row["id"]) for row in rows], conn=conn)
+    promoted = [unit_id for unit_id, n in confirms.items() if n >= PROMOTE_MIN_CONFIRMS]
+    mus.promote_units_tier(promoted, tier="core", conn=conn)
     return promoted
 
 
@@ -113,6 +113,22 @@ def _get_unit_row(conn: sqlite3.Connection, unit_id: str) -> sqlite3.Row | None:
     return conn.execute("SELECT * FROM memory_units WHERE id = ?", (unit_id,)).fetchone()
 
 
+# Keeps bulk IN (...) lists well under SQLite's bound-parameter limit.
+_ID_CHUNK = 500
+
+
+def _get_unit_rows(conn: sqlite3.Connection, unit_ids: list[str]) -> dict[str, sqlite3.Row]:
+    rows: dict[str, sqlite3.Row] = {}
+    for start in range(0, len(unit_ids), _ID_CHUNK):
+        chunk = unit_ids[start:start + _ID_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT * FROM memory_units WHERE id IN ({placeholders})", chunk
+        ):
+            rows[str(row["id"])] = row
+    return rows
+
+
 def _assert_events_in_boundary(
     conn: sqlite3.Connection,
     owner_scope: str,
@@ -164,23 +180,47 @@ def _record_op(
     related_unit_id: str | None = None,
     reconcile_run_id: int | None = None,
 ) -> None:
-    conn.execute(
+    _record_ops(
+        conn,
+        op=op,
+        actor=actor,
+        changes=[(unit_id, before, after)],
+        related_unit_id=related_unit_id,
+        reconcile_run_id=reconcile_run_id,
+    )
+
+
+def _record_ops(
+    conn: sqlite3.Connection,
+    *,
+    op: str,
+    actor: str,
+    changes: list[tuple[str, dict | None, dict | None]],
+    related_unit_id: str | None = None,
+    reconcile_run_id: int | None = None,
+) -> None:
+    """Audit one op over many units — ``changes`` is (unit_id, before, after)."""
+    now = db.now_ts()
+    conn.executemany(
         """
         INSERT INTO memory_unit_ops(
             unit_id, related_unit_id, op, actor, before_json, after_json,
             reconcile_run_id, created_at
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (
-            unit_id,
-            related_unit_id,
-            op,
-            actor,
-            json.dumps(before, ensure_ascii=False) if before is not None else None,
-            json.dumps(after, ensure_ascii=False) if after is not None else None,
-            reconcile_run_id,
-            db.now_ts(),
-        ),
+        [
+            (
+                unit_id,
+                related_unit_id,
+                op,
+                actor,
+                json.dumps(before, ensure_ascii=False) if before is not None else None,
+                json.dumps(after, ensure_ascii=False) if after is not None else None,
+                reconcile_run_id,
+                now,
+            )
+            for unit_id, before, after in changes
+        ],
     )
 
 
@@ -531,24 +571,24 @@ def decay_unit(
     while staying as history that a future confirm can revive. Only callable on
     an active reflected unit; identity-floor (core) and user-authored beliefs are
     out of scope and rejected by the caller, never decayed here silently."""
-    now = db.now_ts()
-    with _conn_ctx(conn) as c:
-        row = _get_unit_row(c, unit_id)
-        if row is None:
-            raise ValueError(f"unit 不存在：{unit_id}")
-        if row["status"] != "active":
-            raise ValueError("decay 只能作用于 active unit")
-        before = _row_to_dict(row)
-        c.execute(
-            "UPDATE memory_units SET status = 'dormant', in_portrait = 0, updated_at = ? "
-            "WHERE id = ?",
-            (now, unit_id),
-        )
-        after = _row_to_dict(_get_unit_row(c, unit_id))
-        _record_op(
-            c, unit_id=unit_id, op="decay", actor=actor, before=before, after=after
-        )
-        _mark_bucket_view_stale(c, row["owner_scope"], row["visibility_scope"], now)
+    decay_units([unit_id], actor=actor, conn=conn)
+
+
+def decay_units(
+    unit_ids: list[str],
+    *,
+    actor: str = "reflection",
+    conn: sqlite3.Connection | None = None,
+) -> None:
+    """Set-based :func:`decay_unit`: one read, one batched update and audit
+    write, and each touched bucket's views marked stale once (not per unit)."""
+    _transition_units(
+        unit_ids,
+        op="decay",
+        actor=actor,
+        assignments={"status": "dormant", "in_portrait": 0},
+        conn=conn,
+    )
 
 
 def promote_unit_tier(
@@ -561,25 +601,69 @@ def promote_unit_tier(
     """Deep reflection sediments a unit's tier (e.g. contextual -> core after it
     survives repeated confirms). Tier only; content and evidence are untouched.
     Recomputes portrait membership so a promotion can newly enter the portrait."""
+    promote_units_tier([unit_id], tier=tier, actor=actor, conn=conn)
+
+
+def promote_units_tier(
+    unit_ids: list[str],
+    *,
+    tier: str,
+    actor: str = "reflection",
+    conn: sqlite3.Connection | None = None,
+) -> None:
+    """Set-based :func:`promote_unit_tier`; portrait membership is recomputed
+    once per touched bucket."""
     if tier not in {"core", "contextual", "episodic"}:
         raise ValueError(f"非法 tier：{tier}")
+    _transition_units(
+        unit_ids, op="promote", actor=actor, assignments={"tier": tier}, conn=conn
+    )
+
+
+def _transition_units(
+    unit_ids: list[str],
+    *,
+    op: str,
+    actor: str,
+    assignments: dict[str, object],
+    conn: sqlite3.Connection | None,
+) -> None:
+    """Apply the same column assignments to a set of active units.
+
+    All ids are validated before anything is written, so a bad id leaves the
+    whole batch untouched. ``assignments`` keys are trusted column names."""
+    unit_ids = list(dict.fromkeys(unit_ids))
+    if not unit_ids:
+        return
     now = db.now_ts()
     with _conn_ctx(conn) as c:
-        row = _get_unit_row(c, unit_id)
-        if row is None:
-            raise ValueError(f"unit 不存在：{unit_id}")
-        if row["status"] != "active":
-            raise ValueError("promote 只能作用于 active unit")
-        before = _row_to_dict(row)
-        c.execute(
-            "UPDATE memory_units SET tier = ?, updated_at = ? WHERE id = ?",
-            (tier, now, unit_id),
+        rows = _get_unit_rows(c, unit_ids)
+        for unit_id in unit_ids:
+            row = rows.get(unit_id)
+            if row is None:
+                raise ValueError(f"unit 不存在：{unit_id}")
+            if row["status"] != "active":
+                raise ValueError(f"{op} 只能作用于 active unit")
+        columns = [*assignments, "updated_at"]
+        values = [*assignments.values(), now]
+        c.executemany(
+            f"UPDATE memory_units SET {', '.join(f'{col} = ?' for col in columns)} "
+            "WHERE id = ?",
+            [(*values, unit_id) for unit_id in unit_ids],
         )
-        after = _row_to_dict(_get_unit_row(c, unit_id))
-        _record_op(
-            c, unit_id=unit_id, op="promote", actor=actor, before=before, after=after
+        # No trigger rewrites memory_units, so the after-image is the before-image
+        # plus exactly the columns just assigned.
+        changes = []
+        for unit_id in unit_ids:
+            before = _row_to_dict(rows[unit_id])
+            changes.append((unit_id, before, {**before, **dict(zip(columns, values))}))
+        _record_ops(c, op=op, actor=actor, changes=changes)
+        buckets = dict.fromkeys(
+            (rows[unit_id]["owner_scope"], rows[unit_id]["visibility_scope"])
+            for unit_id in unit_ids
         )
-        _mark_bucket_view_stale(c, row["owner_scope"], row["visibility_scope"], now)
+        for owner_scope, visibility_scope in buckets:
+            _mark_bucket_view_stale(c, owner_scope, visibility_scope, now)
 
 
 # --- cross-bucket links & contested marks (P1: link, never merge) ----------
@@ -742,6 +826,28 @@ def count_confirm_ops(unit_id: str, *, conn: sqlite3.Connection | None = None) -
     return int(db.query_one(sql, (unit_id,))["n"])
 
 
+def count_confirm_ops_many(
+    unit_ids: list[str], *, conn: sqlite3.Connection | None = None
+) -> dict[str, int]:
+    """:func:`count_confirm_ops` for a set of units in one grouped query per
+    chunk; units never confirmed map to 0."""
+    counts = dict.fromkeys(unit_ids, 0)
+    ids = list(counts)
+    for start in range(0, len(ids), _ID_CHUNK):
+        chunk = ids[start:start + _ID_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        sql = f"""
+            SELECT unit_id, COUNT(*) AS n
+            FROM memory_unit_ops
+            WHERE op = 'confirm' AND unit_id IN ({placeholders})
+            GROUP BY unit_id
+        """
+        rows = conn.execute(sql, chunk).fetchall() if conn is not None else db.query_all(sql, chunk)
+        for row in rows:
+            counts[str(row["unit_id"])] = int(row["n"])
+    return counts
+
+
 # --- user-facing workbench primitives --------------------------------------
 
 def update_unit(
@@ -1306,18 +1412,11 @@ def current_effective_evidence_for_unit(
         )
         SELECT latest.*, 'supports' AS relation
         FROM linked_sources source
-        JOIN memory_ingest_events latest
-          ON latest.source_type = source.source_type
-         AND latest.source_id = source.source_id
-        WHERE latest.id = (
-              SELECT newest.id
-              FROM memory_ingest_events newest
-              WHERE newest.source_type = source.source_type
-                AND newest.source_id = source.source_id
-              ORDER BY newest.source_revision DESC, newest.id DESC
-              LIMIT 1
-          )
-          AND latest.op != 'delete'
+        JOIN memory_source_heads head
+          ON head.source_type = source.source_type
+         AND head.source_id = source.source_id
+        JOIN memory_ingest_events latest ON latest.id = head.event_id
+        WHERE latest.op != 'delete'
           AND latest.author = 'user'
           AND TRIM(COALESCE(latest.content_snapshot, '')) != ''
         ORDER BY latest.id ASC
@@ -77,13 +77,19 @@ def refresh_views_after_reconcile(
     """Re-synthesize every stale or missing view after a reconcile pass.
 
     Each view module owns its own refresh enumeration. Hash-gated views whose
-    selected unit set is unchanged stay fresh and are skipped. Synthesis errors
-    fall back to deterministic templates."""
+    selected unit set is unchanged stay fresh and are skipped. Per-bucket
+    portraits synthesize incrementally, one section per unit type; SOUL
+    relationship memory is one cross-scene synthesis and stays whole.
+    Synthesis errors fall back to deterministic templates."""
     results: list[mvs.SynthesizedView] = []
     for owner_scope, visibility_scope, view_type in mvs.per_bucket_views_needing_refresh():
         synthesizer = make_llm_synthesizer(client, model, view_type, trace_context=trace_context)
+        # Incremental: a belief edit re-synthesizes only its unit type's section.
         results.append(
-            mvs.synthesize_view(owner_scope, visibility_scope, view_type, synthesizer=synthesizer)
+            mvs.synthesize_view(
+                owner_scope, visibility_scope, view_type,
+                synthesizer=synthesizer, incremental=True,
+            )
         )
     for soul_name in srm.souls_needing_view():
         synthesizer = make_llm_synthesizer(
@@ -10,7 +10,8 @@ This module owns:
   * the source_unit_set_hash that drives stale/re-synthesis,
   * a deterministic template renderer (the failure fallback / default), and
   * synthesize_view, which accepts an injectable LLM synthesizer
-    and falls back to the template.
+    and falls back to the template, optionally section by section so an
+    unchanged unit type reuses its previous synthesis.
 """
 
 from __future__ import annotations
@@ -64,6 +65,7 @@ _TYPE_LABEL = {
     "insight": "洞察",
     "freeform": "其他",
 }
+_SECTION_SEPARATOR = "\n\n"
 
 
 def _new_view_id() -> str:
@@ -138,6 +140,10 @@ def behavior_score(
             (unit["id"],),
         ).fetchone()["n"]
     )
+    return _score_counts(confirms, evidence, float(unit["first_seen"]), now=now)
+
+
+def _score_counts(confirms: int, evidence: int, first_seen: float, *, now: float) -> int:
     score = 0
     if confirms >= 1:
         score += 1
@@ -145,11 +151,43 @@ def behavior_score(
         score += 1
     if evidence >= 2:
         score += 1
-    if now - float(unit["first_seen"]) >= SURVIVAL_DAYS * 86400.0:
+    if now - first_seen >= SURVIVAL_DAYS * 86400.0:
         score += 1
     return score
 
 
+# One pass over the boundary: the same counts behavior_score takes per unit,
+# grouped for every unit at once (idx_unit_ops_unit / the evidence PK).
+_BOUNDARY_WITH_COUNTS_SQL = """
+    WITH boundary AS (
+        SELECT id FROM memory_units
+        WHERE owner_scope = ? AND visibility_scope = ?
+    ),
+    confirms AS (
+        SELECT unit_id, COUNT(*) AS n
+        FROM memory_unit_ops
+        WHERE op = 'confirm' AND unit_id IN (SELECT id FROM boundary)
+        GROUP BY unit_id
+    ),
+    evidence AS (
+        SELECT unit_id, COUNT(DISTINCT event_id) AS n
+        FROM memory_unit_evidence
+        WHERE review_pending = 0
+          AND relation IN ('supports', 'source')
+          AND unit_id IN (SELECT id FROM boundary)
+        GROUP BY unit_id
+    )
+    SELECT
+        memory_units.*,
+        COALESCE(confirms.n, 0) AS confirm_count,
+        COALESCE(evidence.n, 0) AS evidence_count
+    FROM memory_units
+    LEFT JOIN confirms ON confirms.unit_id = memory_units.id
+    LEFT JOIN evidence ON evidence.unit_id = memory_units.id
+    WHERE memory_units.owner_scope = ? AND memory_units.visibility_scope = ?
+"""
+
+
 def passes_core_predicate(
     unit: sqlite3.Row, *, currently_in_slice: bool, behavior_score: int = 0
 ) -> bool:
@@ -169,28 +207,29 @@ def recompute_portrait_membership(
     (ordered for rendering). Hysteresis uses each unit's current flag."""
     def _run(c: sqlite3.Connection) -> list[str]:
         rows = c.execute(
-            """
-            SELECT * FROM memory_units
-            WHERE owner_scope = ? AND visibility_scope = ?
-            """,
-            (owner_scope, visibility_scope),
+            _BOUNDARY_WITH_COUNTS_SQL,
+            (owner_scope, visibility_scope, owner_scope, visibility_scope),
         ).fetchall()
         now = db.now_ts()
         core_ids: list[str] = []
+        changes: list[tuple[int, str]] = []
         for row in rows:
             currently = bool(row["in_portrait"])
+            score = _score_counts(
+                int(row["confirm_count"]),
+                int(row["evidence_count"]),
+                float(row["first_seen"]),
+                now=now,
+            )
             keep = _passes_core_predicate(
-                row,
-                currently_in_slice=currently,
-                behavior_score=behavior_score(c, row, now=now),
+                row, currently_in_slice=currently, behavior_score=score
             )
             if keep != currently:
-                c.execute(
-                    "UPDATE memory_units SET in_portrait = ? WHERE id = ?",
-                    (1 if keep else 0, row["id"]),
-                )
+                changes.append((1 if keep else 0, row["id"]))
             if keep:
                 core_ids.append(row["id"])
+        if changes:
+            c.executemany("UPDATE memory_units SET in_portrait = ? WHERE id = ?", changes)
         return core_ids
 
     if conn is not None:
@@ -288,6 +327,18 @@ class SynthesizedView:
     source_unit_set_hash: str
     unit_ids: list[str]
     used_fallback: bool
+    reused_sections: int = 0
+    synthesized_sections: int = 0
+
+
+@dataclass(frozen=True)
+class _Section:
+    unit_type: str
+    member_hash: str
+    section_budget: int
+    content_md: str
+    synthesized: bool
+    reused: bool = False
 
 
 def synthesize_view(
@@ -298,12 +349,15 @@ def synthesize_view(
     synthesizer=None,
     char_budget: int | None = None,
     recompute: bool = True,
+    incremental: bool = False,
 ) -> SynthesizedView:
     """Pick the core subset and materialize a view row.
 
     ``synthesizer(units, char_budget)`` is the optional LLM path; on None/error
     it falls back to the deterministic template. The DAG is one-way (units ->
-    view), so the view is just a cached synthesis with no independent truth."""
+    view), so the view is just a cached synthesis with no independent truth.
+    ``incremental`` synthesizes per unit type and reuses every section whose
+    member set is unchanged (see synthesize_units_view)."""
     if char_budget is None:
         char_budget = USER_PORTRAIT_CHAR_BUDGET if view_type == VIEW_USER_PORTRAIT else SOUL_RELATIONSHIP_CHAR_BUDGET
 
@@ -317,6 +371,7 @@ def synthesize_view(
         units,
         synthesizer=synthesizer,
         char_budget=char_budget,
+        incremental=incremental,
     )
 
 
@@ -328,12 +383,18 @@ def synthesize_units_view(
     *,
     synthesizer=None,
     char_budget: int | None = None,
+    incremental: bool = False,
 ) -> SynthesizedView:
     """Materialize a view from an explicitly selected unit set.
 
     Aggregate views use this interface so callers do not need to duplicate view
     persistence, membership replacement, headers, fallback rendering, or hash
     bookkeeping.
+
+    With ``incremental`` the body is stitched from one section per unit type.
+    A section whose member hash matches the cached one in
+    ``memory_view_sections`` is reused verbatim; only changed sections go
+    back to the synthesizer, so a single belief edit costs one section.
     """
     if char_budget is None:
         char_budget = USER_PORTRAIT_CHAR_BUDGET if view_type == VIEW_USER_PORTRAIT else SOUL_RELATIONSHIP_CHAR_BUDGET
@@ -341,7 +402,15 @@ def synthesize_units_view(
 
     used_fallback = True
     body = ""
-    if synthesizer is not None:
+    sections: list[_Section] | None = None
+    if incremental and synthesizer is not None and units:
+        sections = _synthesize_sections(
+            owner_scope, visibility_scope, view_type, units,
+            synthesizer=synthesizer, char_budget=char_budget,
+        )
+        body = _stitch_sections([section.content_md for section in sections], char_budget)
+        used_fallback = not any(section.synthesized for section in sections)
+    elif synthesizer is not None:
         try:
             candidate = synthesizer(units, char_budget)
             if isinstance(candidate, str) and candidate.strip():
@@ -388,6 +457,23 @@ def synthesize_units_view(
                 "INSERT INTO memory_view_units(view_id, unit_id, order_index) VALUES (?, ?, ?)",
                 (view_id, row["id"], index),
             )
+        if sections is not None:
+            conn.execute("DELETE FROM memory_view_sections WHERE view_id = ?", (view_id,))
+            conn.executemany(
+                """
+                INSERT INTO memory_view_sections(
+                    view_id, unit_type, member_hash, section_budget, content_md, generated_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        view_id, section.unit_type, section.member_hash,
+                        section.section_budget, section.content_md, now,
+                    )
+                    for section in sections
+                    if section.synthesized
+                ],
+            )
 
     return SynthesizedView(
         view_id=view_id,
@@ -398,9 +484,110 @@ def synthesize_units_view(
         source_unit_set_hash=unit_hash,
         unit_ids=[row["id"] for row in units],
         used_fallback=used_fallback,
+        reused_sections=sum(1 for section in sections or () if section.reused),
+        synthesized_sections=sum(
+            1 for section in sections or () if section.synthesized and not section.reused
+        ),
     )
 
 
+def _synthesize_sections(
+    owner_scope: str,
+    visibility_scope: str,
+    view_type: str,
+    units: list[sqlite3.Row],
+    *,
+    synthesizer,
+    char_budget: int,
+) -> list[_Section]:
+    """One section per unit type, in render order; cached sections are reused.
+
+    The budget is shared evenly among the types present (see
+    ``_section_budget``), so a long section cannot crowd later types out of the
+    stitched view while a one- or two-type portrait still gets most of the
+    budget. A cached section is reused only if both its members and its share
+    are unchanged: a type appearing or disappearing resizes every share. Synthesizer
+    gates (such as a minimum unit count) apply per section; a thin section
+    renders as template lines, which is the same source text the synthesizer
+    may copy out."""
+    cached = {
+        row["unit_type"]: row
+        for row in db.query_all(
+            """
+            SELECT memory_view_sections.unit_type, memory_view_sections.member_hash,
+                   memory_view_sections.section_budget, memory_view_sections.content_md
+            FROM memory_view_sections
+            JOIN memory_views ON memory_views.id = memory_view_sections.view_id
+            WHERE memory_views.owner_scope = ? AND memory_views.visibility_scope = ?
+              AND memory_views.view_type = ?
+            """,
+            (owner_scope, visibility_scope, view_type),
+        )
+    }
+    grouped: dict[str, list[sqlite3.Row]] = {}
+    for row in units:
+        grouped.setdefault(row["type"], []).append(row)
+    section_budget = _section_budget(char_budget, len(grouped))
+
+    sections: list[_Section] = []
+    for unit_type, members in grouped.items():
+        member_hash = source_unit_set_hash(members)
+        previous = cached.get(unit_type)
+        if (
+            previous is not None
+            and previous["member_hash"] == member_hash
+            and previous["section_budget"] == section_budget
+        ):
+            sections.append(
+                _Section(
+                    unit_type, member_hash, section_budget, previous["content_md"],
+                    synthesized=True, reused=True,
+                )
+            )
+            continue
+        body = ""
+        try:
+            candidate = synthesizer(members, section_budget)
+            if isinstance(candidate, str) and candidate.strip():
+                body = candidate.strip()[:section_budget]
+        except Exception:
+            body = ""
+        if body:
+            # Synthesized prose carries no heading, same as a whole-view synthesis.
+            sections.append(_Section(unit_type, member_hash, section_budget, body, synthesized=True))
+        else:
+            sections.append(
+                _Section(
+                    unit_type, member_hash, section_budget,
+                    render_template(members, char_budget=section_budget), synthesized=False,
+                )
+            )
+    return sections
+
+
+def _section_budget(char_budget: int, section_count: int) -> int:
+    """Per-section share of a view budget, net of the blank lines between
+    sections, so that every section fits when stitched."""
+    section_count = max(1, section_count)
+    separators = len(_SECTION_SEPARATOR) * (section_count - 1)
+    return max(1, (char_budget - separators) // section_count)
+
+
+def _stitch_sections(sections: list[str], char_budget: int) -> str:
+    """Join sections in order, dropping whole trailing sections past the budget.
+
+    Sections are sized by ``_section_budget``, so this only drops anything when
+    the shares round down to the one-character floor. The first section is
+    always kept (cut to the budget if it alone overflows) so a view is never
+    empty just because its leading type is long."""
+    selected: list[str] = []
+    for section in sections:
+        if selected and len(_SECTION_SEPARATOR.join(selected + [section])) > char_budget:
+            break
+        selected.append(section)
+    return _SECTION_SEPARATOR.join(selected)[:char_budget]
+
+
 def get_view(owner_scope: str, visibility_scope: str, view_type: str) -> sqlite3.Row | None:
     return db.query_one(
         "SELECT * FROM memory_views WHERE owner_scope = ? AND visibility_scope = ? AND view_type = ?",
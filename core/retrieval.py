@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass, replace
 import re
 import sqlite3
+import threading
 
 from core import db
 from core import fts_query
@@ -12,6 +14,16 @@ from core import logging_service
 
 LIKE_FALLBACK_TRUST = 0.85
 MAX_VECTOR_DISTANCE = 0.73
+SEARCH_CACHE_MAX_ENTRIES = 256
+POSTS_REVISION_KEY = "posts_revision"
+
+# Final ranked results keyed by (kind, normalized query, k, mode, exclusion).
+# Each entry remembers the revision token it was computed under; a changed
+# posts_revision / vector source revision / synced collection state makes the
+# entry stale, so invalidation needs no hooks in the writers.
+_search_cache: OrderedDict[tuple, tuple[tuple, object]] = OrderedDict()
+_search_cache_lock = threading.Lock()
+_search_cache_stats = {"hits": 0, "misses": 0}
 
 @dataclass(frozen=True)
 class RetrievalHit:
@@ -50,6 +62,12 @@ class RetrievalExclusion:
     chat_message_ids: frozenset[int] = frozenset()
 
 
+class _FailedVectorHits(list):
+    """The empty result of a vector leg that raised. Searches built on it are
+    served but never cached, so a transient embedding failure does not pin a
+    keyword-only ranking until the next write."""
+
+
 def fts_search_scored(
     query: str,
     k: int = 20,
@@ -166,8 +184,9 @@ def vector_search_scored(query: str, k: int = 20) -> list[RetrievalHit]:
             for hit in vectorstore.query_post_hits(query, n_results=k)
         ]
         return _filter_vector_hits(hits, key=lambda hit: hit.raw_score, trace="posts")
-    except Exception:
-        return []
+    except Exception as exc:
+        logging_service.log_event("vector_search_failed", level="WARNING", error_type=type(exc).__name__)
+        return _FailedVectorHits()
 
 
 def keyword_search_posts(query: str, k: int = 20) -> list[str]:
@@ -193,17 +212,44 @@ def user_search_posts(query: str, k: int = 20, semantic: bool = False) -> UserSe
     if not clean:
         return UserSearchResult([], semantic_available)
 
+    revision = _search_cache_revision()
+    cache_key = ("user", _normalize_cache_query(clean), k, bool(semantic and semantic_available))
+    cached = _search_cache_get(cache_key, revision)
+    if cached is not None:
+        return cached
+    result, cacheable = _user_search_posts_uncached(
+        clean, k, semantic=semantic, semantic_available=semantic_available
+    )
+    if cacheable:
+        _search_cache_put(cache_key, revision, result)
+    return result
+
+
+def _user_search_posts_uncached(
+    clean: str,
+    k: int,
+    *,
+    semantic: bool,
+    semantic_available: bool,
+) -> tuple[UserSearchResult, bool]:
+    """The result, and whether it may be cached (False when the vector leg failed)."""
     if not semantic or not semantic_available:
         ids = keyword_search_posts(clean, k=k)
-        return UserSearchResult([UserSearchHit(post_id, "keyword") for post_id in ids], semantic_available)
+        return UserSearchResult([UserSearchHit(post_id, "keyword") for post_id in ids], semantic_available), True
 
-    hits = hybrid_search_scored(clean, k=k, candidate_k=max(20, k), min_score=None)
+    hits, cacheable = _hybrid_search(clean, k=k, candidate_k=max(20, k), min_score=None)
     if not hits:
         ids = keyword_search_posts(clean, k=k)
-        return UserSearchResult([UserSearchHit(post_id, "keyword") for post_id in ids], semantic_available)
-    return UserSearchResult(
-        [UserSearchHit(hit.post_id, _user_search_match_kind(hit.sources)) for hit in hits],
-        semantic_available,
+        return (
+            UserSearchResult([UserSearchHit(post_id, "keyword") for post_id in ids], semantic_available),
+            cacheable,
+        )
+    return (
+        UserSearchResult(
+            [UserSearchHit(hit.post_id, _user_search_match_kind(hit.sources)) for hit in hits],
+            semantic_available,
+        ),
+        cacheable,
     )
 
 
@@ -268,9 +314,93 @@ def hybrid_search_scored(
     trace_context: dict | None = None,
     exclusion: RetrievalExclusion | None = None,
 ) -> list[HybridHit]:
-    """Combine FTS5 and exact vector search with dynamic weights and explainable scores."""
+    """Combine FTS5 and exact vector search with dynamic weights and explainable scores.
+
+    Final rankings are memoized per revision token (see ``_search_cache_revision``);
+    a hit skips FTS, the embedding call, and the vector scan entirely. A ranking
+    computed while the vector leg failed is returned but not memoized.
+    """
+    return _hybrid_search(
+        query,
+        k=k,
+        min_score=min_score,
+        candidate_k=candidate_k,
+        allow_fallback=allow_fallback,
+        trace_context=trace_context,
+        exclusion=exclusion,
+    )[0]
+
+
+def _hybrid_search(
+    query: str,
+    *,
+    k: int,
+    min_score: float | None,
+    candidate_k: int,
+    allow_fallback: bool = True,
+    trace_context: dict | None = None,
+    exclusion: RetrievalExclusion | None = None,
+) -> tuple[list[HybridHit], bool]:
+    """``hybrid_search_scored`` plus whether its ranking may be cached."""
+    revision = _search_cache_revision()
+    cache_key = (
+        "hybrid",
+        _normalize_cache_query(query),
+        k,
+        min_score,
+        candidate_k,
+        allow_fallback,
+        exclusion or RetrievalExclusion(),
+    )
+    cached = _search_cache_get(cache_key, revision)
+    if cached is not None:
+        fts_hits, vector_hits, final_hits = cached
+        _log_hybrid_retrieval_result(
+            query=query,
+            fts_hits=fts_hits,
+            vector_hits=vector_hits,
+            final_hits=final_hits,
+            trace_context=trace_context,
+            cache_hit=True,
+        )
+        return list(final_hits), True
+
+    fts_hits, vector_hits, final_hits, vector_failed = _hybrid_search_uncached(
+        query,
+        k=k,
+        min_score=min_score,
+        candidate_k=candidate_k,
+        allow_fallback=allow_fallback,
+        trace_context=trace_context,
+        exclusion=exclusion,
+    )
+    if not vector_failed:
+        _search_cache_put(cache_key, revision, (fts_hits, vector_hits, final_hits))
+    _log_hybrid_retrieval_result(
+        query=query,
+        fts_hits=fts_hits,
+        vector_hits=vector_hits,
+        final_hits=final_hits,
+        trace_context=trace_context,
+        cache_hit=False,
+    )
+    return list(final_hits), not vector_failed
+
+
+def _hybrid_search_uncached(
+    query: str,
+    *,
+    k: int,
+    min_score: float | None,
+    candidate_k: int,
+    allow_fallback: bool,
+    trace_context: dict | None,
+    exclusion: RetrievalExclusion | None,
+) -> tuple[list[RetrievalHit], list[RetrievalHit], list[HybridHit], bool]:
+    """(FTS hits, vector hits, final ranking, whether the vector leg failed)."""
     fts_hits = fts_search_scored(query, k=candidate_k, trace_context=trace_context)
     vector_hits = vector_search_scored(query, k=candidate_k)
+    vector_failed = isinstance(vector_hits, _FailedVectorHits)
     fts_hits, vector_hits = _filter_excluded_post_candidates(
         fts_hits,
         vector_hits,
@@ -278,14 +408,7 @@ def hybrid_search_scored(
         trace_context=trace_context,
     )
     if not fts_hits and not vector_hits:
-        _log_hybrid_retrieval_result(
-            query=query,
-            fts_hits=[],
-            vector_hits=[],
-            final_hits=[],
-            trace_context=trace_context,
-        )
-        return []
+        return [], [], [], vector_failed
 
     post_ids = fts_query.ordered_unique([hit.post_id for hit in fts_hits + vector_hits])
     contents = _read_candidate_contents(post_ids)
@@ -330,45 +453,14 @@ def hybrid_search_scored(
         )
     ]
     if min_score is None:
-        final_hits = ordered[:k]
-        _log_hybrid_retrieval_result(
-            query=query,
-            fts_hits=fts_hits,
-            vector_hits=vector_hits,
-            final_hits=final_hits,
-            trace_context=trace_context,
-        )
-        return final_hits
+        return fts_hits, vector_hits, ordered[:k], vector_failed
 
     filtered = [hit for hit in ordered if hit.score >= min_score]
     if filtered:
-        final_hits = filtered[:k]
-        _log_hybrid_retrieval_result(
-            query=query,
-            fts_hits=fts_hits,
-            vector_hits=vector_hits,
-            final_hits=final_hits,
-            trace_context=trace_context,
-        )
-        return final_hits
+        return fts_hits, vector_hits, filtered[:k], vector_failed
     if allow_fallback and ordered:
-        final_hits = ordered[: min(k, 1)]
-        _log_hybrid_retrieval_result(
-            query=query,
-            fts_hits=fts_hits,
-            vector_hits=vector_hits,
-            final_hits=final_hits,
-            trace_context=trace_context,
-        )
-        return final_hits
-    _log_hybrid_retrieval_result(
-        query=query,
-        fts_hits=fts_hits,
-        vector_hits=vector_hits,
-        final_hits=[],
-        trace_context=trace_context,
-    )
-    return []
+        return fts_hits, vector_hits, ordered[: min(k, 1)], vector_failed
+    return fts_hits, vector_hits, [], vector_failed
 
 
 def _like_search_scored(query: str, k: int) -> list[RetrievalHit]:
@@ -560,6 +652,94 @@ def _content_bonus(query: str, content: str) -> tuple[float, list[str]]:
     return score, reasons
 
 
+def clear_search_cache() -> None:
+    with _search_cache_lock:
+        _search_cache.clear()
+        _search_cache_stats["hits"] = 0
+        _search_cache_stats["misses"] = 0
+
+
+def search_cache_stats() -> dict[str, float | int]:
+    with _search_cache_lock:
+        hits = _search_cache_stats["hits"]
+        misses = _search_cache_stats["misses"]
+        size = len(_search_cache)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "size": size,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
+
+
+def _normalize_cache_query(query: str) -> str:
+    return " ".join(str(query or "").split())
+
+
+def _search_cache_revision() -> tuple | None:
+    """Return the token cached results are valid for, or None to bypass the cache.
+
+    Combines posts_revision (bumped by the posts triggers), the vector doc source
+    revision, and the active collection's synced revision — the latter moves when
+    the outbox catches up, so late-indexed embeddings still reach search results.
+    """
+    if not db.DB_PATH.exists():
+        return None
+    try:
+        from core import vector_index_service, vectorstore
+
+        collection_name = vectorstore.current_collection_name()
+        row = db.query_one(
+            """
+            SELECT
+                (SELECT value FROM meta WHERE key = ?) AS posts_revision,
+                (SELECT value FROM meta WHERE key = ?) AS source_revision,
+                (
+                    SELECT synced_revision
+                    FROM vector_index_collections
+                    WHERE collection_name = ?
+                ) AS synced_revision
+            """,
+            (POSTS_REVISION_KEY, vector_index_service.SOURCE_REVISION_KEY, collection_name),
+        )
+    except (sqlite3.Error, ImportError):
+        return None
+    if row is None:
+        return None
+    return (
+        collection_name,
+        str(row["posts_revision"] or 0),
+        str(row["source_revision"] or 0),
+        row["synced_revision"],
+    )
+
+
+def _search_cache_get(key: tuple, revision: tuple | None):
+    if revision is None:
+        return None
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None or entry[0] != revision:
+            if entry is not None:
+                del _search_cache[key]
+            _search_cache_stats["misses"] += 1
+            return None
+        _search_cache.move_to_end(key)
+        _search_cache_stats["hits"] += 1
+        return entry[1]
+
+
+def _search_cache_put(key: tuple, revision: tuple | None, value) -> None:
+    if revision is None:
+        return
+    with _search_cache_lock:
+        _search_cache[key] = (revision, value)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+            _search_cache.popitem(last=False)
+
+
 def _read_candidate_contents(post_ids: list[str]) -> dict[str, str]:
     if not post_ids:
         return {}
@@ -608,7 +788,10 @@ def _log_hybrid_retrieval_result(
     vector_hits: list[RetrievalHit],
     final_hits: list[HybridHit],
     trace_context: dict | None,
+    cache_hit: bool,
 ) -> None:
+    stats = search_cache_stats()
+    term_stats = fts_query.term_memo_stats()
     logging_service.log_event(
         "hybrid_retrieval_result",
         **(trace_context or {}),
@@ -616,6 +799,11 @@ def _log_hybrid_retrieval_result(
         fts_hits=[_retrieval_hit_payload(hit) for hit in fts_hits],
         vector_hits=[_retrieval_hit_payload(hit) for hit in vector_hits],
         final_hits=[_hybrid_hit_payload(hit) for hit in final_hits],
+        cache_hit=cache_hit,
+        cache_hit_rate=stats["hit_rate"],
+        cache_size=stats["size"],
+        term_memo_hit_rate=term_stats["hit_rate"],
+        term_memo_size=term_stats["entries"],
     )
 
 
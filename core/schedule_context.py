@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from typing import Any, Iterable, Mapping, Sequence
 
-from core import db, goal_schedule_service
+from core import db, goal_schedule_service, schedule_service
 from core.schedule_service import ScheduleService
 from core.system_timezone import SYSTEM_TIMEZONE
 
@@ -15,6 +15,9 @@ RECENT_PAST_DAYS = 2
 RECENT_FUTURE_DAYS = 7
 RECENT_SCHEDULE_LIMIT = 20
 MENTIONED_SCHEDULE_LIMIT = 5
+# Window (either side of now) searched for keywords too short for the trigram
+# index; longer keywords search the whole cache.
+SHORT_KEYWORD_WINDOW_DAYS = 180
 
 _GOAL_STATUS_LABELS = {
     "done": "已完成",
@@ -128,28 +131,24 @@ def build_mentioned_schedule_section(
 
     reference = _reference_now(context_date=context_date, now=now)
     excluded = {str(event_id) for event_id in exclude_event_ids if str(event_id)}
-    event_rows = _matching_event_rows(normalized_keywords, excluded)
-    goal_rows = _matching_goal_rows(normalized_keywords)
+    event_rows = _matching_event_rows(normalized_keywords, excluded, reference, limit)
+    goal_rows = _matching_goal_rows(normalized_keywords, reference, limit)
 
+    # Each query is already ranked and capped in SQL; this only interleaves
+    # the two short lists, events ahead of goals on equal match rank.
     candidates: list[tuple[int, int, float, str, str]] = []
     for row in event_rows:
-        event_data = dict(row)
-        event = _parse_event(event_data)
+        event = _parse_event(dict(row))
         if event is None:
             continue
-        match_rank = _match_rank(
-            (str(event_data["subject"] or ""), str(event_data["location"] or "")),
-            normalized_keywords,
-        )
-        distance = abs(event.start.timestamp() - reference.timestamp())
         line = _render_mentioned_event(event, reference)
-        candidates.append((match_rank, 0, distance, event.event_id, line))
+        candidates.append((int(row["match_rank"]), 0, float(row["distance"]), event.event_id, line))
 
     for row in goal_rows:
         title = str(row["title"] or "").strip()
         if not title:
             continue
-        match_rank = _match_rank((title,), normalized_keywords)
+        match_rank = int(row["match_rank"])
         updated_at = float(row["updated_at"] or 0.0)
         status = _GOAL_STATUS_LABELS.get(str(row["status"]), str(row["status"]))
         month = datetime.fromtimestamp(updated_at, LOCAL_TIMEZONE).strftime("%Y-%m")
@@ -167,70 +166,125 @@ def _has_calendar_accounts() -> bool:
     return db.query_one("SELECT 1 FROM calendar_accounts LIMIT 1") is not None
 
 
-def _matching_event_rows(keywords: Sequence[str], excluded: set[str]) -> list[Any]:
-    matches = " OR ".join(
-        "(COALESCE(subject, '') LIKE ? ESCAPE '\\' COLLATE NOCASE "
-        "OR COALESCE(location, '') LIKE ? ESCAPE '\\' COLLATE NOCASE)"
-        for _ in keywords
+def _matching_event_rows(
+    keywords: Sequence[str],
+    excluded: set[str],
+    reference: datetime,
+    limit: int,
+) -> list[Any]:
+    reference_ts = reference.timestamp()
+    hits, hit_params = _keyword_hits(
+        keywords,
+        fts_table="schedule_events_fts",
+        base_table="schedule_events",
+        columns=("subject", "location"),
+        slice_sql="start_ts > ? AND start_ts < ?",
+        slice_params=(
+            reference_ts - SHORT_KEYWORD_WINDOW_DAYS * 86400,
+            reference_ts + SHORT_KEYWORD_WINDOW_DAYS * 86400,
+        ),
     )
-    params: list[Any] = []
-    for keyword in keywords:
-        pattern = _like_pattern(keyword)
-        params.extend((pattern, pattern))
+    rank_sql, rank_params = _match_rank_sql(
+        "COALESCE(event.subject, '') || char(10) || COALESCE(event.location, '')", keywords
+    )
+    params: list[Any] = [*hit_params, *rank_params, reference_ts]
     exclusion = ""
     if excluded:
         placeholders = ", ".join("?" for _ in excluded)
-        exclusion = f" AND id NOT IN ({placeholders})"
+        exclusion = f" AND event.id NOT IN ({placeholders})"
         params.extend(sorted(excluded))
+    params.append(limit)
     return db.query_all(
         f"""
-        SELECT id, subject, start_ts, end_ts, start_local, end_local, all_day, location
-        FROM schedule_events
-        WHERE is_cancelled = 0
-          AND ({matches})
+        WITH hits(hit_rowid) AS ({hits})
+        SELECT event.id, event.subject, event.start_ts, event.end_ts, event.start_local,
+               event.end_local, event.all_day, event.location,
+               {rank_sql} AS match_rank,
+               ABS(event.start_ts - ?) AS distance
+        FROM hits
+        JOIN schedule_events AS event ON event.rowid = hits.hit_rowid
+        WHERE event.is_cancelled = 0
           {exclusion}
-        ORDER BY start_ts, end_ts, id
+        ORDER BY match_rank, distance, event.id
+        LIMIT ?
         """,
         tuple(params),
     )
 
 
 def _recent_event_rows(start_date: date, end_date: date) -> list[dict[str, Any]]:
-    start = datetime.combine(start_date, time.min, LOCAL_TIMEZONE)
-    exclusive_end = datetime.combine(end_date + timedelta(days=1), time.min, LOCAL_TIMEZONE)
-    rows = db.query_all(
-        """
-        SELECT id, subject, start_ts, end_ts, start_local, end_local, all_day, location
-        FROM schedule_events
-        WHERE is_cancelled = 0
-          AND end_ts > ?
-          AND start_ts < ?
-        ORDER BY start_ts, end_ts, id
-        """,
-        (start.timestamp(), exclusive_end.timestamp()),
-    )
-    events = [dict(row) for row in rows]
-    links = goal_schedule_service.links_for_events([str(event["id"]) for event in events])
-    for event in events:
-        event["goal_links"] = links.get(str(event["id"]), [])
-    return events
+    return schedule_service.cached_events(start_date, end_date)
 
 
-def _matching_goal_rows(keywords: Sequence[str]) -> list[Any]:
-    matches = " OR ".join(
-        "title LIKE ? ESCAPE '\\' COLLATE NOCASE" for _ in keywords
+def _matching_goal_rows(keywords: Sequence[str], reference: datetime, limit: int) -> list[Any]:
+    hits, hit_params = _keyword_hits(
+        keywords,
+        fts_table="goals_fts",
+        base_table="goals",
+        columns=("title",),
+        slice_sql="updated_at > ?",
+        slice_params=(reference.timestamp() - SHORT_KEYWORD_WINDOW_DAYS * 86400,),
     )
-    params = tuple(_like_pattern(keyword) for keyword in keywords)
+    rank_sql, rank_params = _match_rank_sql("goal.title", keywords)
     return db.query_all(
         f"""
-        SELECT id, title, status, updated_at
-        FROM goals
-        WHERE status != 'active'
-          AND ({matches})
-        ORDER BY updated_at DESC, id
+        WITH hits(hit_rowid) AS ({hits})
+        SELECT goal.id, goal.title, goal.status, goal.updated_at,
+               {rank_sql} AS match_rank
+        FROM hits
+        JOIN goals AS goal ON goal.rowid = hits.hit_rowid
+        WHERE goal.status != 'active'
+        ORDER BY match_rank, goal.updated_at DESC, goal.id
+        LIMIT ?
         """,
-        params,
+        (*hit_params, *rank_params, limit),
+    )
+
+
+def _keyword_hits(
+    keywords: Sequence[str],
+    *,
+    fts_table: str,
+    base_table: str,
+    columns: Sequence[str],
+    slice_sql: str,
+    slice_params: Sequence[Any],
+) -> tuple[str, list[Any]]:
+    """Rowid subquery for rows containing any keyword.
+
+    Keywords of three or more characters go through the trigram index. The
+    trigram tokenizer cannot match shorter strings (two-character CJK words are
+    common), so those fall back to LIKE over a date-bounded slice only.
+    """
+    long_keywords = [keyword for keyword in keywords if len(keyword) >= 3]
+    short_keywords = [keyword for keyword in keywords if len(keyword) < 3]
+    parts: list[str] = []
+    params: list[Any] = []
+    if long_keywords:
+        parts.append(f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ?")
+        params.append(" OR ".join(_fts_phrase(keyword) for keyword in long_keywords))
+    if short_keywords:
+        matches = " OR ".join(
+            f"COALESCE({column}, '') LIKE ? ESCAPE '\\' COLLATE NOCASE"
+            for _ in short_keywords
+            for column in columns
+        )
+        parts.append(f"SELECT rowid FROM {base_table} WHERE {slice_sql} AND ({matches})")
+        params.extend(slice_params)
+        params.extend(_like_pattern(keyword) for keyword in short_keywords for _ in columns)
+    return " UNION ".join(parts), params
+
+
+def _match_rank_sql(text_sql: str, keywords: Sequence[str]) -> tuple[str, list[Any]]:
+    """Index of the first keyword the text contains, i.e. keyword priority."""
+    cases = " ".join(
+        f"WHEN instr(lower({text_sql}), lower(?)) > 0 THEN {index}" for index in range(len(keywords))
     )
+    return f"CASE {cases} ELSE {len(keywords)} END", list(keywords)
+
+
+def _fts_phrase(keyword: str) -> str:
+    return '"' + keyword.replace('"', '""') + '"'
 
 
 def _render_recent_event(
@@ -282,19 +336,7 @@ def _goal_progress_suffix(
 
 def _weekly_density(reference: datetime) -> int:
     monday = reference.date() - timedelta(days=reference.weekday())
-    week_start = datetime.combine(monday, time.min, LOCAL_TIMEZONE)
-    week_end = week_start + timedelta(days=7)
-    row = db.query_one(
-        """
-        SELECT COUNT(*) AS event_count
-        FROM schedule_events
-        WHERE is_cancelled = 0
-          AND end_ts > ?
-          AND start_ts < ?
-        """,
-        (week_start.timestamp(), week_end.timestamp()),
-    )
-    return int(row["event_count"]) if row is not None else 0
+    return len(schedule_service.cached_events(monday, monday + timedelta(days=6)))
 
 
 def _parse_event(event: Mapping[str, Any]) -> _RenderableEvent | None:
@@ -419,10 +461,3 @@ def _like_pattern(keyword: str) -> str:
     escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
     return f"%{escaped}%"
 
-
-def _match_rank(texts: Sequence[str], keywords: Sequence[str]) -> int:
-    folded_text = "\n".join(texts).casefold()
-    for index, keyword in enumerate(keywords):
-        if keyword.casefold() in folded_text:
-            return index
-    return len(keywords)
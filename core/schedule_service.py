@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable, Mapping
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
 from datetime import date, datetime, time, timedelta, timezone
 import hashlib
+import sqlite3
 import threading
+from time import monotonic, perf_counter
 from typing import Any
 import uuid
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from core import db, goal_schedule_service
+from core import db, goal_schedule_service, logging_service
 from core.graph.auth import GraphAuth, GraphAuthError
 from core.graph.client import GraphClient, GraphHTTPError
 from core.system_timezone import SYSTEM_TIMEZONE, SYSTEM_TIMEZONE_NAME
@@ -32,6 +36,17 @@ LOCAL_MIGRATION_TRANSACTION_NAMESPACE = uuid.uuid5(
     "tracelog:schedule:local-migration",
 )
 _SYNC_LOCK = threading.Lock()
+SCHEDULE_REVISION_META_KEY = "schedule_revision"
+# Day buckets of listed events and the account list, valid until the
+# trigger-maintained schedule_revision moves (see schema.sql).
+EVENT_CACHE_MAX_DAYS = 400
+CONNECTION_CHECK_TTL_SECONDS = 60.0
+_CACHE_LOCK = threading.Lock()
+_event_day_cache: OrderedDict[date, list[dict[str, Any]]] = OrderedDict()
+_event_cache_token: tuple[str, str] | None = None
+_accounts_cache: tuple[tuple[str, str], list[dict[str, Any]]] | None = None
+_connection_states: dict[str, tuple[bool, bool, float]] = {}
+_SEEN_IDS_TABLE = "temp.schedule_delta_seen_ids"
 
 
 class ScheduleNotConnectedError(RuntimeError):
@@ -61,6 +76,15 @@ class ScheduleService:
         self._clock = clock
 
     def list_accounts(self) -> list[dict[str, Any]]:
+        token = _schedule_cache_token()
+        with _CACHE_LOCK:
+            if _accounts_cache is not None and _accounts_cache[0] == token:
+                return [dict(account) for account in _accounts_cache[1]]
+        accounts = self._query_accounts()
+        _remember_accounts(token, accounts)
+        return [dict(account) for account in accounts]
+
+    def _query_accounts(self) -> list[dict[str, Any]]:
         rows = db.query_all(
             """
             SELECT account.id, account.provider, account.display_name,
@@ -133,6 +157,7 @@ class ScheduleService:
         account = self._account_info() if connected else None
         if connected:
             self._ensure_outlook_account(account)
+        _remember_connection(configured, connected)
         window_start, window_end = self._window_dates()
         last_sync = _meta_value(LAST_SYNC_AT_META_KEY)
         accounts = self.list_accounts()
@@ -265,11 +290,7 @@ class ScheduleService:
 
     def list_events(self, start_date: date, end_date: date) -> dict[str, Any]:
         _validate_date_range(start_date, end_date)
-        configured = self.auth.client_id() is not None
-        token = self._access_token() if configured else None
-        connected = token is not None
-        if connected:
-            self._ensure_outlook_account(self._account_info())
+        configured, connected = self._connection_state()
         accounts = self.list_accounts()
         has_local_account = any(
             account["id"] == LOCAL_ACCOUNT_ID for account in accounts
@@ -282,26 +303,12 @@ class ScheduleService:
                 "events": [],
                 "accounts": accounts,
             }
-        start_ts, end_ts = _date_range_epoch(start_date, end_date)
-        rows = db.query_all(
-            """
-            SELECT event.*, account.provider
-            FROM schedule_events AS event
-            LEFT JOIN calendar_accounts AS account ON account.id = event.account_id
-            WHERE event.end_ts > ? AND event.start_ts < ?
-              AND event.is_cancelled = 0
-            ORDER BY event.start_ts, event.end_ts, event.id
-            """,
-            (start_ts, end_ts),
-        )
-        events = [_row_to_event(row) for row in rows]
-        _attach_goal_links(events)
         return {
             "configured": configured,
             "connected": connected,
             "status": "ok",
-            "events": events,
-            "accounts": self.list_accounts(),
+            "events": cached_events(start_date, end_date),
+            "accounts": accounts,
         }
 
     def sync(self, *, force: bool = False) -> dict[str, Any]:
@@ -311,6 +318,7 @@ class ScheduleService:
     def _sync(self, *, force: bool) -> dict[str, Any]:
         configured = self.auth.client_id() is not None
         token = self._access_token() if configured else None
+        _remember_connection(configured, token is not None)
         if token is None:
             last_sync = _meta_value(LAST_SYNC_AT_META_KEY)
             return {
@@ -335,88 +343,52 @@ class ScheduleService:
             delta_link = None
 
         full_refresh = delta_link is None
-        try:
-            result = self._fetch_delta(graph, window_start, window_end, delta_link)
-        except GraphHTTPError as exc:
-            if delta_link is None or exc.status_code != 410:
-                raise
-            full_refresh = True
-            result = self._fetch_delta(graph, window_start, window_end, None)
-
+        started = perf_counter()
+        fetch_stats: dict[str, int] = {}
         now = self._clock()
-        upserted = 0
-        deleted = 0
-        with db.transaction() as conn:
-            previous_outlook_ids: list[str] = []
-            if full_refresh:
-                previous_outlook_ids = [
-                    str(row["id"])
-                    for row in conn.execute(
-                        "SELECT id FROM schedule_events WHERE account_id = ?",
-                        (OUTLOOK_ACCOUNT_ID,),
-                    ).fetchall()
-                ]
-                conn.execute(
-                    "DELETE FROM schedule_events WHERE account_id = ?",
-                    (OUTLOOK_ACCOUNT_ID,),
+        # One connection for the whole walk so the TEMP table of seen ids
+        # survives between the short per-page transactions.
+        conn = db.connect()
+        conn.isolation_level = None
+        try:
+            conn.execute(f"CREATE TEMP TABLE {_SEEN_IDS_TABLE}(id TEXT PRIMARY KEY)")
+            try:
+                upserted, deleted, next_delta_link = _apply_delta_pages(
+                    conn,
+                    self._fetch_delta(graph, window_start, window_end, delta_link, fetch_stats),
+                    synced_at=now,
+                )
+            except GraphHTTPError as exc:
+                if delta_link is None or exc.status_code != 410:
+                    raise
+                full_refresh = True
+                conn.execute(f"DELETE FROM {_SEEN_IDS_TABLE}")
+                upserted, deleted, next_delta_link = _apply_delta_pages(
+                    conn,
+                    self._fetch_delta(graph, window_start, window_end, None, fetch_stats),
+                    synced_at=now,
                 )
-            for raw_event in result["events"]:
-                event_id = str(raw_event.get("id") or "")
-                if not event_id:
-                    raise ValueError("Graph 日程缺少 id")
-                if raw_event.get("@removed") is not None:
-                    conn.execute(
-                        """
-                        DELETE FROM goal_schedule_links
-                        WHERE event_id = ?
-                          AND EXISTS (
-                              SELECT 1 FROM schedule_events
-                              WHERE id = ? AND account_id = ?
-                          )
-                        """,
-                        (event_id, event_id, OUTLOOK_ACCOUNT_ID),
-                    )
-                    cursor = conn.execute(
-                        """
-                        DELETE FROM schedule_events
-                        WHERE id = ? AND account_id = ?
-                        """,
-                        (event_id, OUTLOOK_ACCOUNT_ID),
-                    )
-                    deleted += max(0, cursor.rowcount)
-                    continue
-                normalized = _normalize_graph_event(raw_event, synced_at=now)
-                _upsert_event(conn, normalized)
-                if normalized["is_cancelled"]:
-                    conn.execute(
-                        """
-                        DELETE FROM goal_schedule_links
-                        WHERE event_id = ?
-                          AND EXISTS (
-                              SELECT 1 FROM schedule_events
-                              WHERE id = ? AND account_id = ?
-                          )
-                        """,
-                        (event_id, event_id, OUTLOOK_ACCOUNT_ID),
-                    )
-                upserted += 1
-            if full_refresh:
-                for previous_id in previous_outlook_ids:
-                    if conn.execute(
-                        """
-                        SELECT 1 FROM schedule_events
-                        WHERE id = ? AND account_id = ?
-                        """,
-                        (previous_id, OUTLOOK_ACCOUNT_ID),
-                    ).fetchone() is None:
-                        conn.execute(
-                            "DELETE FROM goal_schedule_links WHERE event_id = ?",
-                            (previous_id,),
-                        )
-            _set_meta(conn, DELTA_LINK_META_KEY, str(result["delta_link"]))
-            _set_meta(conn, LAST_SYNC_AT_META_KEY, str(now))
-            _set_meta(conn, WINDOW_START_META_KEY, window_start.isoformat())
-            _set_meta(conn, WINDOW_END_META_KEY, window_end.isoformat())
+            with _write_transaction(conn):
+                if full_refresh:
+                    _sweep_unseen_outlook_events(conn)
+                # Written last: a walk that dies mid-way leaves the previous
+                # link in place and the next sync replays the pages idempotently.
+                _set_meta(conn, DELTA_LINK_META_KEY, next_delta_link)
+                _set_meta(conn, LAST_SYNC_AT_META_KEY, str(now))
+                _set_meta(conn, WINDOW_START_META_KEY, window_start.isoformat())
+                _set_meta(conn, WINDOW_END_META_KEY, window_end.isoformat())
+        finally:
+            conn.close()
+        logging_service.log_event(
+            "schedule_sync_completed",
+            full_refresh=full_refresh,
+            pages=int(fetch_stats.get("pages", 0)),
+            bytes=int(fetch_stats.get("bytes", 0)),
+            fetch_ms=int(fetch_stats.get("elapsed_ms", 0)),
+            upserted=upserted,
+            deleted=deleted,
+            elapsed_ms=int((perf_counter() - started) * 1000),
+        )
         return {
             "ok": True,
             "configured": True,
@@ -522,6 +494,7 @@ class ScheduleService:
     def logout(self) -> None:
         with _SYNC_LOCK:
             self.auth.logout()
+            _remember_connection(self.auth.client_id() is not None, False)
             with db.transaction() as conn:
                 conn.execute(
                     "DELETE FROM schedule_events WHERE account_id = ?",
@@ -540,6 +513,7 @@ class ScheduleService:
     def _connected_graph(self) -> Any:
         configured = self.auth.client_id() is not None
         token = self._access_token() if configured else None
+        _remember_connection(configured, token is not None)
         if token is None:
             raise ScheduleNotConnectedError("Microsoft 日历尚未连接")
         self._ensure_outlook_account(self._account_info())
@@ -644,6 +618,25 @@ class ScheduleService:
             return LOCAL_ACCOUNT_ID, None
         raise NoWritableAccountError("没有可写日历账号")
 
+    def _connection_state(self) -> tuple[bool, bool]:
+        """(configured, connected) for read paths.
+
+        Acquiring a token can hit MSAL (and the network on refresh), so reads
+        reuse the answer the last sync/status/write check recorded for this
+        workspace and only ask again once it is older than the TTL.
+        """
+        key = str(db.DB_PATH)
+        with _CACHE_LOCK:
+            cached = _connection_states.get(key)
+        if cached is not None and monotonic() - cached[2] < CONNECTION_CHECK_TTL_SECONDS:
+            return cached[0], cached[1]
+        configured = self.auth.client_id() is not None
+        connected = configured and self._access_token() is not None
+        if connected:
+            self._ensure_outlook_account(self._account_info())
+        _remember_connection(configured, connected)
+        return configured, connected
+
     def _access_token(self) -> str | None:
         try:
             return self.auth.get_access_token()
@@ -693,14 +686,16 @@ class ScheduleService:
         window_start: date,
         window_end: date,
         delta_link: str | None,
-    ) -> dict[str, Any]:
+        stats: dict[str, int],
+    ) -> Iterator[dict[str, Any]]:
         if delta_link:
-            return graph.calendarview_delta(delta_link=delta_link)
+            return graph.iter_calendarview_delta(delta_link=delta_link, stats=stats)
         start_dt = datetime.combine(window_start, time.min, LOCAL_TIMEZONE)
         exclusive_end = datetime.combine(window_end + timedelta(days=1), time.min, LOCAL_TIMEZONE)
-        return graph.calendarview_delta(
+        return graph.iter_calendarview_delta(
             start=start_dt.isoformat(timespec="seconds"),
             end=exclusive_end.isoformat(timespec="seconds"),
+            stats=stats,
         )
 
     def _update_payload(self, event_id: str, changes: Mapping[str, Any]) -> dict[str, Any]:
@@ -821,6 +816,116 @@ def _validate_date_range(start_date: date, end_date: date) -> None:
         raise ValueError("end 不能早于 start")
 
 
+def cached_events(start_date: date, end_date: date) -> list[dict[str, Any]]:
+    """Non-cancelled events overlapping [start_date, end_date], goal links
+    attached, ordered by start/end/id.
+
+    Served from per-day buckets that stay valid until ``schedule_revision``
+    moves; only the days not cached yet are read, in one range query.
+    """
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    if len(days) > EVENT_CACHE_MAX_DAYS:
+        return _query_events(start_date, end_date)
+    token = _schedule_cache_token()
+    buckets: dict[date, list[dict[str, Any]]] = {}
+    with _CACHE_LOCK:
+        _reset_cache_if_stale(token)
+        for day in days:
+            bucket = _event_day_cache.get(day)
+            if bucket is not None:
+                _event_day_cache.move_to_end(day)
+                buckets[day] = bucket
+    missing = [day for day in days if day not in buckets]
+    if missing:
+        fetched = _events_by_day(min(missing), max(missing))
+        with _CACHE_LOCK:
+            _reset_cache_if_stale(token)
+            for day in missing:
+                buckets[day] = fetched[day]
+                _event_day_cache[day] = fetched[day]
+            while len(_event_day_cache) > EVENT_CACHE_MAX_DAYS:
+                _event_day_cache.popitem(last=False)
+    merged: dict[str, dict[str, Any]] = {}
+    for day in days:
+        for event in buckets[day]:
+            merged.setdefault(str(event["id"]), event)
+    ordered = sorted(merged.values(), key=lambda event: (event["start_ts"], event["end_ts"], event["id"]))
+    return [_copy_event(event) for event in ordered]
+
+
+def clear_schedule_cache() -> None:
+    global _accounts_cache, _event_cache_token
+    with _CACHE_LOCK:
+        _event_day_cache.clear()
+        _event_cache_token = None
+        _accounts_cache = None
+        _connection_states.clear()
+
+
+def _query_events(start_date: date, end_date: date) -> list[dict[str, Any]]:
+    start_ts, end_ts = _date_range_epoch(start_date, end_date)
+    rows = db.query_all(
+        """
+        SELECT event.*, account.provider
+        FROM schedule_events AS event
+        LEFT JOIN calendar_accounts AS account ON account.id = event.account_id
+        WHERE event.end_ts > ? AND event.start_ts < ?
+          AND event.is_cancelled = 0
+        ORDER BY event.start_ts, event.end_ts, event.id
+        """,
+        (start_ts, end_ts),
+    )
+    events = [_row_to_event(row) for row in rows]
+    _attach_goal_links(events)
+    return events
+
+
+def _events_by_day(start_date: date, end_date: date) -> dict[date, list[dict[str, Any]]]:
+    by_day: dict[date, list[dict[str, Any]]] = {
+        start_date + timedelta(days=offset): []
+        for offset in range((end_date - start_date).days + 1)
+    }
+    for event in _query_events(start_date, end_date):
+        first = max(start_date, datetime.fromtimestamp(event["start_ts"], LOCAL_TIMEZONE).date())
+        last = min(end_date, datetime.fromtimestamp(event["end_ts"], LOCAL_TIMEZONE).date())
+        day = first
+        while day <= last:
+            day_start, day_end = _date_range_epoch(day, day)
+            if event["end_ts"] > day_start and event["start_ts"] < day_end:
+                by_day[day].append(event)
+            day += timedelta(days=1)
+    return by_day
+
+
+def _copy_event(event: Mapping[str, Any]) -> dict[str, Any]:
+    copied = dict(event)
+    copied["goal_links"] = [dict(link) for link in event.get("goal_links") or []]
+    return copied
+
+
+def _schedule_cache_token() -> tuple[str, str]:
+    row = db.query_one("SELECT value FROM meta WHERE key = ?", (SCHEDULE_REVISION_META_KEY,))
+    return str(db.DB_PATH), str(row["value"]) if row is not None else "0"
+
+
+def _reset_cache_if_stale(token: tuple[str, str]) -> None:
+    global _event_cache_token
+    if _event_cache_token != token:
+        _event_day_cache.clear()
+        _event_cache_token = token
+
+
+def _remember_accounts(token: tuple[str, str], accounts: list[dict[str, Any]]) -> None:
+    global _accounts_cache
+    with _CACHE_LOCK:
+        _accounts_cache = (token, accounts)
+
+
+def _remember_connection(configured: bool, connected: bool) -> None:
+    with _CACHE_LOCK:
+        _connection_states[str(db.DB_PATH)] = (configured, connected, monotonic())
+
+
 def _date_range_epoch(start_date: date, end_date: date) -> tuple[float, float]:
     start_dt = datetime.combine(start_date, time.min, LOCAL_TIMEZONE)
     end_dt = datetime.combine(end_date + timedelta(days=1), time.min, LOCAL_TIMEZONE)
@@ -988,7 +1093,11 @@ def _parse_graph_datetime(value: Mapping[str, Any]) -> datetime:
 
 
 def _upsert_event(conn: Any, event: Mapping[str, Any]) -> None:
-    conn.execute(
+    _upsert_events(conn, [event])
+
+
+def _upsert_events(conn: Any, events: list[Mapping[str, Any]]) -> None:
+    conn.executemany(
         """
         INSERT INTO schedule_events(
             id, account_id, subject, body_preview, start_ts, end_ts, start_local, end_local,
@@ -1011,17 +1120,122 @@ def _upsert_event(conn: Any, event: Mapping[str, Any]) -> None:
             change_key = excluded.change_key,
             synced_at = excluded.synced_at
         """,
-        tuple(
-            event[key]
-            for key in (
-                "id", "account_id", "subject", "body_preview", "start_ts", "end_ts",
-                "start_local", "end_local", "all_day", "location", "web_link",
-                "series_master_id", "is_cancelled", "change_key", "synced_at",
+        [
+            tuple(
+                event[key]
+                for key in (
+                    "id", "account_id", "subject", "body_preview", "start_ts", "end_ts",
+                    "start_local", "end_local", "all_day", "location", "web_link",
+                    "series_master_id", "is_cancelled", "change_key", "synced_at",
+                )
             )
-        ),
+            for event in events
+        ],
     )
 
 
+def _apply_delta_pages(
+    conn: sqlite3.Connection,
+    pages: Iterable[dict[str, Any]],
+    *,
+    synced_at: float,
+) -> tuple[int, int, str]:
+    """Apply each delta page in its own short write transaction, recording
+    every live Outlook id in the TEMP seen-ids table for the full-refresh
+    sweep. Returns (upserted, deleted, delta_link of the final page)."""
+    upserted = 0
+    deleted = 0
+    delta_link = ""
+    for page in pages:
+        # Within a page the last entry for an id is its current state, which
+        # makes removals and upserts disjoint and safe to batch.
+        latest: dict[str, Mapping[str, Any]] = {}
+        for raw_event in page["events"]:
+            event_id = str(raw_event.get("id") or "")
+            if not event_id:
+                raise ValueError("Graph 日程缺少 id")
+            latest.pop(event_id, None)
+            latest[event_id] = raw_event
+        removed = [(event_id,) for event_id, raw in latest.items() if raw.get("@removed") is not None]
+        events = [
+            _normalize_graph_event(raw, synced_at=synced_at)
+            for raw in latest.values()
+            if raw.get("@removed") is None
+        ]
+        cancelled = [(event["id"],) for event in events if event["is_cancelled"]]
+        with _write_transaction(conn):
+            if removed:
+                _delete_outlook_links(conn, removed)
+                cursor = conn.executemany(
+                    "DELETE FROM schedule_events WHERE id = ? AND account_id = ?",
+                    [(event_id, OUTLOOK_ACCOUNT_ID) for (event_id,) in removed],
+                )
+                deleted += max(0, cursor.rowcount)
+                conn.executemany(f"DELETE FROM {_SEEN_IDS_TABLE} WHERE id = ?", removed)
+            if events:
+                _upsert_events(conn, events)
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {_SEEN_IDS_TABLE}(id) VALUES (?)",
+                    [(event["id"],) for event in events],
+                )
+                if cancelled:
+                    _delete_outlook_links(conn, cancelled)
+                upserted += len(events)
+        delta_link = page.get("delta_link") or delta_link
+    if not delta_link:
+        raise GraphHTTPError(502)
+    return upserted, deleted, delta_link
+
+
+def _delete_outlook_links(conn: sqlite3.Connection, event_ids: list[tuple[str]]) -> None:
+    conn.executemany(
+        """
+        DELETE FROM goal_schedule_links
+        WHERE event_id = ?
+          AND EXISTS (
+              SELECT 1 FROM schedule_events
+              WHERE id = ? AND account_id = ?
+          )
+        """,
+        [(event_id, event_id, OUTLOOK_ACCOUNT_ID) for (event_id,) in event_ids],
+    )
+
+
+def _sweep_unseen_outlook_events(conn: sqlite3.Connection) -> None:
+    """After a full refresh, drop cached Outlook events (and their goal links)
+    that the walk did not return."""
+    conn.execute(
+        f"""
+        DELETE FROM goal_schedule_links
+        WHERE event_id IN (
+            SELECT id FROM schedule_events
+            WHERE account_id = ?
+              AND id NOT IN (SELECT id FROM {_SEEN_IDS_TABLE})
+        )
+        """,
+        (OUTLOOK_ACCOUNT_ID,),
+    )
+    conn.execute(
+        f"""
+        DELETE FROM schedule_events
+        WHERE account_id = ?
+          AND id NOT IN (SELECT id FROM {_SEEN_IDS_TABLE})
+        """,
+        (OUTLOOK_ACCOUNT_ID,),
+    )
+
+
+@contextmanager
+def _write_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
 def _row_to_event(row: Any) -> dict[str, Any]:
     return _event_dict(dict(row))
 
@@ -0,0 +1,73 @@
+"""Shared jieba setup: a persistent prefix-dictionary cache and boot-time warmup.
+
+jieba builds its prefix dictionary lazily on the first cut, which costs seconds
+on a cold process and used to land on the first search or time extraction. The
+runtime calls ``start_warmup()`` at boot so that cost is paid in the background.
+The built dictionary is kept under the workspace, keyed by the jieba version,
+because the temp directory jieba would pick is not guaranteed to survive reboots.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import jieba
+
+from core import db, logging_service
+
+# jieba prints "Building prefix dict..." to stderr on first use; silence it.
+jieba.setLogLevel(60)
+
+CACHE_DIRNAME = "cache"
+
+_warmup_lock = threading.Lock()
+_warmup_thread: threading.Thread | None = None
+
+
+def cache_path() -> Path:
+    return db.WORKSPACE_DIR / CACHE_DIRNAME / f"jieba-{jieba.__version__}.cache"
+
+
+def warm_up() -> bool:
+    """Load (or build and persist) the dictionary now. Returns False when it was
+    already loaded, so the call is cheap to repeat."""
+    tokenizer = jieba.dt
+    if tokenizer.initialized:
+        return False
+    path = cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Only read by initialize(); a cut racing this warmup waits on jieba's
+        # own lock rather than building a second copy.
+        tokenizer.tmp_dir = str(path.parent)
+        tokenizer.cache_file = path.name
+    except OSError:
+        pass  # jieba falls back to its temp-dir cache
+    started = time.perf_counter()
+    tokenizer.initialize()
+    logging_service.log_event(
+        "segmentation_warmed",
+        cache_path=str(path),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return True
+
+
+def start_warmup() -> threading.Thread | None:
+    """Warm the dictionary on a daemon thread; at most one per process."""
+    global _warmup_thread
+    with _warmup_lock:
+        if jieba.dt.initialized or (_warmup_thread is not None and _warmup_thread.is_alive()):
+            return None
+        _warmup_thread = threading.Thread(target=_warm_up_quietly, name="jieba-warmup", daemon=True)
+        _warmup_thread.start()
+        return _warmup_thread
+
+
+def _warm_up_quietly() -> None:
+    try:
+        warm_up()
+    except Exception as exc:  # the first real cut will simply build it inline
+        logging_service.log_event("segmentation_warmup_failed", level="WARNING", error=str(exc))
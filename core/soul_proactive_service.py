@@ -59,106 +59,115 @@ def scan_for_candidates(
     if env_disabled():
         return ProactiveScanDecision(False, "env_disabled")
 
-    with db.immediate_transaction() as conn:
-        last_scan = conn.execute(
-            "SELECT CAST(value AS REAL) AS ts FROM meta WHERE key = ?",
-            (LAST_SCAN_META_KEY,),
-        ).fetchone()
-        if (
-            last_scan is not None
-            and float(last_scan["ts"]) > now - SCAN_COOLDOWN_SECONDS
-        ):
-            return ProactiveScanDecision(False, "scan_cooldown")
-
-        conn.execute(
+    # Compare-and-set claim: one short write instead of holding the write lock
+    # across the gates, which below are plain watermark lookups.
+    with db.transaction() as conn:
+        claimed = conn.execute(
             """
             INSERT INTO meta(key, value)
             VALUES (?, ?)
             ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            WHERE CAST(meta.value AS REAL) <= ?
             """,
-            (LAST_SCAN_META_KEY, str(now)),
+            (LAST_SCAN_META_KEY, str(now), now - SCAN_COOLDOWN_SECONDS),
+        ).rowcount
+    if not claimed:
+        return ProactiveScanDecision(False, "scan_cooldown")
+
+    candidates = db.query_all(
+        """
+        SELECT souls.name, soul_letter_watermarks.last_sent_at
+        FROM souls
+        LEFT JOIN soul_letter_watermarks
+          ON soul_letter_watermarks.soul_name = souls.name
+        WHERE souls.enabled = 1
+          AND (
+              soul_letter_watermarks.last_sent_at IS NULL
+              OR soul_letter_watermarks.last_sent_at <= ?
+          )
+        ORDER BY
+            CASE WHEN soul_letter_watermarks.last_sent_at IS NULL THEN 0 ELSE 1 END,
+            soul_letter_watermarks.last_sent_at ASC,
+            souls.sort_order ASC,
+            souls.name ASC
+        """,
+        (now - SOUL_COOLDOWN_SECONDS,),
+    )
+    if not candidates:
+        return ProactiveScanDecision(False, "soul_cooldown")
+
+    last_user_activity_at = last_user_activity_ts()
+    if last_user_activity_at is None:
+        return ProactiveScanDecision(False, "no_user_activity")
+    if (
+        last_user_activity_at
+        > now - int(settings["silence_days"]) * DAY_SECONDS
+    ):
+        return ProactiveScanDecision(
+            False,
+            "silence_gate",
+            last_user_activity_at=last_user_activity_at,
         )
 
-        candidates = conn.execute(
-            """
-            WITH last_letters AS (
-                SELECT chat_threads.soul_name, MAX(soul_letters.sent_at) AS last_sent_at
-                FROM soul_letters
-                JOIN chat_messages
-                  ON chat_messages.id = soul_letters.message_id
-                JOIN chat_threads
-                  ON chat_threads.id = chat_messages.thread_id
-                GROUP BY chat_threads.soul_name
-            )
-            SELECT souls.name, last_letters.last_sent_at
-            FROM souls
-            LEFT JOIN last_letters ON last_letters.soul_name = souls.name
-            WHERE souls.enabled = 1
-              AND (
-                  last_letters.last_sent_at IS NULL
-                  OR last_letters.last_sent_at <= ?
-              )
-            ORDER BY
-                CASE WHEN last_letters.last_sent_at IS NULL THEN 0 ELSE 1 END,
-                last_letters.last_sent_at ASC,
-                souls.sort_order ASC,
-                souls.name ASC
-            """,
-            (now - SOUL_COOLDOWN_SECONDS,),
-        ).fetchall()
-        if not candidates:
-            return ProactiveScanDecision(False, "soul_cooldown")
+    global_letter = db.query_one(
+        "SELECT MAX(sent_at) AS last_sent_at FROM soul_letters"
+    )
+    last_sent_at = global_letter["last_sent_at"] if global_letter else None
+    if (
+        last_sent_at is not None
+        and float(last_sent_at) > now - GLOBAL_COOLDOWN_SECONDS
+    ):
+        return ProactiveScanDecision(
+            False,
+            "global_cooldown",
+            last_user_activity_at=last_user_activity_at,
+        )
 
-        activity = conn.execute(
+    silent_for_days = int(
+        max(0.0, now - last_user_activity_at) // DAY_SECONDS
+    )
+    return ProactiveScanDecision(
+        True,
+        "eligible",
+        tuple(str(row["name"]) for row in candidates),
+        last_user_activity_at=last_user_activity_at,
+        silent_for_days=silent_for_days,
+    )
+
+
+def last_user_activity_ts() -> float | None:
+    """Latest post, user comment or user chat message time.
+
+    Read from the trigger-maintained watermark; only after the row that set it
+    was deleted or back-dated (or on the first scan after upgrade) is it
+    rebuilt from history, in one statement so a concurrent write cannot slip
+    between the aggregate and the store.
+    """
+    row = db.query_one(
+        "SELECT last_activity_at FROM user_activity_watermark WHERE id = 1"
+    )
+    if row is None:
+        db.execute(
             """
-            SELECT MAX(created_at) AS last_user_activity_at
+            INSERT OR IGNORE INTO user_activity_watermark(id, last_activity_at)
+            SELECT 1, last_activity_at
             FROM (
-                SELECT created_at FROM posts
-                UNION ALL
-                SELECT created_at FROM comments WHERE role = 'user'
-                UNION ALL
-                SELECT created_at FROM chat_messages WHERE role = 'user'
+                SELECT MAX(created_at) AS last_activity_at
+                FROM (
+                    SELECT created_at FROM posts
+                    UNION ALL
+                    SELECT created_at FROM comments WHERE role = 'user'
+                    UNION ALL
+                    SELECT created_at FROM chat_messages WHERE role = 'user'
+                )
             )
+            WHERE last_activity_at IS NOT NULL
             """
-        ).fetchone()
-        last_user_activity_at = activity["last_user_activity_at"]
-        if last_user_activity_at is None:
-            return ProactiveScanDecision(False, "no_user_activity")
-        last_user_activity_at = float(last_user_activity_at)
-        if (
-            last_user_activity_at
-            > now - int(settings["silence_days"]) * DAY_SECONDS
-        ):
-            return ProactiveScanDecision(
-                False,
-                "silence_gate",
-                last_user_activity_at=last_user_activity_at,
-            )
-
-        global_letter = conn.execute(
-            "SELECT MAX(sent_at) AS last_sent_at FROM soul_letters"
-        ).fetchone()
-        last_sent_at = global_letter["last_sent_at"]
-        if (
-            last_sent_at is not None
-            and float(last_sent_at) > now - GLOBAL_COOLDOWN_SECONDS
-        ):
-            return ProactiveScanDecision(
-                False,
-                "global_cooldown",
-                last_user_activity_at=last_user_activity_at,
-            )
-
-        silent_for_days = int(
-            max(0.0, now - last_user_activity_at) // DAY_SECONDS
         )
-        return ProactiveScanDecision(
-            True,
-            "eligible",
-            tuple(str(row["name"]) for row in candidates),
-            last_user_activity_at=last_user_activity_at,
-            silent_for_days=silent_for_days,
+        row = db.query_one(
+            "SELECT last_activity_at FROM user_activity_watermark WHERE id = 1"
         )
+    return None if row is None else float(row["last_activity_at"])
 
 
 def run_proactive_message(
@@ -267,20 +276,31 @@ def _insert_soul_letter_rows(
     )
 
 
-def own_comments_by_post(soul_name: str) -> dict[str, tuple[str, ...]]:
-    """This SOUL's own public replies, keyed by post.
+def own_comments_by_post(
+    soul_name: str,
+    post_ids: tuple[str, ...] | list[str],
+) -> dict[str, tuple[str, ...]]:
+    """This SOUL's own public replies to the given posts, keyed by post.
 
     Handed to the letter prompt so a second reaction to a post it already
     answered is visibly redundant — the silence gate stops a *fresh* post from
-    existing, but it cannot stop the model from re-reacting to an old one."""
+    existing, but it cannot stop the model from re-reacting to an old one.
+    Only the posts that made it into the material are looked up, through
+    ``idx_comments_post_soul``, never the SOUL's whole comment history."""
+    if not post_ids:
+        return {}
+    placeholders = ",".join("?" for _ in post_ids)
     rows = db.query_all(
-        """
+        f"""
         SELECT post_id, content
         FROM comments
-        WHERE role = 'assistant' AND soul_name = ? AND content <> ''
+        WHERE post_id IN ({placeholders})
+          AND soul_name = ?
+          AND role = 'assistant'
+          AND content <> ''
         ORDER BY id ASC
         """,
-        (soul_name,),
+        (*post_ids, soul_name),
     )
     grouped: dict[str, list[str]] = {}
     for row in rows:
@@ -291,8 +311,15 @@ def own_comments_by_post(soul_name: str) -> dict[str, tuple[str, ...]]:
 def list_unused_public_material_rows(
     *,
     since: float,
+    limit: int,
 ) -> list[dict[str, Any]]:
-    """Return public posts and user-authored public comments not used by a letter."""
+    """Return the newest ``limit`` unused public posts plus their user comments.
+
+    ``idx_posts_created`` lets the scan walk back from the newest post and stop
+    after ``limit`` hits; a post counts as consumed once a letter lists it in
+    ``soul_message_sources`` (probed through ``idx_soul_message_sources_post``).
+    The cost is bounded by the window and the limit, not by the history.
+    """
     rows = db.query_all(
         """
         WITH available_posts AS (
@@ -304,6 +331,8 @@ def list_unused_public_material_rows(
                   FROM soul_message_sources
                   WHERE soul_message_sources.post_id = posts.id
               )
+            ORDER BY posts.created_at DESC
+            LIMIT ?
         ),
         material_rows AS (
             SELECT
@@ -345,6 +374,6 @@ def list_unused_public_material_rows(
             item_created_at ASC,
             item_id ASC
         """,
-        (since,),
+        (since, max(0, int(limit))),
     )
     return [dict(row) for row in rows]
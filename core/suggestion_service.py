@@ -121,47 +121,22 @@ def metadata_with_live_suggestions(metadata: str | None) -> str | None:
 
     用户采纳或忽略后只改了 suggestions 表，快照不会跟着变，于是刷新页面时被忽略的
     建议又原样冒出来。读取时按真实状态过一遍：只留还 pending 的，已决定的和已被删掉
-    的都去掉。
+    的都去掉。渲染一串消息时请用成批版本。
     """
-    if not metadata or '"suggestions"' not in metadata:
-        return metadata
-    try:
-        parsed = json.loads(metadata)
-    except (TypeError, ValueError):
-        return metadata
-    if not isinstance(parsed, dict):
-        return metadata
-    snapshot = parsed.get("suggestions")
-    if not isinstance(snapshot, list) or not snapshot:
-        return metadata
-
-    ids = _snapshot_suggestion_ids(snapshot)
-    if not ids:
-        return metadata
-    return _metadata_keeping_live(metadata, parsed, snapshot, _pending_suggestion_ids(ids))
+    return metadata_with_live_suggestions_batch([metadata])[0]
 
 
 def metadata_with_live_suggestions_batch(metadatas: list[str | None]) -> list[str | None]:
-    """成批过滤建议快照。首页一屏上百条评论，逐条查 suggestions 表就是上百次往返。"""
+    """成批过滤建议快照：每条 metadata 只解析一次，所有引用到的建议 id 合并成一次
+    IN 查询。首页一屏上百条评论、长私聊线程，逐条查 suggestions 表就是上百次往返。"""
     parsed_by_index: dict[int, tuple[dict, list]] = {}
     all_ids: set[str] = set()
     for index, metadata in enumerate(metadatas):
-        if not metadata or '"suggestions"' not in metadata:
-            continue
-        try:
-            parsed = json.loads(metadata)
-        except (TypeError, ValueError):
-            continue
-        if not isinstance(parsed, dict):
+        parsed_snapshot = _parse_suggestion_snapshot(metadata)
+        if parsed_snapshot is None:
             continue
-        snapshot = parsed.get("suggestions")
-        if not isinstance(snapshot, list) or not snapshot:
-            continue
-        ids = _snapshot_suggestion_ids(snapshot)
-        if not ids:
-            continue
-        parsed_by_index[index] = (parsed, snapshot)
-        all_ids.update(ids)
+        parsed_by_index[index] = parsed_snapshot
+        all_ids.update(_snapshot_suggestion_ids(parsed_snapshot[1]))
 
     if not parsed_by_index:
         return list(metadatas)
@@ -172,6 +147,24 @@ def metadata_with_live_suggestions_batch(metadatas: list[str | None]) -> list[st
     return result
 
 
+def _parse_suggestion_snapshot(metadata: str | None) -> tuple[dict, list] | None:
+    """(整个 metadata, 建议快照)；没有可过滤的快照时返回 None，原样放行。"""
+    if not metadata or '"suggestions"' not in metadata:
+        return None
+    try:
+        parsed = json.loads(metadata)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(parsed, dict):
+        return None
+    snapshot = parsed.get("suggestions")
+    if not isinstance(snapshot, list) or not snapshot:
+        return None
+    if not _snapshot_suggestion_ids(snapshot):
+        return None
+    return parsed, snapshot
+
+
 def _snapshot_suggestion_ids(snapshot: list) -> list[str]:
     return [
         item["id"]
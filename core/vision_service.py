@@ -3,16 +3,17 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
 
 from core import attachment_service, db, logging_service
 from core.cli.config import CONFIG_FILE, normalize_vision_config
-from core.llm.common import call_json_completion
+from core.llm.common import CHAT_CLIENT_MAX_RETRIES, call_json_completion
 
 PROMPT_VERSION = "vision-summary-v1"
 VISION_TIMEOUT_SECONDS = 60
+VISION_RESPONSE_CACHE_TTL_S = 30 * 24 * 3600
 
 
 @dataclass(frozen=True)
@@ -99,8 +100,18 @@ def describe_attachments(attachments: list[attachment_service.Attachment]) -> li
     if not missing:
         return cached
 
-    generated = _call_vision_llm(missing, config)
-    return [*cached, *generated]
+    # Identical images in one batch are described once and the summary is
+    # shared; later attachments of the same content hit the cache by sha256.
+    unique: dict[str, attachment_service.Attachment] = {}
+    for attachment in missing:
+        unique.setdefault(attachment.sha256, attachment)
+    generated = {summary.attachment_id: summary for summary in _call_vision_llm(list(unique.values()), config)}
+    shared = []
+    for attachment in missing:
+        summary = generated.get(unique[attachment.sha256].id)
+        if summary is not None:
+            shared.append(replace(summary, attachment_id=attachment.id))
+    return [*cached, *shared]
 
 
 def cached_summaries_for_attachments(
@@ -110,25 +121,39 @@ def cached_summaries_for_attachments(
 ) -> list[VisionSummary]:
     if not attachments:
         return []
-    settings = _effective_config(config or _load_config())
+    # ``config`` is already effective (describe_attachments); normalizing it
+    # again would drop the vision model and miss every cached summary.
+    settings = config if config is not None else _effective_config(_load_config())
     model = str(settings.get("model") or "")
     if not model:
         return []
-    ids = [attachment.id for attachment in attachments]
-    placeholders = ",".join("?" for _ in ids)
+    # Summaries are keyed by content: any attachment sharing the sha256 (a
+    # re-posted screenshot) reuses the one already described.
+    hashes = sorted({attachment.sha256 for attachment in attachments})
+    placeholders = ",".join("?" for _ in hashes)
     rows = db.query_all(
         f"""
-        SELECT attachment_id, status, description, visible_text, uncertainties, error
+        SELECT attachments.sha256, vision_cache.attachment_id, vision_cache.status,
+               vision_cache.description, vision_cache.visible_text,
+               vision_cache.uncertainties, vision_cache.error
         FROM vision_cache
-        WHERE attachment_id IN ({placeholders})
-          AND model = ?
-          AND prompt_version = ?
-          AND status = 'ok'
+        JOIN attachments ON attachments.id = vision_cache.attachment_id
+        WHERE attachments.sha256 IN ({placeholders})
+          AND vision_cache.model = ?
+          AND vision_cache.prompt_version = ?
+          AND vision_cache.status = 'ok'
+        ORDER BY vision_cache.updated_at DESC
         """,
-        (*ids, model, PROMPT_VERSION),
+        (*hashes, model, PROMPT_VERSION),
     )
-    by_id = {row["attachment_id"]: _summary_from_row(row) for row in rows}
-    return [by_id[attachment.id] for attachment in attachments if attachment.id in by_id]
+    by_hash: dict[str, VisionSummary] = {}
+    for row in rows:
+        by_hash.setdefault(row["sha256"], _summary_from_row(row))
+    return [
+        replace(by_hash[attachment.sha256], attachment_id=attachment.id)
+        for attachment in attachments
+        if attachment.sha256 in by_hash
+    ]
 
 
 def cached_context_for_post(post_id: str) -> str:
@@ -139,8 +164,16 @@ def _call_vision_llm(attachments: list[attachment_service.Attachment], config: d
     try:
         from openai import OpenAI
 
-        client = OpenAI(api_key=config["api_key"], base_url=config["base_url"])
-        image_inputs = attachment_service.image_inputs_for_attachments(attachments)
+        client = OpenAI(
+            api_key=config["api_key"], base_url=config["base_url"], max_retries=CHAT_CLIENT_MAX_RETRIES,
+        )
+        input_stats = attachment_service.ImageInputStats()
+        image_inputs = attachment_service.image_inputs_for_attachments(
+            attachments,
+            stats=input_stats,
+            max_side=config["image_max_side"],
+            max_short_side=config["image_max_short_side"],
+        )
         messages = _vision_messages(image_inputs)
         parsed = call_json_completion(
             client=client,
@@ -153,7 +186,9 @@ def _call_vision_llm(attachments: list[attachment_service.Attachment], config: d
             trace_context={
                 "attachment_ids": [attachment.id for attachment in attachments],
                 "prompt_version": PROMPT_VERSION,
+                "image_input_cache": input_stats.as_dict(),
             },
+            cache_ttl_s=VISION_RESPONSE_CACHE_TTL_S,
         )
         if parsed is None:
             raise ValueError("vision response invalid")
@@ -335,6 +370,8 @@ def _effective_config(config: dict) -> dict:
         "model": vision.get("model"),
         "api_key": vision.get("api_key") or config.get("api_key"),
         "base_url": vision.get("base_url") or config.get("base_url") or "https://api.openai.com/v1",
+        "image_max_side": vision["image_max_side"],
+        "image_max_short_side": vision["image_max_short_side"],
     }
 
 
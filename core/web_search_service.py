@@ -2,21 +2,40 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import sqlite3
+import threading
 import time
-import urllib.error
-import urllib.request
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
 
-from core import logging_service
+import httpx
+
+from core import db, logging_service
 from core.cli.config import CONFIG_FILE, normalize_web_search_config
 
 PROVIDER_TAVILY = "tavily"
 PROVIDER_DUCKDUCKGO = "duckduckgo"
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Queries of one search run concurrently under a single deadline of
+# ``timeout_s``; whatever finished by then is used. Workers outlive a timed-out
+# run and still fill the cache, so a follow-up turn gets the late answers.
+SEARCH_WORKERS = 6
+# Hot entries stay in process; the SQLite tier survives restarts.
+MEMORY_CACHE_MAX_ENTRIES = 256
+DB_CACHE_MAX_ROWS = 2000
 
-_cache: dict[tuple[str, str, int, bool], tuple[float, list["WebSearchResult"]]] = {}
+_CacheKey = tuple[str, str, int, bool]
+_memory_cache: OrderedDict[_CacheKey, tuple[float, list["WebSearchResult"]]] = OrderedDict()
+_memory_cache_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_http_client: httpx.Client | None = None
+_pool_lock = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -118,21 +137,35 @@ def search(
         max_results=settings.max_results,
     )
     try:
-        per_query_results: list[list[WebSearchResult]] = []
-        cache_hit = False
         per_query_limit = max(1, settings.max_results)
-        for query in clean_queries:
+        finished: dict[int, list[WebSearchResult]] = {}
+        pending: dict[Future, int] = {}
+        for index, query in enumerate(clean_queries):
             cached = _cached(provider, query, per_query_limit, settings.cache_ttl_s, include_raw_content)
             if cached is not None:
-                cache_hit = True
-                query_results = cached
+                finished[index] = cached
             else:
-                query_results = _search_one(
-                    provider, query, settings, per_query_limit, include_raw_content=include_raw_content
+                future = _search_executor().submit(
+                    _search_and_store, provider, query, settings, per_query_limit, include_raw_content
                 )
-                _store_cache(provider, query, per_query_limit, query_results, include_raw_content)
-            per_query_results.append(query_results)
-
+                pending[future] = index
+        cache_hits = len(finished)
+        errors: list[Exception] = []
+        timed_out = 0
+        if pending:
+            done, not_done = wait(pending, timeout=settings.timeout_s)
+            for future in done:
+                try:
+                    finished[pending[future]] = future.result()
+                except Exception as exc:
+                    errors.append(exc)
+            timed_out = len(not_done)
+        if not finished:
+            if errors:
+                raise errors[0]
+            raise TimeoutError(f"网页搜索在 {settings.timeout_s}s 内没有返回")
+
+        per_query_results = [finished[index] for index in sorted(finished)]
         deduped = _dedupe_results(_interleave(per_query_results))[: settings.max_results]
         elapsed_ms = int((time.perf_counter() - started) * 1000)
         logging_service.log_event(
@@ -143,7 +176,10 @@ def search(
             query_count=len(clean_queries),
             result_count=len(deduped),
             elapsed_ms=elapsed_ms,
-            cache_hit=cache_hit,
+            cache_hit=cache_hits > 0,
+            cache_hits=cache_hits,
+            failed_query_count=len(errors),
+            timed_out_query_count=timed_out,
         )
         return WebSearchRun(
             used=bool(deduped),
@@ -201,7 +237,38 @@ def format_results_for_context(run: WebSearchRun, *, max_chars_per_result: int =
 
 
 def clear_cache() -> None:
-    _cache.clear()
+    with _memory_cache_lock:
+        _memory_cache.clear()
+    if not db.DB_PATH.exists():
+        return
+    try:
+        db.execute("DELETE FROM web_search_cache")
+    except sqlite3.Error:
+        return
+
+
+def _search_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="web-search")
+        return _executor
+
+
+def _tavily_http() -> httpx.Client:
+    global _http_client
+    with _pool_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=httpx.Limits(max_connections=SEARCH_WORKERS, keepalive_expiry=60))
+        return _http_client
+
+
+def _search_and_store(
+    provider: str, query: str, config: WebSearchConfig, max_results: int, include_raw_content: bool
+) -> list[WebSearchResult]:
+    results = _search_one(provider, query, config, max_results, include_raw_content=include_raw_content)
+    _store_cache(provider, query, max_results, results, include_raw_content, config.cache_ttl_s)
+    return results
 
 
 def _search_one(
@@ -229,28 +296,20 @@ def _search_tavily(
 ) -> list[WebSearchResult]:
     if not config.tavily_api_key:
         raise RuntimeError("Tavily API Key 未配置")
-    payload = json.dumps(
-        {
+    response = _tavily_http().post(
+        TAVILY_SEARCH_URL,
+        json={
             "query": query,
             "max_results": max_results,
             "include_answer": False,
             "include_raw_content": include_raw_content,
-        }
-    ).encode("utf-8")
-    request = urllib.request.Request(
-        "https://api.tavily.com/search",
-        data=payload,
-        method="POST",
-        headers={
-            "Authorization": f"Bearer {config.tavily_api_key}",
-            "Content-Type": "application/json",
         },
+        headers={"Authorization": f"Bearer {config.tavily_api_key}"},
+        timeout=config.timeout_s,
     )
-    try:
-        with urllib.request.urlopen(request, timeout=config.timeout_s) as response:
-            data = json.loads(response.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        raise RuntimeError(f"Tavily HTTP {exc.code}") from exc
+    if response.status_code >= 400:
+        raise RuntimeError(f"Tavily HTTP {response.status_code}")
+    data = response.json()
     items = data.get("results") if isinstance(data, dict) else None
     if not isinstance(items, list):
         return []
@@ -309,20 +368,112 @@ def _cached(
     if ttl_s <= 0:
         return None
     key = (provider, query, max_results, include_raw_content)
-    cached = _cache.get(key)
-    if cached is None:
+    oldest = time.time() - ttl_s
+    with _memory_cache_lock:
+        cached = _memory_cache.get(key)
+        if cached is not None:
+            if cached[0] > oldest:
+                _memory_cache.move_to_end(key)
+                return list(cached[1])
+            _memory_cache.pop(key, None)
+    stored = _db_cached(key, oldest)
+    if stored is None:
         return None
-    stored_at, results = cached
-    if time.time() - stored_at > ttl_s:
-        _cache.pop(key, None)
-        return None
-    return list(results)
+    _remember(key, *stored)
+    return list(stored[1])
 
 
 def _store_cache(
-    provider: str, query: str, max_results: int, results: list[WebSearchResult], include_raw_content: bool
+    provider: str,
+    query: str,
+    max_results: int,
+    results: list[WebSearchResult],
+    include_raw_content: bool,
+    ttl_s: int,
 ) -> None:
-    _cache[(provider, query, max_results, include_raw_content)] = (time.time(), list(results))
+    if ttl_s <= 0:
+        return
+    key = (provider, query, max_results, include_raw_content)
+    stored_at = time.time()
+    _remember(key, stored_at, list(results))
+    _db_store(key, stored_at, results, ttl_s)
+
+
+def _remember(key: _CacheKey, stored_at: float, results: list[WebSearchResult]) -> None:
+    with _memory_cache_lock:
+        _memory_cache[key] = (stored_at, results)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_MAX_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _db_cache_key(key: _CacheKey) -> str:
+    payload = json.dumps(list(key), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _db_cached(key: _CacheKey, oldest: float) -> tuple[float, list[WebSearchResult]] | None:
+    if not db.DB_PATH.exists():
+        return None
+    try:
+        row = db.query_one(
+            """
+            SELECT created_at, results_json
+            FROM web_search_cache
+            WHERE cache_key = ? AND created_at > ? AND expires_at > ?
+            """,
+            (_db_cache_key(key), oldest, time.time()),
+        )
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    try:
+        results = [WebSearchResult(**item) for item in json.loads(row["results_json"])]
+    except (TypeError, ValueError):
+        return None
+    return float(row["created_at"]), results
+
+
+def _db_store(key: _CacheKey, stored_at: float, results: list[WebSearchResult], ttl_s: int) -> None:
+    if not db.DB_PATH.exists():
+        return
+    provider, query, _, _ = key
+    try:
+        with db.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO web_search_cache(cache_key, provider, query, results_json, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    results_json = excluded.results_json,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at
+                """,
+                (
+                    _db_cache_key(key),
+                    provider,
+                    query,
+                    json.dumps([asdict(result) for result in results], ensure_ascii=False),
+                    stored_at,
+                    stored_at + ttl_s,
+                ),
+            )
+            conn.execute("DELETE FROM web_search_cache WHERE expires_at <= ?", (stored_at,))
+            conn.execute(
+                """
+                DELETE FROM web_search_cache
+                WHERE cache_key IN (
+                    SELECT cache_key
+                    FROM web_search_cache
+                    ORDER BY created_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (DB_CACHE_MAX_ROWS,),
+            )
+    except sqlite3.Error:
+        return
 
 
 def _interleave(per_query_results: list[list[WebSearchResult]]) -> list[WebSearchResult]:
@@ -30,6 +30,8 @@ hiddenimports = [
     *jieba_hiddenimports,
     *collect_submodules("uvicorn"),
     *collect_submodules("ddgs"),
+    # httpcore imports h2 lazily, only once an HTTP/2 connection is opened.
+    *collect_submodules("h2"),
 ]
 
 a = Analysis(
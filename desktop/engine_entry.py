@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import multiprocessing
 import os
 import signal
 import sys
@@ -19,6 +20,10 @@ def _stop_when_parent_pipe_closes() -> None:
 
 
 if __name__ == "__main__":
+    # Must run first: in the frozen build a spawned image-encode worker
+    # re-executes this entrypoint, and freeze_support() turns it into the
+    # worker instead of a second server.
+    multiprocessing.freeze_support()
     if os.environ.get("TRACELOG_PARENT_PIPE") == "1":
         threading.Thread(target=_stop_when_parent_pipe_closes, daemon=True).start()
     sys.exit(main(["serve", "--host", "127.0.0.1", "--port", "0", "--no-open"]))
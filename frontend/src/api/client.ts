@@ -126,6 +126,8 @@ export interface Attachment {
   linked_at: number | null
   created_at: number
   url: string
+  /** Feed-sized derivatives keyed by pixel width; only widths narrower than the image. */
+  thumbnails: Record<string, string>
 }
 
 export interface Soul {
@@ -606,6 +608,15 @@ export function attachmentUrl(attachment: Attachment): string {
   return `${BASE}${attachment.url}`
 }
 
+/** Smallest thumbnail at least `width` px wide, falling back to the original. */
+export function attachmentThumbnailUrl(attachment: Attachment, width: number): string {
+  const widths = Object.keys(attachment.thumbnails ?? {})
+    .map(Number)
+    .sort((a, b) => a - b)
+  const match = widths.find((candidate) => candidate >= width)
+  return match === undefined ? attachmentUrl(attachment) : `${BASE}${attachment.thumbnails[String(match)]}`
+}
+
 /** A reply's cited memory: a belief UNIT, or raw FRESH evidence not yet
  *  reconciled into a unit (the [尚未稳定沉淀的原始证据] layer). */
 export interface MemoryCitation {
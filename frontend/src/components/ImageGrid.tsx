@@ -1,5 +1,5 @@
 import { useState, type CSSProperties } from 'react'
-import { type Attachment, attachmentUrl } from '@/api/client'
+import { type Attachment, attachmentThumbnailUrl } from '@/api/client'
 import { ImageViewer } from './ImageViewer'
 import styles from './ImageGrid.module.css'
 
@@ -18,6 +18,8 @@ export function ImageGrid({ attachments, borderless = false, compact = false, di
   const visibleCount = Math.min(attachments.length, 9)
   const layout = getLayoutClass(visibleCount)
   const gridStyle = visibleCount === 1 ? imageRatioStyle(attachments[0]!) : undefined
+  // A single image renders up to 360 CSS px, grid cells under 200 — doubled for HiDPI.
+  const thumbnailWidth = visibleCount === 1 && !compact ? 1280 : 640
 
   return (
     <>
@@ -36,7 +38,7 @@ export function ImageGrid({ attachments, borderless = false, compact = false, di
               onClick={() => setActiveIndex(index)}
               aria-label="查看图片"
             >
-              <img src={attachmentUrl(attachment)} alt="" loading="lazy" />
+              <img src={attachmentThumbnailUrl(attachment, thumbnailWidth)} alt="" loading="lazy" />
             </button>
             {onRemove && (
               <button
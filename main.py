@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import multiprocessing
 import sys
 
 from core.cli import app as cli_app
@@ -19,4 +20,6 @@ def main(argv: list[str] | None = None) -> int:
 
 
 if __name__ == "__main__":
+    # Spawned image-encode workers re-execute this entrypoint when frozen.
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -31,6 +31,7 @@ CREATE TABLE IF NOT EXISTS posts (
 
 CREATE INDEX IF NOT EXISTS idx_posts_ts ON posts(ts DESC);
 CREATE INDEX IF NOT EXISTS idx_posts_importance ON posts(importance DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(created_at DESC);
 
 CREATE TABLE IF NOT EXISTS calendar_accounts (
     id           TEXT PRIMARY KEY,
@@ -60,6 +61,33 @@ CREATE TABLE IF NOT EXISTS schedule_events (
 CREATE INDEX IF NOT EXISTS idx_schedule_events_start ON schedule_events(start_ts);
 CREATE INDEX IF NOT EXISTS idx_schedule_events_account ON schedule_events(account_id);
 
+-- Keyword lookup for "mentioned schedule" anchors (schedule_context). Only the
+-- visible title/location are indexed; body_preview never reaches prompts.
+CREATE VIRTUAL TABLE IF NOT EXISTS schedule_events_fts USING fts5(
+    subject,
+    location,
+    tokenize='trigram',
+    content='schedule_events',
+    content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS schedule_events_fts_ai AFTER INSERT ON schedule_events BEGIN
+    INSERT INTO schedule_events_fts(rowid, subject, location)
+        VALUES (new.rowid, new.subject, new.location);
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_events_fts_ad AFTER DELETE ON schedule_events BEGIN
+    INSERT INTO schedule_events_fts(schedule_events_fts, rowid, subject, location)
+        VALUES ('delete', old.rowid, old.subject, old.location);
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_events_fts_au AFTER UPDATE OF subject, location ON schedule_events BEGIN
+    INSERT INTO schedule_events_fts(schedule_events_fts, rowid, subject, location)
+        VALUES ('delete', old.rowid, old.subject, old.location);
+    INSERT INTO schedule_events_fts(rowid, subject, location)
+        VALUES (new.rowid, new.subject, new.location);
+END;
+
 CREATE TABLE IF NOT EXISTS post_soul_orders (
     post_id    TEXT NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
     soul_name  TEXT NOT NULL REFERENCES souls(name) ON DELETE CASCADE,
@@ -106,6 +134,24 @@ CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
     INSERT INTO posts_fts_trigram(rowid, content) VALUES (new.rowid, new.content);
 END;
 
+-- Monotonic posts change counter (meta.posts_revision). retrieval's search result
+-- cache keys on it, so any writer that touches posts invalidates cached rankings
+-- without having to know the cache exists.
+CREATE TRIGGER IF NOT EXISTS posts_revision_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO meta(key, value) VALUES ('posts_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS posts_revision_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO meta(key, value) VALUES ('posts_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS posts_revision_au AFTER UPDATE OF content, created_at ON posts BEGIN
+    INSERT INTO meta(key, value) VALUES ('posts_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
 CREATE TABLE IF NOT EXISTS comments (
     id          INTEGER PRIMARY KEY AUTOINCREMENT,
     post_id     TEXT NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
@@ -134,12 +180,17 @@ CREATE TABLE IF NOT EXISTS attachments (
     width             INTEGER NOT NULL,
     height            INTEGER NOT NULL,
     sha256            TEXT NOT NULL,
+    source_sha256     TEXT,
     original_filename TEXT,
     linked_at         REAL,
     created_at        REAL NOT NULL
 );
 
+-- Blobs are content-addressed: rows with the same sha256 share file_path.
+-- source_sha256 hashes the raw upload so a re-post skips normalization.
 CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments(sha256);
+CREATE INDEX IF NOT EXISTS idx_attachments_source_sha256 ON attachments(source_sha256);
+CREATE INDEX IF NOT EXISTS idx_attachments_file_path ON attachments(file_path);
 CREATE INDEX IF NOT EXISTS idx_attachments_linked_created ON attachments(linked_at, created_at);
 
 CREATE TABLE IF NOT EXISTS vision_cache (
@@ -162,6 +213,36 @@ CREATE INDEX IF NOT EXISTS idx_vision_cache_attachment
 CREATE INDEX IF NOT EXISTS idx_vision_cache_status
     ON vision_cache(status, updated_at);
 
+-- Content-addressed responses of deterministic LLM calls (core/llm/response_cache.py).
+-- cache_key hashes (operation, model, normalized messages, response_format); rows
+-- expire at expires_at and the least recently used are trimmed past the row cap.
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key        TEXT PRIMARY KEY,
+    operation        TEXT NOT NULL,
+    model            TEXT NOT NULL,
+    response_content TEXT NOT NULL,
+    created_at       REAL NOT NULL,
+    last_used_at     REAL NOT NULL,
+    expires_at       REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_used
+    ON llm_response_cache(last_used_at);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires
+    ON llm_response_cache(expires_at);
+
+CREATE TABLE IF NOT EXISTS web_search_cache (
+    cache_key    TEXT PRIMARY KEY,
+    provider     TEXT NOT NULL,
+    query        TEXT NOT NULL,
+    results_json TEXT NOT NULL,
+    created_at   REAL NOT NULL,
+    expires_at   REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_web_search_cache_expires
+    ON web_search_cache(expires_at);
+
 CREATE TABLE IF NOT EXISTS post_attachments (
     post_id       TEXT NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
     attachment_id TEXT NOT NULL REFERENCES attachments(id) ON DELETE CASCADE,
@@ -241,6 +322,108 @@ CREATE TABLE IF NOT EXISTS soul_message_sources (
 CREATE INDEX IF NOT EXISTS idx_soul_message_sources_post
     ON soul_message_sources(post_id);
 
+-- Proactive letter gates read these watermarks instead of aggregating the
+-- whole history on every scan. user_activity_watermark is MAX(created_at) over
+-- posts, user comments and user chat messages. Deleting or back-dating the row
+-- that set it drops the watermark rather than rescanning per row; the next scan
+-- rebuilds it (soul_proactive_service.last_user_activity_at).
+CREATE TABLE IF NOT EXISTS user_activity_watermark (
+    id               INTEGER PRIMARY KEY CHECK(id = 1),
+    last_activity_at REAL NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS user_activity_posts_ai AFTER INSERT ON posts BEGIN
+    UPDATE user_activity_watermark
+    SET last_activity_at = MAX(last_activity_at, NEW.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_posts_ad AFTER DELETE ON posts BEGIN
+    DELETE FROM user_activity_watermark WHERE last_activity_at <= OLD.created_at;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_posts_au AFTER UPDATE OF created_at ON posts BEGIN
+    DELETE FROM user_activity_watermark WHERE last_activity_at <= OLD.created_at;
+    UPDATE user_activity_watermark
+    SET last_activity_at = MAX(last_activity_at, NEW.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_comments_ai AFTER INSERT ON comments
+WHEN NEW.role = 'user' BEGIN
+    UPDATE user_activity_watermark
+    SET last_activity_at = MAX(last_activity_at, NEW.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_comments_ad AFTER DELETE ON comments
+WHEN OLD.role = 'user' BEGIN
+    DELETE FROM user_activity_watermark WHERE last_activity_at <= OLD.created_at;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_comments_au AFTER UPDATE OF created_at, role ON comments BEGIN
+    DELETE FROM user_activity_watermark
+    WHERE OLD.role = 'user' AND last_activity_at <= OLD.created_at;
+    UPDATE user_activity_watermark
+    SET last_activity_at = MAX(last_activity_at, NEW.created_at)
+    WHERE NEW.role = 'user';
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_chat_messages_ai AFTER INSERT ON chat_messages
+WHEN NEW.role = 'user' BEGIN
+    UPDATE user_activity_watermark
+    SET last_activity_at = MAX(last_activity_at, NEW.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_chat_messages_ad AFTER DELETE ON chat_messages
+WHEN OLD.role = 'user' BEGIN
+    DELETE FROM user_activity_watermark WHERE last_activity_at <= OLD.created_at;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_activity_chat_messages_au AFTER UPDATE OF created_at, role ON chat_messages BEGIN
+    DELETE FROM user_activity_watermark
+    WHERE OLD.role = 'user' AND last_activity_at <= OLD.created_at;
+    UPDATE user_activity_watermark
+    SET last_activity_at = MAX(last_activity_at, NEW.created_at)
+    WHERE NEW.role = 'user';
+END;
+
+-- Latest letter per SOUL. Letters are rare (the global cooldown allows one
+-- every few days), so a deleted or edited letter simply rebuilds the table.
+-- No foreign key to souls: a SOUL delete cascades into soul_letters, and the
+-- rebuild triggered mid-cascade must not trip over the already-deleted parent.
+CREATE TABLE IF NOT EXISTS soul_letter_watermarks (
+    soul_name    TEXT PRIMARY KEY,
+    last_sent_at REAL NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS soul_letter_watermarks_ai AFTER INSERT ON soul_letters BEGIN
+    INSERT INTO soul_letter_watermarks(soul_name, last_sent_at)
+    SELECT chat_threads.soul_name, NEW.sent_at
+    FROM chat_messages
+    JOIN chat_threads ON chat_threads.id = chat_messages.thread_id
+    WHERE chat_messages.id = NEW.message_id
+    ON CONFLICT(soul_name) DO UPDATE SET
+        last_sent_at = MAX(last_sent_at, excluded.last_sent_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS soul_letter_watermarks_ad AFTER DELETE ON soul_letters BEGIN
+    DELETE FROM soul_letter_watermarks;
+    INSERT INTO soul_letter_watermarks(soul_name, last_sent_at)
+    SELECT chat_threads.soul_name, MAX(soul_letters.sent_at)
+    FROM soul_letters
+    JOIN chat_messages ON chat_messages.id = soul_letters.message_id
+    JOIN chat_threads ON chat_threads.id = chat_messages.thread_id
+    GROUP BY chat_threads.soul_name;
+END;
+
+CREATE TRIGGER IF NOT EXISTS soul_letter_watermarks_au AFTER UPDATE OF message_id, sent_at ON soul_letters BEGIN
+    DELETE FROM soul_letter_watermarks;
+    INSERT INTO soul_letter_watermarks(soul_name, last_sent_at)
+    SELECT chat_threads.soul_name, MAX(soul_letters.sent_at)
+    FROM soul_letters
+    JOIN chat_messages ON chat_messages.id = soul_letters.message_id
+    JOIN chat_threads ON chat_threads.id = chat_messages.thread_id
+    GROUP BY chat_threads.soul_name;
+END;
+
 CREATE TABLE IF NOT EXISTS goals (
     id               TEXT PRIMARY KEY,
     title            TEXT NOT NULL,
@@ -260,6 +443,26 @@ CREATE TABLE IF NOT EXISTS goals (
 CREATE INDEX IF NOT EXISTS idx_goals_status_horizon
     ON goals(status, horizon, id);
 
+CREATE VIRTUAL TABLE IF NOT EXISTS goals_fts USING fts5(
+    title,
+    tokenize='trigram',
+    content='goals',
+    content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS goals_fts_ai AFTER INSERT ON goals BEGIN
+    INSERT INTO goals_fts(rowid, title) VALUES (new.rowid, new.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS goals_fts_ad AFTER DELETE ON goals BEGIN
+    INSERT INTO goals_fts(goals_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS goals_fts_au AFTER UPDATE OF title ON goals BEGIN
+    INSERT INTO goals_fts(goals_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    INSERT INTO goals_fts(rowid, title) VALUES (new.rowid, new.title);
+END;
+
 CREATE TABLE IF NOT EXISTS goal_schedule_links (
     goal_id     TEXT NOT NULL,
     event_id    TEXT NOT NULL,
@@ -267,6 +470,60 @@ CREATE TABLE IF NOT EXISTS goal_schedule_links (
     PRIMARY KEY (goal_id, event_id)
 );
 
+-- Monotonic calendar change counter (meta.schedule_revision), the schedule
+-- counterpart of posts_revision: schedule_service's in-process day/account
+-- caches key on it, covering every table that feeds a listed event (rows,
+-- accounts, goal links and linked goal titles).
+CREATE TRIGGER IF NOT EXISTS schedule_revision_schedule_events_ai AFTER INSERT ON schedule_events BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_schedule_events_ad AFTER DELETE ON schedule_events BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_schedule_events_au AFTER UPDATE ON schedule_events BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_calendar_accounts_ai AFTER INSERT ON calendar_accounts BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_calendar_accounts_ad AFTER DELETE ON calendar_accounts BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_calendar_accounts_au AFTER UPDATE ON calendar_accounts BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_goal_schedule_links_ai AFTER INSERT ON goal_schedule_links BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_goal_schedule_links_ad AFTER DELETE ON goal_schedule_links BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_goals_ad AFTER DELETE ON goals BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS schedule_revision_goals_au AFTER UPDATE OF title ON goals BEGIN
+    INSERT INTO meta(key, value) VALUES ('schedule_revision', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+END;
+
 CREATE TABLE IF NOT EXISTS goal_schedule_assessments (
     event_id     TEXT PRIMARY KEY,
     assessed_at  REAL NOT NULL
@@ -455,6 +712,41 @@ CREATE INDEX IF NOT EXISTS idx_memory_events_boundary_id
 CREATE INDEX IF NOT EXISTS idx_memory_events_source
     ON memory_ingest_events(source_type, source_id, source_revision);
 
+-- Latest revision per source, maintained by the insert trigger in the same
+-- transaction as the ledger append. append_event derives the next revision
+-- from it, and current-state reads join it instead of re-ranking every source
+-- with a correlated MAX(source_revision) subquery.
+CREATE TABLE IF NOT EXISTS memory_source_heads (
+    source_type      TEXT NOT NULL,
+    source_id        TEXT NOT NULL,
+    event_id         INTEGER NOT NULL,
+    source_revision  INTEGER NOT NULL,
+    op               TEXT NOT NULL,
+    owner_scope      TEXT NOT NULL,
+    visibility_scope TEXT NOT NULL,
+    PRIMARY KEY(source_type, source_id)
+);
+CREATE INDEX IF NOT EXISTS idx_memory_source_heads_boundary
+    ON memory_source_heads(owner_scope, visibility_scope, event_id);
+
+CREATE TRIGGER IF NOT EXISTS memory_source_heads_ai AFTER INSERT ON memory_ingest_events BEGIN
+    INSERT INTO memory_source_heads(
+        source_type, source_id, event_id, source_revision, op, owner_scope, visibility_scope
+    ) VALUES (
+        NEW.source_type, NEW.source_id, NEW.id, NEW.source_revision, NEW.op,
+        NEW.owner_scope, NEW.visibility_scope
+    )
+    ON CONFLICT(source_type, source_id) DO UPDATE SET
+        event_id = excluded.event_id,
+        source_revision = excluded.source_revision,
+        op = excluded.op,
+        owner_scope = excluded.owner_scope,
+        visibility_scope = excluded.visibility_scope
+    WHERE excluded.source_revision > memory_source_heads.source_revision
+       OR (excluded.source_revision = memory_source_heads.source_revision
+           AND excluded.event_id > memory_source_heads.event_id);
+END;
+
 CREATE TABLE IF NOT EXISTS memory_reconcile_cursors (
     owner_scope      TEXT NOT NULL,
     visibility_scope TEXT NOT NULL,
@@ -678,3 +970,16 @@ CREATE TABLE IF NOT EXISTS memory_view_units (
     order_index INTEGER NOT NULL,
     PRIMARY KEY (view_id, unit_id)
 );
+
+-- Incremental synthesis cache: one synthesized section per unit type, keyed by
+-- the hash of that type's member set. Only sections the synthesizer produced
+-- are kept; template sections are cheap to re-render.
+CREATE TABLE IF NOT EXISTS memory_view_sections (
+    view_id      TEXT NOT NULL REFERENCES memory_views(id) ON DELETE CASCADE,
+    unit_type    TEXT NOT NULL,
+    member_hash  TEXT NOT NULL,
+    section_budget INTEGER,
+    content_md   TEXT NOT NULL,
+    generated_at REAL NOT NULL,
+    PRIMARY KEY (view_id, unit_type)
+);
@@ -25,6 +25,7 @@ from openai import OpenAI
 from core import db, goal_activity_service, goal_service, logging_service
 from core.cli.config import load_config
 from core.llm import secondary_model, suggestion_router
+from core.llm.common import CHAT_CLIENT_MAX_RETRIES
 from core.system_timezone import SYSTEM_TIMEZONE
 
 BACKFILL_CONFIDENCE_THRESHOLD = 0.8
@@ -298,6 +299,7 @@ def main(argv: list[str] | None = None) -> None:
     client = OpenAI(
         api_key=config["api_key"],
         base_url=config.get("base_url", "https://api.openai.com/v1"),
+        max_retries=CHAT_CLIENT_MAX_RETRIES,
     )
     secondary_model.install_from_config(
         config,
@@ -305,6 +307,7 @@ def main(argv: list[str] | None = None) -> None:
         client_factory=lambda api_key, base_url: OpenAI(
             api_key=api_key,
             base_url=base_url,
+            max_retries=CHAT_CLIENT_MAX_RETRIES,
         ),
     )
     result = run_backfill(client, config["model"], apply=args.apply)
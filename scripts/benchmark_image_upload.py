@@ -0,0 +1,126 @@
+"""Measure attachment upload latency (decode + normalize + store) on large images.
+
+Runs ``attachment_service.upload_image`` against a throwaway workspace and
+prints p50/p95 per fixture. Fixtures come from ``--fixtures DIR`` (every
+.jpg/.jpeg/.png in it) or, by default, a synthetic set of phone-photo-sized
+JPEGs and screenshot-like PNGs that exercise the downscale and quality search.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+# 直接运行 `python scripts/benchmark_image_upload.py` 时项目根目录不在 sys.path。
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import attachment_service, db
+
+FIXTURE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+
+def synthetic_fixtures() -> list[tuple[str, bytes, str]]:
+    from PIL import Image
+
+    def photo(size: tuple[int, int]) -> Image.Image:
+        # Smooth gradient plus sensor-like noise: compresses like a real photo,
+        # unlike pure noise (incompressible) or a flat fill (trivial).
+        width, height = size
+        gradient = Image.linear_gradient("L").resize(size)
+        noise = Image.frombytes("L", size, os.urandom(width * height)).point(lambda v: v // 6)
+        red = Image.blend(gradient, noise, 0.35)
+        green = Image.blend(gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), noise, 0.35)
+        blue = Image.blend(gradient.transpose(Image.Transpose.ROTATE_180), noise, 0.35)
+        return Image.merge("RGB", (red, green, blue))
+
+    def encode(image: Image.Image, image_format: str, **params) -> bytes:
+        output = io.BytesIO()
+        image.save(output, format=image_format, **params)
+        return output.getvalue()
+
+    fixtures = [
+        ("photo_4032x3024.jpg", encode(photo((4032, 3024)), "JPEG", quality=95), "image/jpeg"),
+        ("photo_8000x6000.jpg", encode(photo((8000, 6000)), "JPEG", quality=95), "image/jpeg"),
+        ("screenshot_2880x1800.png", encode(photo((2880, 1800)), "PNG"), "image/png"),
+    ]
+    transparent = photo((2400, 2400)).convert("RGBA")
+    transparent.putalpha(Image.linear_gradient("L").resize((2400, 2400)))
+    fixtures.append(("sticker_2400x2400.png", encode(transparent, "PNG"), "image/png"))
+    return fixtures
+
+
+def directory_fixtures(directory: Path) -> list[tuple[str, bytes, str]]:
+    fixtures = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix.lower() not in FIXTURE_SUFFIXES:
+            continue
+        mime_type = "image/png" if path.suffix.lower() == ".png" else "image/jpeg"
+        fixtures.append((path.name, path.read_bytes(), mime_type))
+    if not fixtures:
+        raise ValueError(f"没有找到 JPEG/PNG 图片：{directory}")
+    return fixtures
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(fixtures: list[tuple[str, bytes, str]], *, repeat: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        old_workspace, old_db_path = db.WORKSPACE_DIR, db.DB_PATH
+        db.WORKSPACE_DIR = Path(tmp) / "workspace"
+        db.DB_PATH = db.WORKSPACE_DIR / "state.db"
+        try:
+            db.init_db()
+            for name, content, mime_type in fixtures:
+                samples = []
+                stored = None
+                for index in range(repeat):
+                    # A distinct trailing byte defeats the raw-hash dedupe so
+                    # every round pays the full normalize path.
+                    payload = content + index.to_bytes(4, "big")
+                    started = time.perf_counter()
+                    stored = attachment_service.upload_image(payload, content_type=mime_type, filename=name)
+                    samples.append((time.perf_counter() - started) * 1000)
+                results.append(
+                    {
+                        "fixture": name,
+                        "input_bytes": len(content),
+                        "stored": f"{stored.width}x{stored.height} {stored.mime_type} {stored.file_size}B",
+                        "p50_ms": percentile(samples, 0.5),
+                        "p95_ms": percentile(samples, 0.95),
+                        "mean_ms": statistics.fmean(samples),
+                    }
+                )
+        finally:
+            db.WORKSPACE_DIR, db.DB_PATH = old_workspace, old_db_path
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="attachment upload latency benchmark")
+    parser.add_argument("--fixtures", type=Path, help="directory of JPEG/PNG images (default: synthetic set)")
+    parser.add_argument("--repeat", type=int, default=5, help="uploads per fixture")
+    args = parser.parse_args(argv)
+
+    fixtures = directory_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures()
+    for row in run(fixtures, repeat=max(1, args.repeat)):
+        print(
+            f"{row['fixture']:<28} in={row['input_bytes'] / 1024 / 1024:6.1f}MB "
+            f"p50={row['p50_ms']:8.1f}ms p95={row['p95_ms']:8.1f}ms  -> {row['stored']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
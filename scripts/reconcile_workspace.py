@@ -14,6 +14,7 @@ from core import (
     vector_index_service,
 )
 from core.cli.config import load_config
+from core.llm.common import CHAT_CLIENT_MAX_RETRIES
 
 
 def main() -> None:
@@ -28,6 +29,7 @@ def main() -> None:
     client = OpenAI(
         api_key=config["api_key"],
         base_url=config.get("base_url", "https://api.openai.com/v1"),
+        max_retries=CHAT_CLIENT_MAX_RETRIES,
     )
     dry_run = not args.commit
     result = memory_reconcile_runner.run_pending_reconcile(
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from types import SimpleNamespace
 from typing import TypeVar
@@ -62,3 +63,42 @@ class FakeStreamingClient:
             emitted += 1
             if self.raise_after is not None and emitted >= self.raise_after:
                 raise RuntimeError("stream broke")
+
+
+class FakeAsyncStreamingClient:
+    """Awaitable counterpart of ``FakeStreamingClient`` (``AsyncOpenAI``-style).
+
+    With ``hang_after`` set, the stream stalls after that many deltas until it
+    is cancelled, like a long generation whose reader went away. ``closed``
+    counts how many streams were closed."""
+
+    def __init__(self, deltas: list[str] | None = None, *, hang_after: int | None = None) -> None:
+        self.deltas = ["你好", "，", "在的"] if deltas is None else deltas
+        self.hang_after = hang_after
+        self.calls: list[dict] = []
+        self.closed = 0
+        self.stalled = asyncio.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return _FakeAsyncStream(self)
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeAsyncStream:
+    def __init__(self, owner: FakeAsyncStreamingClient) -> None:
+        self.owner = owner
+
+    async def __aiter__(self):
+        yield SimpleNamespace(choices=[])
+        for emitted, delta in enumerate(self.owner.deltas):
+            if self.owner.hang_after is not None and emitted >= self.owner.hang_after:
+                self.owner.stalled.set()
+                await asyncio.Event().wait()
+            yield stream_delta_chunk(delta)
+
+    async def close(self) -> None:
+        self.owner.closed += 1
@@ -10,7 +10,7 @@ from types import SimpleNamespace
 from unittest.mock import patch
 
 from core import suggestion_pipeline
-from tests.helpers import FakeStreamingClient
+from tests.helpers import FakeAsyncStreamingClient, FakeStreamingClient
 
 
 @unittest.skipUnless(importlib.util.find_spec("fastapi"), "FastAPI is not installed")
@@ -49,7 +49,7 @@ class ApiChatStreamTest(unittest.TestCase):
                 db.DB_PATH = old_db_path
                 soul_service.SOULS_DIR = old_souls_dir
 
-    def _client(self, fake_client):
+    def _client(self, fake_client, async_client=None):
         from fastapi.testclient import TestClient
         from api import deps
         from api.app import create_app
@@ -61,6 +61,7 @@ class ApiChatStreamTest(unittest.TestCase):
                 model="test-model",
                 vectorstore_initialized=False,
                 worker=SimpleNamespace(),
+                async_client=async_client,
             )
             return deps._runtime
 
@@ -96,6 +97,21 @@ class ApiChatStreamTest(unittest.TestCase):
         self.assertLess(body.index("event: delta"), body.index("event: done"))
         self.assertTrue(body.rstrip().endswith("\n\n") or body.endswith("\n\n"))
 
+    def test_stream_endpoint_reads_tokens_from_the_async_client(self) -> None:
+        with self._temp_db():
+            stub = FakeStreamingClient([])
+            async_stub = FakeAsyncStreamingClient(["你好", "呀"])
+            with self._client(stub, async_stub) as client:
+                with client.stream(
+                    "POST", "/chat/拾迹者/messages/stream", json={"content": "在吗"}
+                ) as response:
+                    body = "".join(response.iter_text())
+
+        self.assertIn('"text": "你好"', body)
+        self.assertIn('"reply": "你好呀"', body)
+        self.assertEqual(1, len(async_stub.calls))
+        self.assertEqual([], stub.stream_calls)
+
     def test_non_stream_fallback_reuses_completed_stream_request(self) -> None:
         with self._temp_db():
             stub = FakeStreamingClient(["你好", "呀"])
@@ -261,6 +261,41 @@ class ApiManagementTest(unittest.TestCase):
         self.assertEqual("image/jpeg", upload_response.json()["mime_type"])
         self.assertLessEqual(upload_response.json()["file_size"], 5 * 1024 * 1024)
 
+    def test_upload_attachment_refuses_oversized_body_by_content_length(self) -> None:
+        with self._client() as client:
+            response = client.post(
+                "/attachments/upload",
+                content=b"x" * 16,
+                headers={
+                    "content-type": "multipart/form-data; boundary=x",
+                    "content-length": str(60 * 1024 * 1024),
+                },
+            )
+
+        self.assertEqual(413, response.status_code)
+        self.assertEqual("图片不能超过 50MB", response.json()["detail"])
+
+    def test_attachment_thumbnail_is_served_with_immutable_etag(self) -> None:
+        with self._client() as client:
+            upload = client.post(
+                "/attachments/upload",
+                files={"file": ("wide.jpg", _noisy_image_bytes("JPEG", (900, 600)), "image/jpeg")},
+            ).json()
+            thumbnail = client.get(upload["thumbnails"]["320"])
+            revalidated = client.get(
+                upload["thumbnails"]["320"], headers={"If-None-Match": thumbnail.headers["etag"]}
+            )
+            original = client.get(upload["url"])
+
+        self.assertEqual(200, thumbnail.status_code)
+        self.assertEqual("image/webp", thumbnail.headers["content-type"])
+        self.assertIn("immutable", thumbnail.headers["cache-control"])
+        self.assertEqual(f'"{upload["sha256"]}-w320"', thumbnail.headers["etag"])
+        self.assertEqual(304, revalidated.status_code)
+        self.assertEqual(b"", revalidated.content)
+        self.assertEqual(f'"{upload["sha256"]}"', original.headers["etag"])
+        self.assertLess(len(thumbnail.content), len(original.content))
+
     def test_generate_soul_route_returns_markdown(self) -> None:
         generated = {
             "soul": "---\nname: 测试好友\nversion: 1\ndescription: 测试\n---\n\n测试好友说话简短直接。\n\n## 语气特征\n测试\n\n## 怎么回应\n测试\n\n## 边界\n测试",
@@ -362,7 +397,17 @@ class ApiManagementTest(unittest.TestCase):
             },
             saved["logging"],
         )
-        self.assertEqual({"enabled": True, "model": "vision-model", "api_key": None, "base_url": None}, saved["vision"])
+        self.assertEqual(
+            {
+                "enabled": True,
+                "model": "vision-model",
+                "api_key": None,
+                "base_url": None,
+                "image_max_side": 2048,
+                "image_max_short_side": 768,
+            },
+            saved["vision"],
+        )
         self.assertEqual(
             {
                 "enabled": True,
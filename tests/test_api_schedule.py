@@ -32,7 +32,7 @@ class MigrationAuth:
 
 
 class MigrationGraph:
-    def calendarview_delta(self, **kwargs):
+    def iter_calendarview_delta(self, **kwargs):
         del kwargs
         raise RuntimeError("best-effort sync unavailable")
 
@@ -570,6 +570,18 @@ class ScheduleSyncLifecycleTest(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(task.done())
         self.assertIsNone(deps._schedule_sync_task)  # type: ignore[attr-defined]
 
+    async def test_shutdown_closes_shared_graph_http_client(self) -> None:
+        from api import deps
+        from core.graph import client as graph_client
+
+        deps._runtime = None  # type: ignore[attr-defined]
+        http = graph_client.shared_http_client()
+        await deps.shutdown_runtime()
+
+        self.assertTrue(http.is_closed)
+        self.assertIsNot(http, graph_client.shared_http_client())
+        graph_client.close_shared_http_client()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import io
 import os
+import pickle
 import tempfile
 import unittest
 from pathlib import Path
@@ -27,6 +28,7 @@ class AttachmentServiceTest(unittest.TestCase):
 
         db.init_db()
         soul_service.sync_souls()
+        attachment_service.clear_image_input_cache()
 
     def tearDown(self) -> None:
         db.WORKSPACE_DIR = self.old_workspace
@@ -168,9 +170,9 @@ class AttachmentServiceTest(unittest.TestCase):
         self.assertIsNotNone(attachment_service.get_attachment(attachment.id).linked_at)
 
     def test_cleanup_orphan_attachments_removes_only_expired_unlinked_files(self) -> None:
-        old_orphan = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
-        fresh_orphan = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
-        linked = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+        old_orphan = attachment_service.upload_image(_image_bytes("PNG", color=(1, 2, 3)), content_type="image/png")
+        fresh_orphan = attachment_service.upload_image(_image_bytes("PNG", color=(4, 5, 6)), content_type="image/png")
+        linked = attachment_service.upload_image(_image_bytes("PNG", color=(7, 8, 9)), content_type="image/png")
         post_id = record_service.save_post("带图帖子", index_immediately=False)
         attachment_service.attach_to_post(post_id, [linked.id])
 
@@ -189,6 +191,18 @@ class AttachmentServiceTest(unittest.TestCase):
         self.assertTrue((self.workspace / linked.file_path).exists())
         self.assertIsNotNone(attachment_service.get_attachment(linked.id))
 
+    def test_cleanup_orphan_attachments_sweeps_stale_upload_spools(self) -> None:
+        abandoned = attachment_service.UploadSpool()
+        abandoned.write(b"partial body")
+        abandoned.finish()
+        old = db.now_ts() - 25 * 3600
+        os.utime(abandoned.path, (old, old))
+        with attachment_service.UploadSpool() as in_flight:
+            attachment_service.cleanup_orphan_attachments(max_age_seconds=24 * 3600)
+
+            self.assertFalse(abandoned.path.exists())
+            self.assertTrue(in_flight.path.exists())
+
     def test_cleanup_orphan_attachments_deletes_db_row_even_if_file_is_missing(self) -> None:
         orphan = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
         (self.workspace / orphan.file_path).unlink()
@@ -199,9 +213,220 @@ class AttachmentServiceTest(unittest.TestCase):
         self.assertEqual(1, removed)
         self.assertIsNone(db.query_one("SELECT 1 FROM attachments WHERE id = ?", (orphan.id,)))
 
+    def test_reupload_of_same_file_shares_blob_without_decoding(self) -> None:
+        first = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+
+        with patch.object(attachment_service, "_open_image", side_effect=AssertionError("decoded")):
+            second = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png", filename="again.png")
+
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual(first.file_path, second.file_path)
+        self.assertEqual(first.sha256, second.sha256)
+        self.assertEqual("again.png", second.original_filename)
+
+    def test_reupload_racing_orphan_cleanup_encodes_the_file_again(self) -> None:
+        orphan = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+        find_stored_blob = attachment_service._find_stored_blob
+
+        def find_then_sweep(column, digest):
+            blob = find_stored_blob(column, digest)
+            if column == "source_sha256":
+                db.execute("UPDATE attachments SET created_at = ?", (db.now_ts() - 25 * 3600,))
+                attachment_service.cleanup_orphan_attachments(max_age_seconds=24 * 3600)
+            return blob
+
+        with patch.object(attachment_service, "_find_stored_blob", side_effect=find_then_sweep):
+            second = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+
+        self.assertIsNone(db.query_one("SELECT 1 FROM attachments WHERE id = ?", (orphan.id,)))
+        self.assertEqual(orphan.file_path, second.file_path)
+        self.assertTrue((self.workspace / second.file_path).exists())
+
+    def test_same_normalized_content_from_different_files_shares_blob(self) -> None:
+        first = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+        with_metadata = Image.new("RGB", (12, 8), color=(120, 80, 40))
+        output = io.BytesIO()
+        with_metadata.save(output, format="PNG", dpi=(300, 300))
+
+        second = attachment_service.upload_image(output.getvalue(), content_type="image/png")
+
+        self.assertEqual(first.file_path, second.file_path)
+        self.assertEqual(1, len(list((self.workspace / "attachments" / "blobs").rglob("*.png"))))
+
+    def test_cleanup_keeps_blob_until_last_reference_is_removed(self) -> None:
+        orphan = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+        linked = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+        post_id = record_service.save_post("带图帖子", index_immediately=False)
+        attachment_service.attach_to_post(post_id, [linked.id])
+        db.execute("UPDATE attachments SET created_at = ?", (db.now_ts() - 25 * 3600,))
+
+        removed = attachment_service.cleanup_orphan_attachments(max_age_seconds=24 * 3600)
+
+        self.assertEqual(1, removed)
+        self.assertIsNone(db.query_one("SELECT 1 FROM attachments WHERE id = ?", (orphan.id,)))
+        self.assertTrue((self.workspace / linked.file_path).exists())
+
+        db.execute("DELETE FROM post_attachments")
+        db.execute("UPDATE attachments SET linked_at = NULL")
+        attachment_service.cleanup_orphan_attachments(max_age_seconds=24 * 3600)
+
+        self.assertFalse((self.workspace / linked.file_path).exists())
+
+    def test_derivative_is_generated_once_and_exposed_on_attachment(self) -> None:
+        attachment = attachment_service.upload_image(
+            _solid_image_bytes("JPEG", (1000, 500)), content_type="image/jpeg"
+        )
+
+        self.assertEqual({"320", "640"}, set(attachment.thumbnails))
+        path, mime_type, width = attachment_service.derivative_path(attachment.id, 300)
+        mtime = path.stat().st_mtime_ns
+        again, _, _ = attachment_service.derivative_path(attachment.id, 320)
+
+        self.assertEqual(320, width)
+        self.assertEqual("image/webp", mime_type)
+        self.assertEqual(path, again)
+        self.assertEqual(mtime, again.stat().st_mtime_ns)
+        with Image.open(path) as image:
+            self.assertEqual((320, 160), image.size)
+
+    def test_derivative_request_wider_than_thumbnails_serves_original(self) -> None:
+        attachment = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+
+        path, mime_type, width = attachment_service.derivative_path(attachment.id, 320)
+
+        self.assertEqual({}, attachment.thumbnails)
+        self.assertIsNone(width)
+        self.assertEqual("image/png", mime_type)
+        self.assertEqual(attachment_service.attachment_path(attachment.id), path)
+
+    def test_cleanup_removes_derivatives_with_last_blob_reference(self) -> None:
+        orphan = attachment_service.upload_image(_solid_image_bytes("JPEG", (800, 600)), content_type="image/jpeg")
+        path, _, _ = attachment_service.derivative_path(orphan.id, 320)
+        db.execute("UPDATE attachments SET created_at = ?", (db.now_ts() - 25 * 3600,))
+
+        attachment_service.cleanup_orphan_attachments(max_age_seconds=24 * 3600)
+
+        self.assertFalse(path.exists())
+
+    def test_jpeg_planner_searches_with_unoptimized_trials(self) -> None:
+        with Image.open(io.BytesIO(_noisy_image_bytes("JPEG", "RGB", (2400, 1800)))) as source:
+            image = source.convert("RGB")
+        calls: list[bool] = []
+        real_encode = attachment_service._encode_jpeg
+
+        def counting_encode(candidate, quality, *, optimize=True):
+            calls.append(optimize)
+            return real_encode(candidate, quality, optimize=optimize)
+
+        limit = 400 * 1024
+        with patch.object(attachment_service, "_encode_jpeg", side_effect=counting_encode):
+            encoded, image_format, width, height = attachment_service._encode_jpeg_to_limit(image, limit)
+
+        self.assertEqual("JPEG", image_format)
+        self.assertLessEqual(len(encoded), limit)
+        self.assertLess(width, 2400)
+        # the direct top-quality attempt and the final encode; the search itself
+        # runs on cheap unoptimized trials
+        self.assertEqual([True, True], [optimize for optimize in calls if optimize])
+        self.assertLessEqual(len(calls), 12)
+
+    def test_large_upload_is_encoded_in_the_worker_process_pool(self) -> None:
+        content = _noisy_image_bytes("JPEG", "RGB", (2400, 1800))
+        self.assertGreaterEqual(len(content), attachment_service.PROCESS_POOL_MIN_BYTES)
+
+        executor = attachment_service._encode_executor()
+        self.assertIsNotNone(executor)
+        with patch.object(executor, "submit", wraps=executor.submit) as submit, patch.object(
+            attachment_service, "_reset_encode_executor", wraps=attachment_service._reset_encode_executor
+        ) as reset:
+            attachment = attachment_service.upload_image(content, content_type="image/jpeg")
+
+        submit.assert_called_once()
+        reset.assert_not_called()
+        self.assertEqual("image/jpeg", attachment.mime_type)
+        self.assertLessEqual(attachment.file_size, attachment_service.MAX_STORED_IMAGE_BYTES)
+
+    def test_unsupported_format_error_survives_the_encode_worker_boundary(self) -> None:
+        error = pickle.loads(pickle.dumps(attachment_service.UnsupportedImageFormatError("GIF")))
+
+        self.assertEqual("GIF", error.image_format)
+        self.assertEqual("仅支持 JPEG 或 PNG 图片", str(error))
+
+    def test_spooled_upload_matches_in_memory_upload(self) -> None:
+        content = _image_bytes("JPEG")
+        with attachment_service.UploadSpool() as spool:
+            for offset in range(0, len(content), 100):
+                spool.write(content[offset:offset + 100])
+            attachment = attachment_service.upload_spooled_image(spool, content_type="image/jpeg", filename="a.jpg")
+            spool_path = spool.path
+
+        self.assertFalse(spool_path.exists())
+        self.assertEqual((12, 8), (attachment.width, attachment.height))
+        again = attachment_service.upload_image(content, content_type="image/jpeg")
+        self.assertEqual(attachment.file_path, again.file_path)
+
+    def test_spool_stops_at_upload_limit(self) -> None:
+        with patch.object(attachment_service, "MAX_UPLOAD_IMAGE_BYTES", 10):
+            with attachment_service.UploadSpool() as spool:
+                spool.write(b"12345")
+                with self.assertRaisesRegex(ValueError, "图片不能超过 50MB"):
+                    spool.write(b"123456")
+
+    def test_large_jpeg_is_decoded_at_reduced_scale(self) -> None:
+        image, image_format = attachment_service._open_image(_solid_image_bytes("JPEG", (9000, 6000)))
+
+        self.assertEqual("JPEG", image_format)
+        self.assertGreaterEqual(max(image.size), attachment_service.MAX_COMPRESSED_IMAGE_SIDE)
+        self.assertLess(max(image.size), 9000)
+
+    def test_oversized_dimensions_are_rejected_before_decoding(self) -> None:
+        with patch.object(attachment_service, "MAX_IMAGE_SIDE", 10):
+            with self.assertRaisesRegex(ValueError, "图片像素尺寸过大"):
+                attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+
+    def test_image_input_is_encoded_once_per_content(self) -> None:
+        first = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+        second = attachment_service.upload_image(_image_bytes("PNG"), content_type="image/png")
+        stats = attachment_service.ImageInputStats()
+
+        with patch.object(attachment_service.base64, "b64encode", wraps=attachment_service.base64.b64encode) as encode:
+            inputs = attachment_service.image_inputs_for_attachments([first, second, first], stats=stats)
+
+        self.assertEqual(1, encode.call_count)
+        self.assertEqual({"hits": 2, "misses": 1, "bytes_saved": 0}, stats.as_dict())
+        self.assertEqual([first.id, second.id, first.id], [item.attachment_id for item in inputs])
+        self.assertTrue(inputs[0].data_url.startswith("data:image/png;base64,"))
+
+    def test_large_image_input_is_sent_at_model_resolution(self) -> None:
+        attachment = attachment_service.upload_image(
+            _noisy_image_bytes("JPEG", "RGB", (2400, 1600)), content_type="image/jpeg"
+        )
+        stats = attachment_service.ImageInputStats()
+
+        item = attachment_service.image_input_for_attachment(attachment, stats=stats)
+
+        self.assertEqual("image/jpeg", item.mime_type)
+        self.assertNotEqual(attachment_service.attachment_path(attachment.id), item.file_path)
+        with Image.open(item.file_path) as image:
+            self.assertEqual((1152, 768), image.size)
+        self.assertGreater(stats.bytes_saved, 0)
+        self.assertEqual((2400, 1600), (item.width, item.height))
+
+
+    def test_image_input_size_bounds_are_configurable(self) -> None:
+        attachment = attachment_service.upload_image(
+            _noisy_image_bytes("JPEG", "RGB", (2400, 1600)), content_type="image/jpeg"
+        )
+
+        wider = attachment_service.image_input_for_attachment(attachment, max_side=1200, max_short_side=0)
+        original = attachment_service.image_input_for_attachment(attachment, max_side=0, max_short_side=0)
+
+        with Image.open(wider.file_path) as image:
+            self.assertEqual((1200, 800), image.size)
+        self.assertEqual(attachment_service.attachment_path(attachment.id), original.file_path)
 
-def _image_bytes(image_format: str) -> bytes:
-    image = Image.new("RGB", (12, 8), color=(120, 80, 40))
+def _image_bytes(image_format: str, color: tuple[int, int, int] = (120, 80, 40)) -> bytes:
+    image = Image.new("RGB", (12, 8), color=color)
     output = io.BytesIO()
     image.save(output, format=image_format)
     return output.getvalue()
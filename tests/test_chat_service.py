@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import tempfile
@@ -9,10 +10,10 @@ from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import patch
 
-from core import chat_service, db, logging_service, memory_read, memory_unit_service, memory_view_service, query_rewriter, reply_context, schedule_context, soul_relationship_memory, soul_service, suggestion_pipeline, turn_prep, web_search_gate, web_search_service
-from core.llm import reply_router
+from core import chat_service, db, logging_service, memory_read, memory_unit_service, memory_view_service, query_rewriter, reply_context, schedule_context, soul_relationship_memory, soul_service, suggestion_pipeline, suggestion_service, turn_prep, web_search_gate, web_search_service
+from core.llm import reply_router, scheduler
 from core.soul_service import SoulContext
-from tests.helpers import FakeStreamingClient, require_not_none
+from tests.helpers import FakeAsyncStreamingClient, FakeStreamingClient, require_not_none
 
 
 class FakeClient:
@@ -171,6 +172,27 @@ class ChatServiceTest(unittest.TestCase):
         self.assertEqual("今天有点累", message.content)
         self.assertIsNotNone(refreshed.last_message_at)
 
+    def test_thread_history_resolves_suggestion_snapshots_in_one_lookup(self) -> None:
+        thread = chat_service.get_or_create_thread("拾迹者")
+        live = suggestion_service.create_suggestion("goal", {"title": "每天跑步", "horizon": "short"}, "chat:1")
+        decided = suggestion_service.create_suggestion("goal", {"title": "背单词", "horizon": "long"}, "chat:2")
+        assert live is not None and decided is not None
+        suggestion_service.dismiss(decided["id"])
+        for index in range(5):
+            chat_service.append_unprompted_assistant_message(
+                thread.id, f"第{index}条", metadata={"suggestions": [live, decided]}
+            )
+
+        with patch.object(
+            suggestion_service, "_pending_suggestion_ids", wraps=suggestion_service._pending_suggestion_ids
+        ) as lookup:
+            messages = chat_service.list_thread_messages(thread.id)
+
+        self.assertEqual(1, lookup.call_count)
+        self.assertEqual(5, len(messages))
+        for message in messages:
+            self.assertEqual([live["id"]], [item["id"] for item in json.loads(message.metadata)["suggestions"]])
+
     def test_list_chat_threads_orders_by_recent_activity(self) -> None:
         first = chat_service.get_or_create_thread("拾迹者")
         soul_service.create_soul("测试好友", description="测试描述")
@@ -526,6 +548,75 @@ class ChatServiceTest(unittest.TestCase):
             0,
         )
 
+    def test_astream_chat_reply_relays_same_events_on_the_event_loop(self) -> None:
+        thread = chat_service.get_or_create_thread("拾迹者")
+        client = FakeStreamingClient(["先", "睡"])
+
+        async def collect() -> list[dict]:
+            return [event async for event in chat_service.astream_chat_reply(thread.id, "我好累", client, "fake-model")]
+
+        events = asyncio.run(collect())
+
+        self.assertEqual(["delta", "delta", "done"], [event["type"] for event in events])
+        self.assertEqual("先睡", events[-1]["result"]["reply"])
+        self.assertEqual("先睡", chat_service.list_thread_messages(thread.id)[-1].content)
+
+    def test_astream_chat_reply_streams_from_async_client_on_the_event_loop(self) -> None:
+        thread = chat_service.get_or_create_thread("拾迹者")
+        client = FakeStreamingClient([])
+        async_client = FakeAsyncStreamingClient(["先", "睡"])
+
+        async def collect() -> list[dict]:
+            return [
+                event
+                async for event in chat_service.astream_chat_reply(
+                    thread.id, "我好累", client, "fake-model", async_client=async_client
+                )
+            ]
+
+        events = asyncio.run(collect())
+
+        self.assertEqual(["delta", "delta", "done"], [event["type"] for event in events])
+        self.assertEqual("先睡", events[-1]["result"]["reply"])
+        self.assertEqual("先睡", chat_service.list_thread_messages(thread.id)[-1].content)
+        self.assertEqual(1, len(async_client.calls))
+        self.assertEqual([], client.stream_calls)
+        self.assertEqual(1, async_client.closed)
+
+    def test_cancelled_astream_chat_reply_stops_generation_and_frees_the_turn(self) -> None:
+        thread = chat_service.get_or_create_thread("拾迹者")
+        async_client = FakeAsyncStreamingClient(["先", "睡", "一下"], hang_after=1)
+        received: list[dict] = []
+
+        async def consume() -> None:
+            async for event in chat_service.astream_chat_reply(
+                thread.id, "我好累", FakeStreamingClient([]), "fake-model", async_client=async_client
+            ):
+                received.append(event)
+
+        async def disconnect_mid_stream() -> None:
+            consumer = asyncio.ensure_future(consume())
+            await asyncio.wait_for(async_client.stalled.wait(), timeout=5)
+            consumer.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await consumer
+
+        # asyncio.run also waits for the cancelled stream task and the executor
+        # job that records the abandoned turn.
+        asyncio.run(disconnect_mid_stream())
+
+        self.assertEqual([{"type": "delta", "text": "先"}], received)
+        self.assertEqual(1, async_client.closed)
+        self.assertEqual(0, scheduler.get().stats()["in_flight"])
+        messages = chat_service.list_thread_messages(thread.id)
+        self.assertEqual(["user", "assistant"], [message.role for message in messages])
+        metadata = json.loads(require_not_none(messages[-1].metadata))
+        self.assertEqual("failed", metadata["status"])
+        self.assertEqual(chat_service.STREAM_CANCELLED_ERROR, metadata["error"])
+        lock = chat_service._thread_turn_lock(thread.id)
+        self.assertTrue(lock.acquire(blocking=False))
+        lock.release()
+
     def test_same_thread_turns_with_distinct_request_ids_do_not_interleave(self) -> None:
         thread = chat_service.get_or_create_thread("拾迹者")
         first_reply_entered = threading.Event()
@@ -62,8 +62,17 @@ class CliConfigTest(unittest.TestCase):
         self.assertEqual(1024 * 1024, loaded["logging"]["rotate_max_bytes"])
         self.assertEqual(1024 * 1024 * 1024, loaded["logging"]["history_max_bytes"])
         self.assertEqual(365, loaded["logging"]["history_max_days"])
+        self.assertEqual(6, loaded["llm_max_concurrency"])
+        self.assertEqual(0, loaded["llm_tokens_per_minute"])
         self.assertEqual(
-            {"enabled": False, "model": None, "api_key": None, "base_url": None},
+            {
+                "enabled": False,
+                "model": None,
+                "api_key": None,
+                "base_url": None,
+                "image_max_side": 2048,
+                "image_max_short_side": 768,
+            },
             loaded["vision"],
         )
         self.assertEqual(
@@ -153,6 +162,27 @@ class CliConfigTest(unittest.TestCase):
         self.assertEqual(0, normalized["cache_ttl_s"])
         self.assertNotIn("include_sources", normalized)
 
+    def test_normalize_vision_config_clamps_image_size_bounds(self) -> None:
+        normalized = cli_config.normalize_vision_config(
+            {"enabled": True, "model": "vl", "image_max_side": 99999, "image_max_short_side": "0"}
+        )
+        invalid = cli_config.normalize_vision_config({"image_max_side": "big", "image_max_short_side": -1})
+
+        self.assertEqual((8192, 0), (normalized["image_max_side"], normalized["image_max_short_side"]))
+        self.assertEqual((2048, 0), (invalid["image_max_side"], invalid["image_max_short_side"]))
+
+    def test_normalize_llm_scheduler_settings_clamps_values(self) -> None:
+        self.assertEqual(
+            {"llm_max_concurrency": 32, "llm_tokens_per_minute": 0},
+            cli_config.normalize_llm_scheduler_settings(
+                {"llm_max_concurrency": 99, "llm_tokens_per_minute": "bad"}
+            ),
+        )
+        self.assertEqual(
+            cli_config.DEFAULT_LLM_SCHEDULER_SETTINGS,
+            cli_config.normalize_llm_scheduler_settings(None),
+        )
+
     def test_normalize_proactive_message_config_clamps_silence_days(self) -> None:
         too_large = cli_config.normalize_proactive_message_config(
             {
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import json
 import unittest
 
-from core.graph.client import GraphClient, GraphHTTPError, PREFER_TIMEZONE
+import httpx
+
+from core.graph.client import DELTA_PREFER, GraphClient, GraphHTTPError, PREFER_TIMEZONE
 
 
 class FakeResponse:
@@ -10,6 +13,7 @@ class FakeResponse:
         self.status_code = status_code
         self._payload = {} if payload is None else payload
         self.headers = {} if headers is None else headers
+        self.content = json.dumps(self._payload).encode("utf-8")
 
     def json(self):
         return self._payload
@@ -55,7 +59,9 @@ class GraphClientTest(unittest.TestCase):
         self.assertEqual(["e1", "e2"], [event["id"] for event in result["events"]])
         self.assertEqual("https://graph.microsoft.com/v1.0/delta-1", result["delta_link"])
         self.assertIn("startDateTime=", http.calls[0]["url"])
-        self.assertEqual(PREFER_TIMEZONE, http.calls[0]["headers"]["Prefer"])
+        self.assertEqual(DELTA_PREFER, http.calls[0]["headers"]["Prefer"])
+        self.assertIn(PREFER_TIMEZONE, DELTA_PREFER)
+        self.assertEqual(2, result["stats"]["pages"])
         self.assertEqual(15.0, http.calls[0]["timeout"])
         self.assertEqual("Bearer secret-token", http.calls[0]["headers"]["Authorization"])
 
@@ -179,6 +185,44 @@ class GraphClientTest(unittest.TestCase):
 
         self.assertEqual(410, raised.exception.status_code)
 
+    def test_delta_replays_recorded_pages_through_pooled_client(self) -> None:
+        pages = {
+            "/v1.0/me/calendarView/delta": {
+                "value": [{"id": "e1", "subject": "站会"}],
+                "@odata.nextLink": "https://graph.microsoft.com/v1.0/me/calendarView/delta?$skiptoken=p2",
+            },
+            "p2": {
+                "value": [{"id": "e2", "subject": "复盘"}, {"id": "e0", "@removed": {"reason": "deleted"}}],
+                "@odata.deltaLink": "https://graph.microsoft.com/v1.0/me/calendarView/delta?$deltatoken=d1",
+            },
+        }
+        seen: list[httpx.Request] = []
+
+        def replay(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            key = "p2" if "skiptoken" in str(request.url) else request.url.path
+            return httpx.Response(200, json=pages[key])
+
+        with httpx.Client(transport=httpx.MockTransport(replay)) as http:
+            client = GraphClient(lambda: "token", http=http)
+            result = client.calendarview_delta(start="2026-01-01T00:00:00+08:00", end="2026-02-01T00:00:00+08:00")
+
+        self.assertEqual(["e1", "e2", "e0"], [event["id"] for event in result["events"]])
+        self.assertTrue(result["delta_link"].endswith("$deltatoken=d1"))
+        self.assertEqual(2, result["stats"]["pages"])
+        self.assertEqual(2, len(seen))
+        self.assertGreater(result["stats"]["bytes"], 0)
+        self.assertEqual(DELTA_PREFER, seen[0].headers["Prefer"])
+
+    def test_get_me_selects_only_account_fields(self) -> None:
+        http = FakeHttp([FakeResponse(200, {"id": "me"})])
+        client = GraphClient(lambda: "token", http=http)
+
+        client.get_me()
+
+        self.assertIn("%24select=id%2CdisplayName", http.calls[0]["url"])
+        self.assertEqual(PREFER_TIMEZONE, http.calls[0]["headers"]["Prefer"])
+
 
 if __name__ == "__main__":
     unittest.main()
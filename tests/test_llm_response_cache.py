@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from core import db
+from core.llm import common, response_cache
+from core.llm.common import call_json_completion
+
+
+class CountingClient:
+    def __init__(self, content: str = '{"ok": true}') -> None:
+        self.content = content
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        del kwargs
+        self.calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content), finish_reason="stop")],
+        )
+
+
+def parse(content: str | None) -> dict | None:
+    try:
+        data = json.loads(common.clean_json_content(content))
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name) / "workspace"
+        self.old_workspace = db.WORKSPACE_DIR
+        self.old_db_path = db.DB_PATH
+        db.WORKSPACE_DIR = self.workspace
+        db.DB_PATH = self.workspace / "state.db"
+        db.init_db()
+
+    def tearDown(self) -> None:
+        db.WORKSPACE_DIR = self.old_workspace
+        db.DB_PATH = self.old_db_path
+        self.tmp.cleanup()
+
+    def call(self, client: CountingClient, prompt: str, **overrides) -> dict | None:
+        return call_json_completion(
+            client=client,
+            model="fake-model",
+            operation="memory_relink",
+            messages=[{"role": "user", "content": prompt}],
+            parser=parse,
+            response_format={"type": "json_object"},
+            **overrides,
+        )
+
+    def test_opted_in_call_is_answered_from_cache(self) -> None:
+        client = CountingClient()
+
+        first = self.call(client, "同一段证据", cache_ttl_s=60)
+        second = self.call(client, "同一段证据", cache_ttl_s=60)
+
+        self.assertEqual({"ok": True}, first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, client.calls)
+
+    def test_calls_without_ttl_are_never_cached(self) -> None:
+        client = CountingClient()
+
+        self.call(client, "同一段证据")
+        self.call(client, "同一段证据")
+
+        self.assertEqual(2, client.calls)
+
+    def test_unparseable_answers_are_not_stored(self) -> None:
+        client = CountingClient(content="not json")
+
+        self.assertIsNone(self.call(client, "坏回答", cache_ttl_s=60, empty_content_retries=0))
+        self.assertIsNone(self.call(client, "坏回答", cache_ttl_s=60, empty_content_retries=0))
+
+        self.assertEqual(2, client.calls)
+
+    def test_expired_entries_miss(self) -> None:
+        client = CountingClient()
+        self.call(client, "短命", cache_ttl_s=60)
+        db.execute("UPDATE llm_response_cache SET expires_at = 0")
+
+        self.call(client, "短命", cache_ttl_s=60)
+
+        self.assertEqual(2, client.calls)
+
+    def test_key_ignores_now_str_clock_but_not_date(self) -> None:
+        def key(stamp: str) -> str:
+            return response_cache.cache_key(
+                operation="memory_link_judge",
+                model="m",
+                messages=[{"role": "system", "content": f"当前时间：{stamp}"}],
+                response_format=None,
+            )
+
+        self.assertEqual(key("2026 年 05 月 25 日（周一）09:00"), key("2026 年 05 月 25 日（周一）09:41"))
+        self.assertNotEqual(key("2026 年 05 月 25 日（周一）09:00"), key("2026 年 05 月 26 日（周二）09:00"))
+
+    def test_lru_trims_past_row_cap(self) -> None:
+        old_max = response_cache.MAX_ENTRIES
+        response_cache.MAX_ENTRIES = 2
+        try:
+            for index in range(3):
+                response_cache.put(f"k{index}", operation="op", model="m", response_content="{}", ttl_s=60)
+        finally:
+            response_cache.MAX_ENTRIES = old_max
+
+        rows = db.query_all("SELECT cache_key FROM llm_response_cache ORDER BY cache_key")
+        self.assertEqual(2, len(rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
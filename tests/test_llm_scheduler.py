@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from core.llm import common, scheduler
+
+
+class RateLimitError(Exception):
+    def __init__(self, headers: dict[str, str]) -> None:
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+class FlakyClient:
+    """Raises the scripted errors first, then answers with a JSON object."""
+
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        del kwargs
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"ok": true}'), finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        )
+
+
+def parse(content: str | None) -> dict | None:
+    try:
+        return json.loads(common.clean_json_content(content))
+    except json.JSONDecodeError:
+        return None
+
+
+class SchedulerAdmissionTest(unittest.TestCase):
+    def test_freed_slot_goes_to_interactive_before_maintenance(self) -> None:
+        llm_scheduler = scheduler.LLMCallScheduler(max_concurrency=1)
+        holder = llm_scheduler.acquire("memory_reconcile")
+        order: list[str] = []
+
+        def run(operation: str) -> None:
+            with llm_scheduler.slot(operation):
+                order.append(operation)
+
+        maintenance = threading.Thread(target=run, args=("memory_relink",))
+        maintenance.start()
+        self._wait_for_waiters(llm_scheduler, 1)
+        interactive = threading.Thread(target=run, args=("soul_comment_reply",))
+        interactive.start()
+        self._wait_for_waiters(llm_scheduler, 2)
+
+        llm_scheduler.release(holder)
+        maintenance.join(timeout=5)
+        interactive.join(timeout=5)
+
+        self.assertEqual(["soul_comment_reply", "memory_relink"], order)
+
+    def test_class_cap_does_not_block_other_classes(self) -> None:
+        llm_scheduler = scheduler.LLMCallScheduler(
+            max_concurrency=4,
+            class_limits={scheduler.PRIORITY_MAINTENANCE: 1},
+        )
+        first = llm_scheduler.acquire("memory_reconcile")
+        blocked = threading.Event()
+        admitted = threading.Event()
+
+        def run_maintenance() -> None:
+            blocked.set()
+            with llm_scheduler.slot("memory_relink"):
+                admitted.set()
+
+        thread = threading.Thread(target=run_maintenance)
+        thread.start()
+        self.assertTrue(blocked.wait(timeout=5))
+        self._wait_for_waiters(llm_scheduler, 1)
+        with llm_scheduler.slot("soul_chat_reply") as ticket:
+            self.assertEqual(scheduler.PRIORITY_INTERACTIVE, ticket.priority)
+        self.assertFalse(admitted.is_set())
+
+        llm_scheduler.release(first)
+        thread.join(timeout=5)
+        self.assertTrue(admitted.is_set())
+
+    def test_token_bucket_waits_for_refill_after_usage_overdraft(self) -> None:
+        now = [0.0]
+        llm_scheduler = scheduler.LLMCallScheduler(tokens_per_minute=600, clock=lambda: now[0])
+        with llm_scheduler.slot("suggestion_router") as ticket:
+            ticket.record_usage({"total_tokens": 660})
+
+        self.assertLessEqual(llm_scheduler.stats()["token_bucket"], 0)
+        self.assertGreater(llm_scheduler._admission_delay((1, 99, "suggestion_router")), 0)
+        now[0] = 7.0  # 10 tokens/s refills the 60-token overdraft plus some
+        ticket = llm_scheduler.acquire("suggestion_router")
+        llm_scheduler.release(ticket)
+        self.assertGreater(llm_scheduler.stats()["token_bucket"], 0)
+
+    def test_retry_after_header_is_parsed(self) -> None:
+        self.assertEqual(3.0, scheduler.retry_after_seconds(RateLimitError({"retry-after": "3"})))
+        self.assertEqual(0.25, scheduler.retry_after_seconds(RateLimitError({"retry-after-ms": "250"})))
+        self.assertIsNone(scheduler.retry_after_seconds(RuntimeError("no response")))
+
+    def test_install_from_config_clamps_settings(self) -> None:
+        try:
+            scheduler.install_from_config({"llm_max_concurrency": 99, "llm_tokens_per_minute": "bad"})
+            self.assertEqual(32, scheduler.get().max_concurrency)
+            self.assertEqual(0, scheduler.get().tokens_per_minute)
+        finally:
+            scheduler.reset()
+
+    def _wait_for_waiters(self, llm_scheduler: scheduler.LLMCallScheduler, count: int) -> None:
+        deadline = time.monotonic() + 5
+        while llm_scheduler.stats()["waiting"] < count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.005)
+
+
+class ScheduledCompletionTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        scheduler.reset()
+
+    def test_rate_limited_call_is_retried_after_shared_cooldown(self) -> None:
+        client = FlakyClient(RateLimitError({"retry-after": "0.01"}))
+        logged: list[dict] = []
+
+        with patch("core.llm.common.logging_service.log_llm_call", side_effect=lambda **fields: logged.append(fields)):
+            parsed = common.call_json_completion(
+                client=client,
+                model="fake-model",
+                operation="memory_relink",
+                messages=[{"role": "user", "content": "hi"}],
+                parser=parse,
+            )
+
+        self.assertEqual({"ok": True}, parsed)
+        self.assertEqual(2, client.calls)
+        self.assertEqual("ok", logged[-1]["status"])
+        self.assertGreaterEqual(logged[-1]["queue_wait_ms"], 0)
+
+    def test_rate_limit_retries_end_with_the_last_error(self) -> None:
+        errors = [RateLimitError({"retry-after": "0.001"}) for _ in range(common.RATE_LIMIT_RETRIES + 1)]
+        client = FlakyClient(*errors)
+        logged: list[dict] = []
+
+        with patch("core.llm.common.logging_service.log_llm_call", side_effect=lambda **fields: logged.append(fields)):
+            parsed = common.call_json_completion(
+                client=client,
+                model="fake-model",
+                operation="memory_relink",
+                messages=[{"role": "user", "content": "hi"}],
+                parser=parse,
+            )
+
+        self.assertIsNone(parsed)
+        self.assertEqual(common.RATE_LIMIT_RETRIES + 1, client.calls)
+        self.assertNotEqual("ok", logged[-1]["status"])
+        self.assertEqual(0, scheduler.get().stats()["in_flight"])
+
+    def test_non_rate_limit_errors_are_not_retried(self) -> None:
+        client = FlakyClient(RuntimeError("boom"))
+
+        with patch("core.llm.common.logging_service.log_llm_call"):
+            parsed = common.call_json_completion(
+                client=client,
+                model="fake-model",
+                operation="memory_relink",
+                messages=[{"role": "user", "content": "hi"}],
+                parser=parse,
+            )
+
+        self.assertIsNone(parsed)
+        self.assertEqual(1, client.calls)
+        self.assertEqual(0, scheduler.get().stats()["in_flight"])
+
+
+if __name__ == "__main__":
+    unittest.main()
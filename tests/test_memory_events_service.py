@@ -4,6 +4,7 @@ import sqlite3
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from core import db, memory_events_service as mes
 
@@ -173,6 +174,27 @@ class MemoryEventsServiceTest(unittest.TestCase):
                     """
                 )
 
+    def test_source_head_tracks_latest_revision_and_backfills(self) -> None:
+        with db.transaction() as conn:
+            mes.record_post_mutation(conn, post_id="p1", op="create", content="a", occurred_at=1.0)
+            edit = mes.record_post_mutation(conn, post_id="p1", op="edit", content="b", occurred_at=2.0)
+            mes.record_post_mutation(conn, post_id="p2", op="create", content="c", occurred_at=3.0)
+            mes.record_post_mutation(conn, post_id="p2", op="delete", content=None, occurred_at=4.0)
+
+        head = db.query_one("SELECT * FROM memory_source_heads WHERE source_type = 'post' AND source_id = 'p1'")
+        self.assertEqual((edit.id, 2, "edit"), (head["event_id"], head["source_revision"], head["op"]))
+        current = mes.list_current_events_in_bucket("global", "public")
+        self.assertEqual([edit.id], [row["id"] for row in current])
+
+        # A workspace from before the head table: heads are rebuilt once at start.
+        db.execute("DELETE FROM memory_source_heads")
+        db.execute("DELETE FROM meta WHERE key = 'memory_source_heads_built'")
+        db.init_db()
+        with db.transaction() as conn:
+            later = mes.record_post_mutation(conn, post_id="p1", op="edit", content="d", occurred_at=5.0)
+        self.assertEqual(3, later.source_revision)
+        self.assertEqual(later.id, mes.latest_source_event("post", "p1")["id"])
+
     def test_append_rolls_back_with_transaction(self) -> None:
         try:
             with db.transaction() as conn:
@@ -211,6 +233,92 @@ class MemoryEventsServiceTest(unittest.TestCase):
         private = mes.list_events_after("soul:luna", "private:soul:luna", 0)
         self.assertEqual([r["source_id"] for r in private], ["1"])
 
+    def test_batch_conversation_context_reads_each_conversation_once(self) -> None:
+        now = 1000.0
+        with db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO souls(name, file_path, enabled, created_at, updated_at) VALUES (?, ?, 1, ?, ?)",
+                ("luna", "souls/luna.md", now, now),
+            )
+            conn.execute(
+                "INSERT INTO posts(id, ts, content, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                ("p1", "2026-01-01T00:00:00+00:00", "帖子", now, now),
+            )
+            conn.executemany(
+                """
+                INSERT INTO comments(id, post_id, soul_name, role, content, seq, created_at)
+                VALUES (?, 'p1', 'luna', ?, ?, ?, ?)
+                """,
+                [
+                    (100 + seq, "user" if seq % 2 else "assistant", "" if seq == 5 else f"评论{seq}", seq, now)
+                    for seq in range(20)
+                ],
+            )
+            conn.execute(
+                "INSERT INTO chat_threads(id, soul_name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (1, "luna", now, now),
+            )
+            conn.executemany(
+                "INSERT INTO chat_messages(id, thread_id, role, content, created_at) VALUES (?, 1, ?, ?, ?)",
+                [(message_id, "user", f"私聊{message_id}", now) for message_id in range(1, 21)],
+            )
+        events = [
+            {"source_type": "comment_message", "source_id": "102"},
+            {"source_type": "comment_relationship", "source_id": "103"},
+            {"source_type": "comment_message", "source_id": "115"},
+            {"source_type": "chat_message", "source_id": "1"},
+            {"source_type": "chat_message", "source_id": "10"},
+            {"source_type": "chat_message", "source_id": "20"},
+            {"source_type": "post", "source_id": "p1"},
+            {"source_type": "comment_message", "source_id": "999"},
+        ]
+
+        with patch.object(mes.db, "query_all", wraps=db.query_all) as query_all:
+            contexts = mes.conversation_contexts_for_events(events, radius=2)
+
+        self.assertEqual(4, query_all.call_count)
+        ids = [[item["source_id"] for item in context] for context in contexts]
+        self.assertEqual(["100", "101", "102", "103", "104"], ids[0])
+        self.assertEqual(["101", "102", "103", "104"], ids[1])  # seq 5 is blank
+        self.assertEqual(["113", "114", "115", "116", "117"], ids[2])
+        self.assertEqual(["1", "2", "3"], ids[3])
+        self.assertEqual(["8", "9", "10", "11", "12"], ids[4])
+        self.assertEqual(["18", "19", "20"], ids[5])
+        self.assertEqual([[], []], contexts[6:])
+        for event, context in zip(events, contexts):
+            self.assertEqual(context, mes.conversation_context_for_event(event, radius=2))
+
+
+    def test_batch_chat_context_windows_skip_other_threads_messages(self) -> None:
+        now = 1000.0
+        with db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO souls(name, file_path, enabled, created_at, updated_at) VALUES (?, ?, 1, ?, ?)",
+                ("luna", "souls/luna.md", now, now),
+            )
+            conn.executemany(
+                "INSERT INTO chat_threads(id, soul_name, created_at, updated_at) VALUES (?, 'luna', ?, ?)",
+                [(1, now, now), (2, now, now)],
+            )
+            # Two threads written in turn: each thread's ids are every other id.
+            conn.executemany(
+                "INSERT INTO chat_messages(id, thread_id, role, content, created_at) VALUES (?, ?, 'user', ?, ?)",
+                [(message_id, 1 + message_id % 2, f"私聊{message_id}", now) for message_id in range(1, 31)],
+            )
+        events = [
+            {"source_type": "chat_message", "source_id": "3"},
+            {"source_type": "chat_message", "source_id": "16"},
+            {"source_type": "chat_message", "source_id": "29"},
+        ]
+
+        contexts = mes.conversation_contexts_for_events(events, radius=2)
+
+        ids = [[item["source_id"] for item in context] for context in contexts]
+        self.assertEqual(["1", "3", "5", "7"], ids[0])
+        self.assertEqual(["12", "14", "16", "18", "20"], ids[1])
+        self.assertEqual(["25", "27", "29"], ids[2])
+        for event, context in zip(events, contexts):
+            self.assertEqual(context, mes.conversation_context_for_event(event, radius=2))
 
 if __name__ == "__main__":
     unittest.main()
@@ -46,6 +46,23 @@ class NormalizeClaimsParserTest(unittest.TestCase):
         self.assertIsNone(memory_router._parse_normalize_claims_content("胡言乱语"))
 
 
+class RelinkParserTest(unittest.TestCase):
+    def test_parser_keys_answers_by_item_and_drops_malformed(self) -> None:
+        raw = json.dumps({"items": [
+            {"item": 1, "keep_event_ids": [3], "drop_event_ids": [4]},
+            {"item": 2, "keep_event_ids": "3"},
+            {"item": 3, "keep_event_ids": [1]},
+            {"item": 3, "keep_event_ids": [2]},
+            "not-a-dict",
+        ]})
+        parsed = memory_router._parse_memory_relink_content(raw)
+        # item 2 is malformed, item 3 is answered twice: both are re-asked
+        self.assertEqual(parsed, {1: {"keep_event_ids": [3], "drop_event_ids": [4]}})
+
+    def test_parser_rejects_answer_without_items(self) -> None:
+        self.assertIsNone(memory_router._parse_memory_relink_content('{"keep_event_ids": [1]}'))
+
+
 class ReconcileParserTest(unittest.TestCase):
     def test_parser_normalizes_ops(self) -> None:
         raw = json.dumps({
@@ -3,6 +3,7 @@ from __future__ import annotations
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from core import (
     db,
@@ -104,6 +105,22 @@ class MemoryReflectionTest(unittest.TestCase):
         active = {r["id"] for r in mus.list_reconcile_units_in_bucket("global", "public")}
         self.assertNotIn(u, active)
 
+    def test_decay_batch_marks_bucket_stale_once_and_audits_each_unit(self) -> None:
+        units = [self._unit(f"旧状态{i}", type="state") for i in range(5)]
+        with patch.object(
+            mus, "_mark_bucket_view_stale", wraps=mus._mark_bucket_view_stale
+        ) as mark_stale:
+            summary = refl.reflect_persona("global", now=self._future())
+        self.assertEqual(sorted(units), sorted(summary.decayed))
+        self.assertEqual(1, mark_stale.call_count)
+        for unit_id in units:
+            self.assertEqual("dormant", mus.get_unit(unit_id)["status"])
+        ops = db.query_all(
+            "SELECT unit_id, after_json FROM memory_unit_ops WHERE op = 'decay'"
+        )
+        self.assertEqual(sorted(units), sorted(r["unit_id"] for r in ops))
+        self.assertTrue(all('"status": "dormant"' in r["after_json"] for r in ops))
+
     # --- promote -----------------------------------------------------------
 
     def test_promote_sediments_reconfirmed_contextual_to_core(self) -> None:
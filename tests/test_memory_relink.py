@@ -3,6 +3,7 @@ from __future__ import annotations
 import tempfile
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 
 from core import db, memory_events_service as mes, memory_unit_service as mus
 from core import memory_reconcile_runner as runner
@@ -140,6 +141,110 @@ class MemoryRelinkTest(unittest.TestCase):
         self.assertEqual(mus.current_effective_evidence_for_unit(unit_id), [])
         self.assertEqual(len(mus.list_pending_relinks()), 1)
 
+    def test_batch_judge_resolves_several_units_in_one_call(self) -> None:
+        e1, e2, e3 = self._event("p1"), self._event("p2"), self._event("p3")
+        u1 = self._unit([e1, e2], content="用户在准备考研")
+        u2 = self._unit([e3], content="用户喜欢跑步")
+        mus.update_unit(u1, content="用户在准备考研复试")
+        mus.update_unit(u2, content="用户喜欢夜跑")
+        calls: list[int] = []
+
+        def batch_judge(items: list[dict]) -> list[dict]:
+            calls.append(len(items))
+            return [
+                {"keep_event_ids": [e1]},
+                {"keep_event_ids": [e3]},
+            ]
+
+        result = runner.run_pending_relinks(None, "m", batch_judge=batch_judge)
+
+        self.assertEqual([2], calls)
+        self.assertEqual(result.applied, 2)
+        self.assertEqual(self._effective_ids(u1), {e1})
+        self.assertEqual(self._effective_ids(u2), {e3})
+
+    def test_unparseable_batch_is_split_into_single_units(self) -> None:
+        e1, e2 = self._event("p1"), self._event("p2")
+        u1 = self._unit([e1], content="用户在准备考研")
+        u2 = self._unit([e2], content="用户喜欢跑步")
+        mus.update_unit(u1, content="用户在准备考研复试")
+        mus.update_unit(u2, content="用户喜欢夜跑")
+        calls: list[int] = []
+
+        def batch_judge(items: list[dict]) -> list[dict | None]:
+            calls.append(len(items))
+            if len(items) > 1:
+                raise RuntimeError("unparseable JSON")
+            return [{"keep_event_ids": [e1]}]
+
+        result = runner.run_pending_relinks(None, "m", batch_judge=batch_judge)
+
+        self.assertEqual([2, 1, 1], calls)
+        self.assertEqual(result.applied, 2)
+        self.assertEqual(self._effective_ids(u1), {e1})
+        # judged alone, the stray id is ignored and the unkept link dropped
+        self.assertEqual(self._effective_ids(u2), set())
+
+    def test_transport_failure_fails_the_batch_without_splitting(self) -> None:
+        events = [self._event(f"p{i}") for i in range(3)]
+        units = [self._unit([event], content=f"旧内容{i}") for i, event in enumerate(events)]
+        for i, unit_id in enumerate(units):
+            mus.update_unit(unit_id, content=f"新内容{i}")
+        calls: list[dict] = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            raise ConnectionError("upstream unavailable")
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        result = runner.run_pending_relinks(client, "m")
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(0, result.applied)
+        self.assertEqual(set(units), {failure.unit_id for failure in result.failures})
+        self.assertEqual(3, len(mus.list_pending_relinks()))
+
+    def test_crossed_item_in_batch_is_rejudged_alone(self) -> None:
+        e1, e2 = self._event("p1"), self._event("p2")
+        u1 = self._unit([e1], content="用户在准备考研")
+        u2 = self._unit([e2], content="用户喜欢跑步")
+        mus.update_unit(u1, content="用户在准备考研复试")
+        mus.update_unit(u2, content="用户喜欢夜跑")
+        calls: list[int] = []
+
+        def batch_judge(items: list[dict]) -> list[dict | None]:
+            calls.append(len(items))
+            if len(items) > 1:
+                return [{"keep_event_ids": [e1]}, {"keep_event_ids": [e1]}]
+            return [{"keep_event_ids": [e2]}]
+
+        result = runner.run_pending_relinks(None, "m", batch_judge=batch_judge)
+
+        self.assertEqual([2, 1], calls)
+        self.assertEqual(result.applied, 2)
+        self.assertEqual(self._effective_ids(u2), {e2})
+
+    def test_token_budget_packs_batches(self) -> None:
+        old_budget = runner.RELINK_BATCH_TOKEN_BUDGET
+        runner.RELINK_BATCH_TOKEN_BUDGET = 1
+        try:
+            e1, e2 = self._event("p1"), self._event("p2")
+            u1 = self._unit([e1])
+            u2 = self._unit([e2])
+            mus.update_unit(u1, content="新内容一")
+            mus.update_unit(u2, content="新内容二")
+            calls: list[int] = []
+
+            def batch_judge(items: list[dict]) -> list[dict]:
+                calls.append(len(items))
+                return [{"keep_event_ids": []} for _ in items]
+
+            runner.run_pending_relinks(None, "m", batch_judge=batch_judge)
+        finally:
+            runner.RELINK_BATCH_TOKEN_BUDGET = old_budget
+
+        self.assertEqual([1, 1], calls)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -108,10 +108,10 @@ class ViewSynthProducerTest(unittest.TestCase):
         with db.transaction() as conn:
             return mes.record_post_mutation(conn, post_id=f"p{self._seq}", op="create", content="e", occurred_at=float(self._seq)).id
 
-    def _core_unit(self, content: str) -> str:
+    def _core_unit(self, content: str, *, type: str = "identity") -> str:
         uid = mus.add_unit(
             owner_scope="global", visibility_scope="public", source_channel="post",
-            type="identity", content=content, confidence=0.9, tier="core",
+            type=type, content=content, confidence=0.9, tier="core",
             importance=0.85, evidence_event_ids=[self._event()],
         )
         mus.confirm_unit(uid, evidence_event_ids=[self._event()], confidence=0.9)
@@ -167,6 +167,91 @@ class ViewSynthProducerTest(unittest.TestCase):
         self.assertTrue(view.used_fallback)
         self.assertIn("## 身份", view.content_md)
 
+    def test_incremental_synthesis_only_redoes_changed_unit_type(self) -> None:
+        self._seed_core_units(vproducer.MIN_UNITS_FOR_LLM)
+        preferences = [self._core_unit(f"偏好{i}", type="preference") for i in range(vproducer.MIN_UNITS_FOR_LLM)]
+        calls: list[set[str]] = []
+
+        def fake_call(client, model, *, units_text, char_budget, view_type, unit_contents, trace_context=None):
+            calls.append(set(unit_contents))
+            return f"第{len(calls)}次合成"
+
+        with patch.object(memory_router, "call_view_synthesis", fake_call):
+            synthesizer = vproducer.make_llm_synthesizer(object(), "m", mvs.VIEW_USER_PORTRAIT)
+            first = mvs.synthesize_view(
+                "global", "public", mvs.VIEW_USER_PORTRAIT,
+                synthesizer=synthesizer, incremental=True,
+            )
+            self._core_unit("新偏好", type="preference")
+            second = mvs.synthesize_view(
+                "global", "public", mvs.VIEW_USER_PORTRAIT,
+                synthesizer=synthesizer, incremental=True,
+            )
+
+        self.assertEqual(3, len(calls))
+        self.assertTrue(set(preferences) < calls[2])
+        self.assertEqual((0, 2), (first.reused_sections, first.synthesized_sections))
+        self.assertEqual((1, 1), (second.reused_sections, second.synthesized_sections))
+        self.assertFalse(second.used_fallback)
+        body = mvs.strip_generated_header(second.content_md)
+        self.assertEqual("第1次合成\n\n第3次合成", body)
+
+    def test_incremental_sections_that_fill_their_budget_keep_every_type(self) -> None:
+        types = ["identity", "preference", "state", "insight", "freeform"]
+        for unit_type in types:
+            for i in range(2):
+                self._core_unit(f"{unit_type}事实{i}", type=unit_type)
+        budgets: list[int] = []
+
+        def greedy(members, char_budget):
+            budgets.append(char_budget)
+            return f"[{members[0]['type']}]" + "满" * char_budget
+
+        view = mvs.synthesize_view(
+            "global", "public", mvs.VIEW_USER_PORTRAIT,
+            synthesizer=greedy, incremental=True,
+        )
+
+        body = mvs.strip_generated_header(view.content_md)
+        self.assertLessEqual(len(body), mvs.USER_PORTRAIT_CHAR_BUDGET)
+        self.assertEqual(len(types), len(budgets))
+        self.assertLess(max(budgets), mvs.USER_PORTRAIT_CHAR_BUDGET // 2)
+        for unit_type in types:
+            self.assertIn(f"[{unit_type}]", body)
+
+    def test_incremental_sections_share_the_budget_among_present_types(self) -> None:
+        for unit_type in ("identity", "preference"):
+            for i in range(2):
+                self._core_unit(f"{unit_type}事实{i}", type=unit_type)
+        budgets: list[int] = []
+
+        def greedy(members, char_budget):
+            budgets.append(char_budget)
+            return f"[{members[0]['type']}]" + "满" * char_budget
+
+        two_types = mvs.synthesize_view(
+            "global", "public", mvs.VIEW_USER_PORTRAIT,
+            synthesizer=greedy, incremental=True,
+        )
+        self.assertEqual(2, len(budgets))
+        self.assertGreater(min(budgets), mvs.USER_PORTRAIT_CHAR_BUDGET * 2 // 5)
+        self.assertGreater(
+            len(mvs.strip_generated_header(two_types.content_md)),
+            mvs.USER_PORTRAIT_CHAR_BUDGET * 9 // 10,
+        )
+
+        # A new type shrinks every share, so the cached sections must be redone.
+        self._core_unit("状态事实", type="state")
+        three_types = mvs.synthesize_view(
+            "global", "public", mvs.VIEW_USER_PORTRAIT,
+            synthesizer=greedy, incremental=True,
+        )
+        self.assertEqual((0, 3), (three_types.reused_sections, three_types.synthesized_sections))
+        body = mvs.strip_generated_header(three_types.content_md)
+        self.assertLessEqual(len(body), mvs.USER_PORTRAIT_CHAR_BUDGET)
+        for unit_type in ("identity", "preference", "state"):
+            self.assertIn(f"[{unit_type}]", body)
+
     def test_refresh_builds_cross_bucket_relationship_view(self) -> None:
         # >= MIN_UNITS_FOR_LLM relationship units so gate 1 lets the LLM path run.
         for i in range(vproducer.MIN_UNITS_FOR_LLM):
@@ -133,6 +133,42 @@ class MemoryViewServiceTest(unittest.TestCase):
         mus.confirm_unit(unit_id, evidence_event_ids=[self._event()], confidence=0.5)
         self.assertNotIn(unit_id, mvs.recompute_portrait_membership("global", "public"))
 
+    def test_boundary_scores_are_grouped_not_queried_per_unit(self) -> None:
+        corroborated = []
+        for index in range(4):
+            unit_id = mus.add_unit(
+                owner_scope="global", visibility_scope="public", source_channel="post",
+                type="insight", content=f"被证实的推断{index}", confidence=0.7, tier="core",
+                importance=0.8, evidence_event_ids=[self._event()],
+            )
+            mus.confirm_unit(unit_id, evidence_event_ids=[self._event()], confidence=0.7)
+            corroborated.append(unit_id)
+        lone = mus.add_unit(
+            owner_scope="global", visibility_scope="public", source_channel="post",
+            type="insight", content="只说过一次的推断", confidence=0.7, tier="core",
+            importance=0.8, evidence_event_ids=[self._event()],
+        )
+
+        statements: list[str] = []
+        conn = db.connect()
+        try:
+            conn.set_trace_callback(statements.append)
+            core = mvs.recompute_portrait_membership("global", "public", conn=conn)
+            conn.commit()
+            conn.set_trace_callback(None)
+            for row in conn.execute("SELECT * FROM memory_units").fetchall():
+                expected = mvs._passes_core_predicate(
+                    row, currently_in_slice=False,
+                    behavior_score=mvs.behavior_score(conn, row),
+                )
+                self.assertEqual(expected, row["id"] in core)
+        finally:
+            conn.close()
+
+        self.assertEqual(set(corroborated), set(core))
+        self.assertNotIn(lone, core)
+        self.assertEqual(1, sum("memory_unit_ops" in sql for sql in statements))
+
     def test_importance_below_portrait_floor_excluded(self) -> None:
         # importance 0.65 is above the unit floor (0.30) but below the portrait floor (0.70)
         unit_id = mus.add_unit(
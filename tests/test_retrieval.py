@@ -4,6 +4,7 @@ import json
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from core import db, fts_query, logging_service, retrieval, vectorstore
 
@@ -74,6 +75,22 @@ class FtsQueryTest(unittest.TestCase):
         self.assertNotIn("在南", recovered)
         self.assertEqual(["图书馆"], fts_query.query_terms("图书馆"))  # no spurious recovery
 
+    def test_repeated_segmentation_is_memoized_per_mode(self) -> None:
+        fts_query.clear_term_memo()
+        with patch.object(fts_query.jieba, "lcut", wraps=fts_query.jieba.lcut) as lcut:
+            first = fts_query.query_terms("考研复习规划")
+            first.append("mutated")
+            self.assertEqual(["考研", "复习", "规划"], fts_query.query_terms("考研复习规划"))
+            fts_query.match_candidates("考研复习规划")
+            fts_query.match_candidates("考研复习规划", max_terms=2)
+            self.assertEqual(1, lcut.call_count)
+        self.assertIn("南京", fts_query.search_terms("考研复习规划南京大学"))
+
+        stats = fts_query.term_memo_stats()
+        self.assertEqual(3, stats["hits"])
+        self.assertEqual(4, stats["misses"])
+        self.assertAlmostEqual(3 / 7, stats["hit_rate"])
+
 
 class RetrievalFusionTest(unittest.TestCase):
     def setUp(self) -> None:
@@ -85,6 +102,7 @@ class RetrievalFusionTest(unittest.TestCase):
         self.old_vectorstore_is_initialized = vectorstore.is_initialized
         self.logged_events: list[dict] = []
         retrieval.logging_service.log_event = lambda event, **fields: self.logged_events.append({"event": event, **fields})
+        retrieval.clear_search_cache()
 
     def tearDown(self) -> None:
         retrieval.fts_search_scored = self.old_fts_search_scored
@@ -322,9 +340,11 @@ class RetrievalDatabaseTest(unittest.TestCase):
         db.DB_PATH = self.workspace / "state.db"
         db.init_db()
         logging_service.init_logging({"enabled": True})
+        retrieval.clear_search_cache()
 
     def tearDown(self) -> None:
         logging_service.init_logging({"enabled": False})
+        retrieval.clear_search_cache()
         db.WORKSPACE_DIR = self.old_workspace
         db.DB_PATH = self.old_db_path
         retrieval.fts_search_scored = self.old_fts_search_scored
@@ -448,6 +468,83 @@ class RetrievalDatabaseTest(unittest.TestCase):
             result.hits,
         )
 
+    def test_repeated_hybrid_search_is_served_from_cache_until_posts_change(self) -> None:
+        fts_query.clear_term_memo()
+        self.insert_post("p-1", "图书馆学习效率更高", 1.0)
+        calls: list[str] = []
+
+        def counting_vector_search(query, k=20):
+            calls.append(query)
+            return [retrieval.RetrievalHit("p-1", "vector", 1, 0.1)]
+
+        retrieval.vector_search_scored = counting_vector_search
+
+        first = retrieval.hybrid_search_scored("图书馆 学习", k=3)
+        second = retrieval.hybrid_search_scored("  图书馆   学习 ", k=3)
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, len(calls))
+        event = self._last_event("hybrid_retrieval_result")
+        self.assertTrue(event["cache_hit"])
+        self.assertEqual(0.5, event["cache_hit_rate"])
+        term_stats = fts_query.term_memo_stats()
+        self.assertGreater(term_stats["misses"], 0)
+        self.assertEqual(term_stats["hit_rate"], event["term_memo_hit_rate"])
+        self.assertEqual(term_stats["entries"], event["term_memo_size"])
+
+        self.insert_post("p-2", "图书馆闭馆了", 2.0)
+        retrieval.hybrid_search_scored("图书馆 学习", k=3)
+
+        self.assertEqual(2, len(calls))
+        self.assertFalse(self._last_event("hybrid_retrieval_result")["cache_hit"])
+
+    def test_failed_vector_leg_is_not_cached(self) -> None:
+        self.insert_post("p-1", "图书馆学习效率更高", 1.0)
+        retrieval.vector_search_scored = self.old_vector_search_scored
+        vectorstore.is_initialized = lambda: True
+        old_query_post_hits = vectorstore.query_post_hits
+        self.addCleanup(setattr, vectorstore, "query_post_hits", old_query_post_hits)
+        calls: list[str] = []
+
+        def flaky_query_post_hits(query, n_results=20):
+            # every other call fails: each search's first try, then its retry
+            calls.append(query)
+            if len(calls) % 2:
+                raise RuntimeError("embedding API unavailable")
+            return [vectorstore.VectorHit("p-1", 1, 0.1)]
+
+        vectorstore.query_post_hits = flaky_query_post_hits
+
+        degraded = retrieval.hybrid_search_scored("图书馆 学习", k=3)
+        recovered = retrieval.hybrid_search_scored("图书馆 学习", k=3)
+        self.assertNotIn("vector", degraded[0].sources)
+        self.assertIn("vector", recovered[0].sources)
+        self.assertEqual(2, len(calls))
+
+        degraded_user = retrieval.user_search_posts("图书馆", k=3, semantic=True)
+        recovered_user = retrieval.user_search_posts("图书馆", k=3, semantic=True)
+        self.assertEqual("keyword", degraded_user.hits[0].match)
+        self.assertEqual("both", recovered_user.hits[0].match)
+        self.assertEqual(4, len(calls))
+
+    def test_search_cache_key_separates_k_and_exclusion(self) -> None:
+        self.insert_post("p-1", "考研复习计划", 1.0)
+        self.insert_post("p-2", "考研复习进度", 2.0)
+        retrieval.vector_search_scored = lambda query, k=20: []
+
+        excluded = retrieval.hybrid_search_scored(
+            "考研复习",
+            k=3,
+            exclusion=retrieval.RetrievalExclusion(post_ids=frozenset({"p-1"})),
+        )
+        unrestricted = retrieval.hybrid_search_scored("考研复习", k=3)
+        narrow = retrieval.hybrid_search_scored("考研复习", k=1)
+
+        self.assertEqual(["p-2"], [hit.post_id for hit in excluded])
+        self.assertEqual({"p-1", "p-2"}, {hit.post_id for hit in unrestricted})
+        self.assertEqual(1, len(narrow))
+        self.assertEqual(0, retrieval.search_cache_stats()["hits"])
+
     def _last_event(self, event_name: str) -> dict:
         current = self.workspace / "logs" / "current.jsonl"
         records = [
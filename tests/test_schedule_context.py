@@ -164,6 +164,54 @@ class ScheduleContextTest(unittest.TestCase):
         self.assertIn("100% 完成会", section)
         self.assertNotIn("100x 完成会", section)
 
+    def test_long_keywords_search_whole_cache_short_ones_only_nearby(self) -> None:
+        self._insert_event("far-long", "年度体检预约", self.now + timedelta(days=400))
+        self._insert_event("far-short", "牙医", self.now - timedelta(days=400))
+        self._insert_event("near-short", "牙医复诊", self.now + timedelta(days=20))
+
+        section = schedule_context.build_mentioned_schedule_section(["体检预约", "牙医"], now=self.now)
+
+        self.assertIn("年度体检预约", section)
+        self.assertIn("牙医复诊", section)
+        self.assertEqual(1, section.count("牙医"))
+
+    def test_keyword_index_follows_updates_and_deletes(self) -> None:
+        self._insert_event("renamed", "旧的标题会", self.now + timedelta(days=3))
+        self._insert_event("removed", "季度规划会", self.now + timedelta(days=4))
+        db.execute("UPDATE schedule_events SET subject = '季度规划会前准备' WHERE id = 'renamed'")
+        db.execute("DELETE FROM schedule_events WHERE id = 'removed'")
+
+        self.assertEqual("", schedule_context.build_mentioned_schedule_section(["旧的标题"], now=self.now))
+        section = schedule_context.build_mentioned_schedule_section(["季度规划"], now=self.now)
+        self.assertEqual(1, section.count("季度规划会"))
+
+    def test_matches_are_ranked_by_keyword_priority_then_distance_and_capped(self) -> None:
+        for day in range(1, 8):
+            self._insert_event(f"minor-{day}", f"组会第{day}次", self.now + timedelta(days=day))
+        self._insert_event("major", "答辩彩排", self.now + timedelta(days=60))
+
+        section = schedule_context.build_mentioned_schedule_section(
+            ["答辩彩排", "组会第"], now=self.now, limit=3
+        )
+
+        lines = section.splitlines()[2:]
+        self.assertEqual(3, len(lines))
+        self.assertIn("答辩彩排", lines[0])
+        self.assertIn("组会第1次", lines[1])
+        self.assertIn("组会第2次", lines[2])
+
+    def test_existing_rows_are_indexed_on_upgrade(self) -> None:
+        self._insert_event("legacy", "遗留日程标题", self.now + timedelta(days=2))
+        db.execute("INSERT INTO schedule_events_fts(schedule_events_fts) VALUES ('delete-all')")
+        db.execute("DELETE FROM meta WHERE key = 'schedule_goal_fts_built'")
+
+        db.init_db()
+
+        self.assertIn(
+            "遗留日程标题",
+            schedule_context.build_mentioned_schedule_section(["遗留日程"], now=self.now),
+        )
+
     def _insert_event(
         self,
         event_id: str,
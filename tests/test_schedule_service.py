@@ -7,8 +7,10 @@ from datetime import date, datetime, time, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from unittest.mock import patch
+
 from core import db
-from core import goal_schedule_service, goal_service
+from core import goal_schedule_service, goal_service, schedule_service
 from core.graph.client import GraphHTTPError
 from core.schedule_service import (
     NoWritableAccountError,
@@ -41,6 +43,7 @@ class FakeAuth:
         return "client-id" if self.configured else None
 
     def get_access_token(self):
+        self.token_requests = getattr(self, "token_requests", 0) + 1
         return "access-token" if self.connected else None
 
     def account_info(self):
@@ -60,12 +63,18 @@ class FakeGraph:
         self.updated_payloads: list[tuple[str, dict]] = []
         self.deleted_ids: list[str] = []
 
-    def calendarview_delta(self, **kwargs):
+    def iter_calendarview_delta(self, *, stats=None, **kwargs):
+        """Each scripted result is one delta round: a dict (single page) or a
+        list of pages, where only the last page carries ``delta_link``."""
         self.delta_calls.append(kwargs)
         result = self.delta_results.pop(0)
-        if isinstance(result, Exception):
-            raise result
-        return result
+        pages = result if isinstance(result, list) else [result]
+        for page in pages:
+            if isinstance(page, Exception):
+                raise page
+            if stats is not None:
+                stats["pages"] = stats.get("pages", 0) + 1
+            yield {"events": page["events"], "delta_link": page.get("delta_link")}
 
     def create_event(self, payload):
         self.created_payloads.append(payload)
@@ -102,6 +111,7 @@ class ScheduleServiceTest(unittest.TestCase):
         self.clock_values = iter(float(value) for value in range(1000, 100_000, 1000))
 
     def tearDown(self) -> None:
+        schedule_service.clear_schedule_cache()
         db.WORKSPACE_DIR = self.old_workspace
         db.DB_PATH = self.old_db_path
         self.tmp.cleanup()
@@ -185,6 +195,52 @@ class ScheduleServiceTest(unittest.TestCase):
             service.status()["accounts"],
         )
 
+    def test_delta_pages_are_applied_in_order_and_link_saved_after_last_page(self) -> None:
+        graph = FakeGraph(
+            [
+                [
+                    {"events": [graph_event("e1", "第一页"), graph_event("e2", "会被撤销", 11)]},
+                    {
+                        "events": [
+                            {"id": "e2", "@removed": {"reason": "deleted"}},
+                            graph_event("e3", "已取消", 13) | {"isCancelled": True},
+                            graph_event("e3", "第二页", 13),
+                        ],
+                        "delta_link": "https://graph.microsoft.com/delta-paged",
+                    },
+                ]
+            ]
+        )
+
+        result = self._service(graph).sync()
+
+        self.assertEqual(3, result["upserted"])
+        rows = db.query_all("SELECT id, subject FROM schedule_events ORDER BY id")
+        self.assertEqual([("e1", "第一页"), ("e3", "第二页")], [(row["id"], row["subject"]) for row in rows])
+        self.assertEqual(
+            "https://graph.microsoft.com/delta-paged",
+            db.query_one("SELECT value FROM meta WHERE key = 'graph.delta_link'")["value"],
+        )
+
+    def test_walk_interrupted_mid_way_keeps_applied_pages_but_not_delta_link(self) -> None:
+        graph = FakeGraph(
+            [
+                {"events": [graph_event("e1", "初版")], "delta_link": "https://graph.microsoft.com/delta-1"},
+                [{"events": [graph_event("e1", "改过")]}, GraphHTTPError(503)],
+            ]
+        )
+        service = self._service(graph)
+        service.sync()
+
+        with self.assertRaises(GraphHTTPError):
+            service.sync()
+
+        self.assertEqual("改过", db.query_one("SELECT subject FROM schedule_events WHERE id = 'e1'")["subject"])
+        self.assertEqual(
+            "https://graph.microsoft.com/delta-1",
+            db.query_one("SELECT value FROM meta WHERE key = 'graph.delta_link'")["value"],
+        )
+
     def test_410_discards_expired_delta_and_replaces_full_cache(self) -> None:
         graph = FakeGraph(
             [
@@ -295,6 +351,46 @@ class ScheduleServiceTest(unittest.TestCase):
         service.delete_event("created-1")
         self.assertIsNone(db.query_one("SELECT 1 FROM schedule_events WHERE id = 'created-1'"))
 
+    def test_repeated_reads_are_served_from_day_cache_until_a_write(self) -> None:
+        service = self._service(FakeGraph(), auth=FakeAuth(configured=True, connected=False))
+        service.create_local_account()
+        goal = goal_service.create_goal("读书", None, "short")
+        created = service.create_event(
+            subject="读书会",
+            event_date=date(2026, 7, 16),
+            start_time=time(20, 0),
+            end_time=time(21, 0),
+            goal_id=goal["id"],
+        )
+
+        with patch.object(schedule_service, "_query_events", wraps=schedule_service._query_events) as query:
+            first = service.list_events(date(2026, 7, 15), date(2026, 7, 17))
+            second = service.list_events(date(2026, 7, 16), date(2026, 7, 16))
+            widened = service.list_events(date(2026, 7, 14), date(2026, 7, 18))
+            self.assertEqual(2, query.call_count)
+            self.assertEqual((date(2026, 7, 14), date(2026, 7, 18)), query.call_args.args)
+            second["events"][0]["goal_links"].clear()
+
+            goal_service.update_goal(goal["id"], title="读完一本书")
+            renamed = service.list_events(date(2026, 7, 16), date(2026, 7, 16))
+
+        self.assertEqual([created["id"]], [event["id"] for event in first["events"]])
+        self.assertEqual(first["events"], widened["events"])
+        self.assertEqual("读完一本书", renamed["events"][0]["goal_links"][0]["goal_title"])
+
+    def test_reads_reuse_recent_connection_check(self) -> None:
+        auth = FakeAuth()
+        service = self._service(FakeGraph(), auth=auth)
+
+        service.list_events(date(2026, 7, 16), date(2026, 7, 16))
+        service.list_events(date(2026, 7, 17), date(2026, 7, 17))
+        self.assertEqual(1, auth.token_requests)
+
+        service.logout()
+        listed = service.list_events(date(2026, 7, 16), date(2026, 7, 16))
+        self.assertFalse(listed["connected"])
+        self.assertEqual(1, auth.token_requests)
+
     def test_unconnected_reads_and_sync_degrade_without_exception(self) -> None:
         graph = FakeGraph()
         auth = FakeAuth(configured=False, connected=False)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import jieba
+
+from core import db, segmentation
+
+
+class SegmentationWarmupTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.old_workspace = db.WORKSPACE_DIR
+        db.WORKSPACE_DIR = Path(self.tmp.name) / "workspace"
+
+    def tearDown(self) -> None:
+        db.WORKSPACE_DIR = self.old_workspace
+        self.tmp.cleanup()
+
+    def test_warm_up_persists_dictionary_under_workspace_and_is_idempotent(self) -> None:
+        with patch.object(jieba, "dt", jieba.Tokenizer()):
+            self.assertTrue(segmentation.warm_up())
+            self.assertFalse(segmentation.warm_up())
+        self.assertTrue(segmentation.cache_path().is_file())
+
+        # A fresh process loads the persisted dictionary instead of rebuilding it.
+        with patch.object(jieba, "dt", jieba.Tokenizer()), patch.object(
+            jieba.Tokenizer, "gen_pfdict", side_effect=AssertionError("rebuilt")
+        ):
+            self.assertTrue(segmentation.warm_up())
+            self.assertTrue(jieba.dt.initialized)
+
+    def test_start_warmup_runs_in_background_once(self) -> None:
+        with patch.object(jieba, "dt", jieba.Tokenizer()), patch.object(
+            segmentation, "warm_up", wraps=segmentation.warm_up
+        ) as warm_up:
+            thread = segmentation.start_warmup()
+            self.assertIsNotNone(thread)
+            thread.join(timeout=30)
+            self.assertIsNone(segmentation.start_warmup())
+        self.assertEqual(1, warm_up.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -146,6 +146,19 @@ class SoulLetterRouterTest(unittest.TestCase):
         self.assertNotIn("已经说过的帖子", material.text)
         self.assertNotIn("已经说过的评论", material.text)
 
+    def test_material_keeps_only_newest_unused_posts_up_to_limit(self) -> None:
+        self._insert_post("oldest", "最早的帖子", NOW - 4 * DAY)
+        self._insert_post("middle", "中间的帖子", NOW - 3 * DAY)
+        self._insert_post("newest", "最新的帖子", NOW - 2 * DAY)
+        self._insert_post("outside", "窗口外的帖子", NOW - 60 * DAY)
+
+        with patch.object(soul_letter_router, "MATERIAL_POST_LIMIT", 2):
+            material = soul_letter_router.build_letter_material(now=NOW, soul_name="A")
+
+        self.assertEqual(("middle", "newest"), material.post_ids)
+        self.assertNotIn("最早的帖子", material.text)
+        self.assertNotIn("窗口外的帖子", material.text)
+
     def test_f5_blacklist_covers_bare_forms(self) -> None:
         phrases = (
             "想起你科一过了",
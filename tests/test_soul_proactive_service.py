@@ -244,6 +244,67 @@ class SoulProactiveServiceTest(unittest.TestCase):
         )
         self.assertEqual("never", decision.soul_name)
 
+    def test_deleting_latest_activity_rebuilds_watermark_from_history(
+        self,
+    ) -> None:
+        self._insert_soul("A")
+        self._insert_post("p-old", NOW - 9 * DAY)
+        self._insert_post("p-new", NOW - DAY)
+
+        blocked = soul_proactive_service.scan_for_candidates(
+            self._config(),
+            now=NOW,
+        )
+        db.execute(
+            "DELETE FROM meta WHERE key = ?",
+            (soul_proactive_service.LAST_SCAN_META_KEY,),
+        )
+        db.execute("DELETE FROM posts WHERE id = 'p-new'")
+        self.assertIsNone(
+            db.query_one("SELECT 1 FROM user_activity_watermark")
+        )
+        eligible = soul_proactive_service.scan_for_candidates(
+            self._config(),
+            now=NOW,
+        )
+
+        self.assertEqual("silence_gate", blocked.reason)
+        self.assertTrue(eligible.should_call_llm)
+        self.assertEqual(NOW - 9 * DAY, eligible.last_user_activity_at)
+        self.assertEqual(
+            NOW - 9 * DAY,
+            soul_proactive_service.last_user_activity_ts(),
+        )
+
+    def test_deleted_letter_no_longer_holds_soul_cooldown(self) -> None:
+        self._insert_soul("A")
+        self._insert_post("p-old", NOW - 20 * DAY)
+        self._record_letter("A", NOW - 10 * DAY)
+        recent = self._record_letter("A", NOW - 5 * DAY)
+
+        blocked = soul_proactive_service.scan_for_candidates(
+            self._config(),
+            now=NOW,
+        )
+        db.execute(
+            "DELETE FROM meta WHERE key = ?",
+            (soul_proactive_service.LAST_SCAN_META_KEY,),
+        )
+        db.execute("DELETE FROM chat_messages WHERE id = ?", (recent,))
+        eligible = soul_proactive_service.scan_for_candidates(
+            self._config(),
+            now=NOW,
+        )
+
+        self.assertEqual("soul_cooldown", blocked.reason)
+        self.assertEqual(("A",), eligible.candidate_souls)
+        self.assertEqual(
+            NOW - 10 * DAY,
+            db.query_one(
+                "SELECT last_sent_at FROM soul_letter_watermarks WHERE soul_name = 'A'"
+            )["last_sent_at"],
+        )
+
     def test_no_user_activity_blocks_before_any_llm_candidate(self) -> None:
         self._insert_soul("A")
 
@@ -74,11 +74,35 @@ class VisionServiceTest(unittest.TestCase):
 
         self.assertEqual(1, len(summaries))
         self.assertEqual("一张用于测试的图片。", summaries[0].description)
+        # 429s must reach the shared scheduler, not be retried inside the SDK.
+        self.assertEqual(0, fake_openai.clients[0].kwargs["max_retries"])
         self.assertIn("一张用于测试的图片", vision_service.content_with_cached_summaries("", [attachment]))
         row = db.query_one("SELECT status, description FROM vision_cache WHERE attachment_id = ?", (attachment.id,))
         self.assertIsNotNone(row)
         self.assertEqual("ok", row["status"])
 
+    def test_reposted_image_reuses_summary_by_content_hash(self) -> None:
+        first = attachment_service.upload_image(_image_bytes(), content_type="image/png")
+        second = attachment_service.upload_image(_image_bytes(), content_type="image/png")
+        self.config_path.write_text(
+            json.dumps({"vision": {"enabled": True, "model": "vision-model", "api_key": "k"}}),
+            encoding="utf-8",
+        )
+        fake_openai = _fake_openai_module(
+            json.dumps(
+                {"images": [{"attachment_id": first.id, "description": "同一张截图。"}]},
+                ensure_ascii=False,
+            )
+        )
+        with patch.dict(sys.modules, {"openai": fake_openai}):
+            vision_service.describe_attachments([first])
+
+        with patch.dict(sys.modules, {"openai": None}):
+            summaries = vision_service.describe_attachments([second])
+
+        self.assertEqual([second.id], [summary.attachment_id for summary in summaries])
+        self.assertEqual("同一张截图。", summaries[0].description)
+
     def test_logging_redacts_image_data_urls(self) -> None:
         logging_service.log_llm_call(
             call_id="call-1",
@@ -119,9 +143,12 @@ def _image_bytes() -> bytes:
 
 
 def _fake_openai_module(response_content: str):
+    clients: list[object] = []
+
     class FakeOpenAI:
         def __init__(self, **kwargs):
             self.kwargs = kwargs
+            clients.append(self)
             self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
 
         def create(self, **kwargs):
@@ -130,7 +157,7 @@ def _fake_openai_module(response_content: str):
                 choices=[SimpleNamespace(message=SimpleNamespace(content=response_content))]
             )
 
-    return types.SimpleNamespace(OpenAI=FakeOpenAI)
+    return types.SimpleNamespace(OpenAI=FakeOpenAI, clients=clients)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-import json
 import sys
 import tempfile
+import threading
 import types
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+import httpx
+
 from core import db, logging_service, web_search_service
 
 
@@ -200,6 +202,94 @@ class WebSearchServiceTest(unittest.TestCase):
         self.assertEqual("tavily", run.provider)
         self.assertIn("boom", run.error or "")
 
+    def test_queries_run_concurrently_and_deadline_keeps_finished_results(self) -> None:
+        config = web_search_service.WebSearchConfig(
+            enabled=True,
+            provider="tavily",
+            tavily_api_key="tavily-key",
+            max_results=4,
+            timeout_s=1,
+            cache_ttl_s=0,
+        )
+        release = threading.Event()
+        started: list[str] = []
+
+        def fake_search(provider, query, config, max_results, *, include_raw_content=False):
+            del provider, config, max_results, include_raw_content
+            started.append(query)
+            if query == "慢":
+                release.wait(timeout=5)
+            return [web_search_service.WebSearchResult(query, f"https://example.com/{query}", "s", provider="tavily")]
+
+        try:
+            with patch("core.web_search_service._search_one", side_effect=fake_search):
+                run = web_search_service.search(["慢", "快"], config=config)
+        finally:
+            release.set()
+
+        self.assertEqual({"慢", "快"}, set(started))
+        self.assertTrue(run.used)
+        self.assertEqual(["快"], [item.title for item in run.results])
+        self.assertLess(run.elapsed_ms, 3000)
+
+    def test_partial_query_failure_keeps_other_results(self) -> None:
+        config = web_search_service.WebSearchConfig(
+            enabled=True,
+            provider="tavily",
+            tavily_api_key="tavily-key",
+            max_results=3,
+            timeout_s=8,
+            cache_ttl_s=0,
+        )
+
+        def fake_search(provider, query, config, max_results, *, include_raw_content=False):
+            del provider, config, max_results, include_raw_content
+            if query == "坏":
+                raise RuntimeError("boom")
+            return [web_search_service.WebSearchResult(query, "https://example.com/ok", "s", provider="tavily")]
+
+        with patch("core.web_search_service._search_one", side_effect=fake_search):
+            run = web_search_service.search(["坏", "好"], config=config)
+
+        self.assertTrue(run.used)
+        self.assertIsNone(run.error)
+        self.assertEqual(["好"], [item.title for item in run.results])
+
+    def test_persistent_cache_tier_survives_process_cache_loss(self) -> None:
+        config = web_search_service.WebSearchConfig(
+            enabled=True,
+            provider="tavily",
+            tavily_api_key="tavily-key",
+            max_results=2,
+            timeout_s=8,
+            cache_ttl_s=1800,
+        )
+        results = [
+            web_search_service.WebSearchResult(
+                "A", "https://a.example", "one", content="正文", published_at="2026-01-01", provider="tavily"
+            )
+        ]
+        with patch("core.web_search_service._search_one", return_value=results):
+            web_search_service.search(["持久"], config=config)
+        web_search_service._memory_cache.clear()
+
+        with patch("core.web_search_service._search_one", side_effect=AssertionError("should hit cache")):
+            run = web_search_service.search(["持久"], config=config)
+            expired = web_search_service._cached("tavily", "持久", 2, 0, False)
+
+        self.assertEqual(results, run.results)
+        self.assertIsNone(expired)
+
+    def test_memory_cache_is_bounded(self) -> None:
+        result = [web_search_service.WebSearchResult("A", "https://a.example", "one", provider="tavily")]
+        with patch.object(web_search_service, "MEMORY_CACHE_MAX_ENTRIES", 2):
+            for query in ("q1", "q2", "q3"):
+                web_search_service._store_cache("tavily", query, 1, result, False, 60)
+
+        self.assertEqual(
+            ["q2", "q3"], [query for _, query, _, _ in web_search_service._memory_cache]
+        )
+
     def test_format_results_for_context_marks_web_content_as_untrusted(self) -> None:
         run = web_search_service.WebSearchRun(
             used=True,
@@ -237,30 +327,24 @@ class WebSearchServiceTest(unittest.TestCase):
         )
         captured = {}
 
-        class FakeResponse:
-            def __enter__(self):
-                return self
-
-            def __exit__(self, exc_type, exc, tb):
-                return False
-
-            def read(self):
-                return json.dumps(
-                    {"results": [{"title": "Result", "url": "https://example.com", "content": "摘要"}]}
-                ).encode("utf-8")
-
-        def fake_urlopen(request, timeout):
-            captured["auth"] = request.headers.get("Authorization")
-            captured["timeout"] = timeout
-            captured["body"] = json.loads(request.data.decode("utf-8"))
-            return FakeResponse()
+        class FakeClient:
+            def post(self, url, *, json, headers, timeout):
+                captured["url"] = url
+                captured["auth"] = headers.get("Authorization")
+                captured["timeout"] = timeout
+                captured["body"] = json
+                return httpx.Response(
+                    200,
+                    json={"results": [{"title": "Result", "url": "https://example.com", "content": "摘要"}]},
+                )
 
-        with patch("core.web_search_service.urllib.request.urlopen", fake_urlopen):
+        with patch("core.web_search_service._tavily_http", return_value=FakeClient()):
             results = web_search_service._search_tavily("query", config, 2)
             self.assertFalse(captured["body"]["include_raw_content"])
             web_search_service._search_tavily("query", config, 2, include_raw_content=True)
             self.assertTrue(captured["body"]["include_raw_content"])
 
+        self.assertEqual(web_search_service.TAVILY_SEARCH_URL, captured["url"])
         self.assertEqual("Bearer tavily-key", captured["auth"])
         self.assertEqual(8, captured["timeout"])
         self.assertEqual("https://example.com", results[0].url)